@@ -158,9 +158,11 @@ class LoadCaseDetailDialog(QDialog):
         v_dir = QVBoxLayout(grp_dir)
         self.radio_dir_srss = QRadioButton("SRSS")
         self.radio_dir_abs = QRadioButton("Absolute")
+        self.radio_dir_100_30 = QRadioButton("100-30")
         self.radio_dir_srss.setChecked(True)
         v_dir.addWidget(self.radio_dir_srss)
         v_dir.addWidget(self.radio_dir_abs)
+        v_dir.addWidget(self.radio_dir_100_30)
         h_rsa_top.addWidget(grp_dir)
         layout_rsa.addLayout(h_rsa_top)
 
@@ -270,6 +272,7 @@ class LoadCaseDetailDialog(QDialog):
             
         if hasattr(self.case, 'dir_comb'):
             if self.case.dir_comb == "Absolute": self.radio_dir_abs.setChecked(True)
+            elif self.case.dir_comb == "100-30": self.radio_dir_100_30.setChecked(True)
             else: self.radio_dir_srss.setChecked(True)
 
     def on_type_changed(self, text):
@@ -418,7 +421,9 @@ class LoadCaseDetailDialog(QDialog):
 
         elif c.case_type == "Response Spectrum":
             c.modal_comb = "CQC" if self.radio_cqc.isChecked() else "SRSS"
-            c.dir_comb = "SRSS" if self.radio_dir_srss.isChecked() else "Absolute"
+            if self.radio_dir_100_30.isChecked(): c.dir_comb = "100-30"
+            elif self.radio_dir_abs.isChecked(): c.dir_comb = "Absolute"
+            else: c.dir_comb = "SRSS"
             
             c.rsa_loads = []
             for r in range(self.table_rsa.rowCount()):
@@ -429,7 +434,7 @@ class LoadCaseDetailDialog(QDialog):
                 if cmb_name and cmb_func and item_scale:
                     try:
                         val = float(item_scale.text())
-                    except: val = 1.0
+                    except: val = 9.81
                     c.rsa_loads.append((cmb_name.currentText(), cmb_func.currentText(), val))
 
         elif c.case_type == "LTHA":
@@ -224,8 +224,13 @@ class ResponseSpectrumDialog(QDialog):
         title = f"Response Spectrum TSC-2018 ({direction})"
         self.ax.set_title(title, fontsize=10)
         
+        # Exact curve on a fine grid (plus the corners); the table keeps
+        # the corner periods and the 0.2 s grid.
+        t_plot = np.union1d(np.linspace(0.0, periods[-1], 601), periods)
+        sa_plot, _ = self.generator.evaluate(t_plot, ss, s1, site_class, R, D, I, tl, direction=direction)
+
         color = 'blue' if direction == "Horizontal" else 'red'
-        self.ax.plot(periods, accels, color=color, linewidth=1.5)
+        self.ax.plot(t_plot, sa_plot, color=color, linewidth=1.5)
         
         self.ax.set_aspect('auto') 
         self.figure.tight_layout()
@@ -32,6 +32,7 @@ sys.path.append(root_dir)
 
 from app.commands import CmdDrawFrame, CmdDeleteSelection, CmdReplicate
 from core.model import StructuralModel, LoadCase
+from core.solver.modal.modal_store import attach_mode_shapes
 from app.canvas import MCanvas3D
 from app.dialogs.new_model_dialog import NewModelDialog
 from app.dialogs.material_dialog import MaterialManagerDialog
@@ -1293,6 +1294,7 @@ class MainWindow(QMainWindow):
         try:
             with open(res_path, 'r') as f:
                 data = json.load(f)
+            attach_mode_shapes(data, res_path)
             
             if data.get("status") == "FAILED":
                 err_info = data.get("error", {})
@@ -15,6 +15,7 @@ class MassSource:
         self.include_self_mass = True                                           
         self.include_patterns = True                              
         self.load_patterns = []                                                         
+        self.mass_type = "lumped"
 
 class LoadPattern:
     def __init__(self, name, pattern_type="DEAD", self_weight_multiplier=0.0):
@@ -77,6 +78,7 @@ class StructuralModel:
         self.slabs = {}
         self.functions = {}
         self.th_functions = {}
+        self.load_combinations = {}
         self.constraints = {}
                          
         self.grid = GridLines()
@@ -294,7 +296,8 @@ class StructuralModel:
             "loads": [],
             "mass_sources": [],
             "functions": [],
-            "th_functions": []
+            "th_functions": [],
+            "load_combinations": []
         }
 
         for lc in self.load_cases.values():
@@ -422,7 +425,8 @@ class StructuralModel:
                     "name": ms.name,
                     "include_self_mass": ms.include_self_mass,
                     "include_patterns": ms.include_patterns,
-                    "load_patterns": ms.load_patterns                       
+                    "load_patterns": ms.load_patterns,
+                    "mass_type": getattr(ms, "mass_type", "lumped")
                 }
                 data["mass_sources"].append(ms_data)
 
@@ -434,6 +438,10 @@ class StructuralModel:
             for func_name, func_data in self.th_functions.items():
                 data["th_functions"].append(func_data)
 
+        if hasattr(self, 'load_combinations'):
+            for combo_name, combo_data in self.load_combinations.items():
+                data["load_combinations"].append(combo_data)
+
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=4)
         print(f"Model saved to {filepath}")
@@ -448,6 +456,7 @@ class StructuralModel:
         self.slabs.clear(); self.constraints.clear()
         self.functions = {}
         self.th_functions = {}
+        self.load_combinations = {}
         self._node_counter = 1; self._elem_counter = 1; self._slab_counter = 1 
         
         self.name = data["info"]["name"]
@@ -507,7 +516,7 @@ class StructuralModel:
         if "constraints" in data:
             for c_data in data["constraints"]: self.add_constraint(c_data["name"], c_data["axis"])
 
-        self.slabs.clear(); self.constraints.clear()
+        self.slabs.clear()
         self.graphics_settings = data.get("graphics", {})
         self.name = data["info"]["name"]
 
@@ -582,6 +591,7 @@ class StructuralModel:
                 new_ms.include_patterns = ms_data["include_patterns"]
                                                              
                 new_ms.load_patterns = [tuple(x) for x in ms_data["load_patterns"]]
+                new_ms.mass_type = ms_data.get("mass_type", "lumped")
 
                 self.mass_sources[new_ms.name] = new_ms
 
@@ -599,6 +609,10 @@ class StructuralModel:
                 f_name = func_data.get("name", "THFUNC")
                 self.th_functions[f_name] = func_data
 
+        if "load_combinations" in data:
+            for combo_data in data["load_combinations"]:
+                self.load_combinations[combo_data["name"]] = combo_data
+
         if "loads" in data:
             for load_data in data["loads"]:
                 pattern_name = load_data["pattern"]
@@ -4,10 +4,14 @@ import json
 import numpy as np
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
+modal_dir = os.path.join(os.path.dirname(current_dir), 'modal')
 if current_dir not in sys.path:
     sys.path.append(current_dir)
+if modal_dir not in sys.path:
+    sys.path.append(modal_dir)
 
 from newmark_sdof import newmark_elastic_sdof
+from modal_store import load_modal_results
 
 def run_ltha_analysis(modal_results_path, model_data, output_path, case_name="LTHA"):
     """
@@ -40,16 +44,14 @@ def run_ltha_analysis(modal_results_path, model_data, output_path, case_name="LT
         _write_error(output_path, "Modal results not found. Run MODAL analysis first.")
         return False
 
-    with open(modal_results_path, 'r') as f:
-        modal_data = json.load(f)
+    modal_data, store = load_modal_results(modal_results_path)
 
-    if modal_data.get("status") != "SUCCESS":
+    if modal_data.get("status") != "SUCCESS" or store is None:
         _write_error(output_path, "Modal analysis did not succeed.")
         return False
 
     periods_table = modal_data["tables"]["periods"]                                          
     mass_ratios   = modal_data["tables"]["participation_mass"]                                           
-    mode_shapes   = modal_data["mode_shapes"]                                                  
 
     print(f"[1/4] Loaded {len(periods_table)} modes from modal results.")
 
@@ -107,9 +109,10 @@ def run_ltha_analysis(modal_results_path, model_data, output_path, case_name="LT
     print(f"[3/4] Running modal superposition ({len(periods_table)} modes, "
           f"directions={directions_str}, zeta={zeta*100:.0f}%)...")
 
-    node_ids = list(mode_shapes["Mode 1"].keys())
+    node_ids = store.node_ids
 
-    U_history = {nid: np.zeros((n_steps, 6)) for nid in node_ids}
+    # All DOFs in store order (6 per node), one column block per node.
+    U_history = np.zeros((n_steps, store.n_nodes * 6))
 
     for direction, accel_raw, dt, scale in resolved_loads:
                                          
@@ -146,26 +149,17 @@ def run_ltha_analysis(modal_results_path, model_data, output_path, case_name="LT
                 print(f"  max(q_n) = {np.max(np.abs(q_n)):.6f} m")
                 print(f"--------------------\n")
 
-            mode_key   = f"Mode {i+1}"
-            shape_data = mode_shapes.get(mode_key, {})
-
-            for nid in node_ids:
-                if nid not in shape_data:
-                    continue
-                phi = np.array(shape_data[nid])               
-                U_history[nid] += np.outer(q_n, phi)
+            U_history += np.outer(q_n, store.phi[:, i])
 
         print(f"   Direction {direction}: all modes processed ✓")
 
     print("[4/4] Extracting peak responses and writing results...")
 
-    peak_displacements = {}
-    for nid, hist in U_history.items():
-        peak = np.max(np.abs(hist), axis=0)
-        peak_displacements[nid] = peak.tolist()
+    peak_displacements = store.node_table(np.max(np.abs(U_history), axis=0))
 
     history_path = output_path.replace("_results.json", "_LTHA_history.npz")
-    np.savez_compressed(history_path, **{"node_" + str(nid): hist for nid, hist in U_history.items()})
+    U_nodes = U_history.reshape(n_steps, store.n_nodes, 6)
+    np.savez_compressed(history_path, **{"node_" + str(nid): U_nodes[:, k, :] for k, nid in enumerate(node_ids)})
     print(f"   Time history saved: {history_path}")
 
     base_reaction = {"Fx": 0.0, "Fy": 0.0, "Fz": 0.0,
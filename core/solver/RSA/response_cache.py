@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+class ModalResponseCache:
+    """
+    Per-mode peak responses of every (spectrum function, direction, damping)
+    already evaluated on one set of modal results, kept in an .npz next to
+    them. Changing the modal or direction combination, or a scale factor,
+    then only redoes the combination.
+
+    The peak modal displacements are Gamma * Sd * phi; only the coordinates
+    q = Gamma * Sd are stored, phi stays in the memory-mapped modal store.
+    """
+    FIELDS = ("SaR_g", "Sd", "ratio", "gamma", "q", "V_coeff")
+    # Bumped when the responses are computed differently; older caches are discarded.
+    FORMAT = 2
+
+    def __init__(self, path, modal_fingerprint):
+        self.path = path
+        self.modal_fingerprint = modal_fingerprint
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def cache_path(modal_results_path):
+        """'X_results.json' -> 'X_results_rsa_cache.npz'."""
+        return os.path.splitext(modal_results_path)[0] + "_rsa_cache.npz"
+
+    @staticmethod
+    def fingerprint(store):
+        """Identifies the modal results by their period and participation arrays."""
+        h = hashlib.sha1()
+        h.update(np.ascontiguousarray(store.periods, dtype=float).tobytes())
+        h.update(np.ascontiguousarray(store.participation, dtype=float).tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def entry_key(func_params, direction, zeta):
+        spec = json.dumps({"function": func_params, "direction": direction, "zeta": float(zeta)},
+                          sort_keys=True, default=str)
+        return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                if "format" not in data.files or int(data["format"]) != self.FORMAT:
+                    return
+                if str(data["modal"]) != self.modal_fingerprint:
+                    return
+                for key in json.loads(str(data["index"])):
+                    self.entries[key] = {f: data[f"{key}_{f}"] for f in self.FIELDS}
+        except (OSError, KeyError, ValueError) as e:
+            print(f"RSA Cache: ignoring unreadable cache ({e})")
+            self.entries = {}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key, responses):
+        self.entries[key] = {f: np.asarray(responses[f], dtype=float) for f in self.FIELDS}
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        arrays = {f"{key}_{f}": v for key, entry in self.entries.items() for f, v in entry.items()}
+        try:
+            with open(self.path, 'wb') as fh:
+                np.savez(fh, format=np.array(self.FORMAT), modal=np.array(self.modal_fingerprint),
+                         index=np.array(json.dumps(list(self.entries))), **arrays)
+            self._dirty = False
+        except OSError as e:
+            print(f"RSA Cache: could not write {self.path} ({e})")
@@ -5,17 +5,33 @@ import numpy as np
 
 current_dir = os.path.dirname(os.path.abspath(__file__)) 
 solver_dir = os.path.dirname(os.path.dirname(current_dir)) 
+modal_dir = os.path.join(os.path.dirname(current_dir), 'modal')
 
 if current_dir not in sys.path: sys.path.append(current_dir)
 if solver_dir not in sys.path: sys.path.append(solver_dir)
+if modal_dir not in sys.path: sys.path.append(modal_dir)
 
 from tsc2018_generator import TSC2018SpectrumGenerator
+from modal_store import load_modal_results
+from response_cache import ModalResponseCache
+from spectrum_sweep import SWEEP_PARAMETERS, write_sweep_table
+
+# Rows (DOFs) of the mode shape matrix combined per batch; bounds the
+# temporary (rows x modes) arrays of the CQC quadratic form.
+COMBINE_CHUNK_ROWS = 65536
+
+DIRECTION_COMBINATIONS = ("SRSS", "Absolute", "100-30")
 
 class RSAEngine:
-    def __init__(self, modal_results_path, model_data):
+    def __init__(self, modal_results_path, model_data, use_cache=True):
         self.modal_path = modal_results_path
         self.model_data = model_data
         self.generator = TSC2018SpectrumGenerator()
+        self.use_cache = use_cache
+        self._modal_data = None
+        self._store = None
+        self._cache = None
+        self._rho = {}
         
     @staticmethod
     def _cqc_rho(omega_i, omega_j, zeta):
@@ -28,23 +44,119 @@ class RSAEngine:
         num = 8.0 * zeta**2 * (1.0 + r) * r**1.5
         den = (1.0 - r**2)**2 + 4.0 * zeta**2 * r * (1.0 + r)**2
         return num / den if den != 0.0 else 1.0
-    
-    def run(self, function_name="FUNC1", direction="X", modal_comb="SRSS", damping_ratio=None):
-        print(f"--- RSA ENGINE STARTED ({direction}-Direction, Modal Comb: {modal_comb}) ---")
-        
-        if not os.path.exists(self.modal_path):
-            raise Exception("Modal Results not found.\n\n>> Please set 'MODAL' to 'Run' in the Analysis Dialog first!")
-            
-        with open(self.modal_path, 'r') as f:
-            modal_data = json.load(f)
-            
-        if "tables" not in modal_data or "periods" not in modal_data["tables"]:
-            raise Exception("Modal Data is missing from the result file...")
-
-        periods = modal_data["tables"]["periods"]
-        mass_ratios = modal_data["tables"]["participation_mass"]
-        mode_shapes = modal_data.get("mode_shapes", {}) 
-        
+
+    @staticmethod
+    def cqc_correlation(omegas, zeta):
+        """
+        (n_modes, n_modes) CQC cross-correlation matrix of all mode pairs,
+        with the same conventions as _cqc_rho.
+        """
+        omegas = np.asarray(omegas, dtype=float)
+        wi, wj = omegas[:, None], omegas[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = wi / wj
+            num = 8.0 * zeta**2 * (1.0 + r) * r**1.5
+            den = (1.0 - r**2)**2 + 4.0 * zeta**2 * r * (1.0 + r)**2
+            rho = np.where(den != 0.0, num / den, 1.0)
+        rigid = (wi == 0) | (wj == 0)
+        rho[rigid] = (wi == wj)[rigid]
+        return rho
+
+    @staticmethod
+    def combine_modal(phi, scale, rho=None, chunk_rows=COMBINE_CHUNK_ROWS):
+        """
+        Combined peak response of every row (DOF) of phi for the modal
+        responses phi * scale: SRSS when rho is None, else CQC, the quadratic
+        form sqrt(u^T rho u) evaluated for a chunk of rows at a time. Each
+        chunk of phi is read once for all columns of scale.
+
+        Args:
+            phi: (n_rows, n_modes) mode shapes (may be memory-mapped).
+            scale (np.ndarray): (n_modes,) peak modal coordinates Gamma * Sd,
+                or (n_modes, n_components) for several load components.
+            rho (np.ndarray): (n_modes, n_modes) correlation matrix or None.
+
+        Returns:
+            np.ndarray: (n_rows,) combined peak values, (n_rows, n_components)
+            for a 2-D scale.
+        """
+        scale = np.asarray(scale, dtype=float)
+        cols = scale.reshape(scale.shape[0], -1)
+        n_rows = phi.shape[0]
+        out = np.empty((n_rows, cols.shape[1]))
+        for a in range(0, n_rows, chunk_rows):
+            P = np.asarray(phi[a:a + chunk_rows])
+            for c in range(cols.shape[1]):
+                U = P * cols[:, c]
+                UR = U if rho is None else U @ rho
+                out[a:a + chunk_rows, c] = np.sqrt(np.abs(np.einsum('dm,dm->d', UR, U)))
+        return out if scale.ndim == 2 else out[:, 0]
+
+    @staticmethod
+    def combine_shear(shear, rho=None):
+        """Base shear coefficient of (n_modes,) or (n_modes, n_components) modal shears."""
+        shear = np.asarray(shear, dtype=float)
+        if rho is None:
+            return np.sqrt(np.sum(shear**2, axis=0))
+        return np.sqrt(np.abs(np.einsum('m...,mn,n...->...', shear, rho, shear)))
+
+    @staticmethod
+    def combine_directions(values, method="SRSS"):
+        """
+        Directional combination along the last axis of (..., n_components)
+        peak values: SRSS, absolute sum ("Absolute") or the 100-30 rule
+        max_i(|r_i| + 0.3 * sum_j!=i |r_j|).
+        """
+        values = np.abs(np.asarray(values, dtype=float))
+        if method == "SRSS":
+            return np.sqrt(np.sum(values**2, axis=-1))
+        if method == "100-30":
+            total = values.sum(axis=-1, keepdims=True)
+            return np.max(values + 0.3 * (total - values), axis=-1)
+        return values.sum(axis=-1)
+
+    def _load_modal(self):
+        """Modal results, read once per engine; also opens the response cache."""
+        if self._modal_data is None:
+            if not os.path.exists(self.modal_path):
+                raise Exception("Modal Results not found.\n\n>> Please set 'MODAL' to 'Run' in the Analysis Dialog first!")
+
+            modal_data, store = load_modal_results(self.modal_path)
+
+            if "tables" not in modal_data or "periods" not in modal_data["tables"] or store is None:
+                raise Exception("Modal Data is missing from the result file...")
+
+            self._modal_data, self._store = modal_data, store
+            if self.use_cache:
+                self._cache = ModalResponseCache(ModalResponseCache.cache_path(self.modal_path),
+                                                 ModalResponseCache.fingerprint(store))
+        return self._modal_data, self._store
+
+    @staticmethod
+    def damping_correction(zeta):
+        """Newmark & Hall factor scaling the 5% damped spectrum to zeta."""
+        if zeta == 0.05:
+            return 1.0
+        source_damp_percent = 5.0
+        target_damp_percent = zeta * 100.0
+        denom = 2.31 - 0.41 * np.log(source_damp_percent)
+        num = 2.31 - 0.41 * np.log(target_damp_percent)
+        return num / denom
+
+    def modal_responses(self, function_name="FUNC1", direction="X", damping_ratio=None):
+        """
+        Per-mode peak responses of one spectrum direction. They depend only on
+        the modal results, the function and the damping, so they are taken
+        from the response cache when these are unchanged.
+
+        Returns:
+            dict: (n_modes,) arrays T, omega, SaR_g, Sd, ratio, gamma, q
+            (peak modal coordinate Gamma * Sd, zero for rigid modes) and
+            V_coeff, plus zeta and spectrum_direction; None when the
+            function is not defined.
+        """
+        _, store = self._load_modal()
+
         funcs = self.model_data.get("functions", {})
         if function_name not in funcs:
             print(f"Error: Function '{function_name}' not defined.")
@@ -53,8 +165,7 @@ class RSAEngine:
         print(f"Using Function: {function_name} (R={func_params['R']}, I={func_params['I']})")
 
         spectrum_direction = func_params.get("Direction", "Horizontal")
-        interp_method = func_params.get("Interpolation", "Linear") 
-        
+
         if damping_ratio is not None:
             zeta = float(damping_ratio)
             print(f"      -> Using Load Case Damping: {zeta*100}%")
@@ -62,141 +173,138 @@ class RSAEngine:
             zeta = func_params.get("Damping", 0.05)
             print(f"      -> Using Function Default Damping: {zeta*100}%")
 
-        per_mode_shear = []          
-        per_mode_omega = []          
-        per_mode_u     = {}          
-
-        if mode_shapes:
-            first_mode = list(mode_shapes.values())[0]
-            for nid in first_mode.keys():
-                per_mode_u[nid] = []
-
-        if zeta == 0.05:
-            eta = 1.0
-        else:
-
-            source_damp_percent = 5.0
-            target_damp_percent = zeta * 100.0
-            
-            denom = 2.31 - 0.41 * np.log(source_damp_percent)
-            
-            num = 2.31 - 0.41 * np.log(target_damp_percent)
-            
-            eta = num / denom
+        eta = self.damping_correction(zeta)
+        if zeta != 0.05:
             print(f"      -> Applied Damping Correction (Newmark & Hall): {eta:.5f}")
 
-        print("\nMode | Period (s) |  SaR (g)  | Mass Ratio | Base Shear Coeff")
-        print("-" * 65)
+        responses = {
+            "zeta": zeta,
+            "spectrum_direction": spectrum_direction,
+            "T": store.column("periods", "T"),
+            "omega": store.column("periods", "omega")
+        }
+
+        key = ModalResponseCache.entry_key(func_params, direction, zeta)
+        cached = self._cache.get(key) if self._cache is not None else None
+        if cached is not None:
+            print(f"      -> Per-mode responses reused from {os.path.basename(self._cache.path)}")
+            responses.update(cached)
+            return responses
 
         g = 9.81
-        
-        spec_T, spec_Sa, params = self.generator.generate_spectrum_curve(
-            ss=func_params['Ss'], s1=func_params['S1'], site_class=func_params['SiteClass'], 
-            R=func_params['R'], D=func_params['D'], I=func_params['I'], 
-            tl=func_params['TL'], direction=spectrum_direction, t_max=10.0                   
+        # Exact spectrum at the modal periods.
+        spec_Sa, params = self.generator.evaluate(
+            responses["T"], ss=func_params['Ss'], s1=func_params['S1'], site_class=func_params['SiteClass'],
+            R=func_params['R'], D=func_params['D'], I=func_params['I'],
+            tl=func_params['TL'], direction=spectrum_direction
         )
 
-        detailed_table = []
+        axis = {"X": "x", "Y": "y"}.get(direction, "z")
+        omega = responses["omega"]
+        sar_g = spec_Sa * eta
+        ratio = store.column("participation", "U" + axis)
+        gamma = store.column("participation", "Gamma_" + axis)
 
-        for i, mode_info in enumerate(periods):
-            T = mode_info["T"]
-            omega = mode_info["omega"]
-            
-            sar_g_raw = np.interp(T, spec_T, spec_Sa)
-            sar_g = sar_g_raw * eta  
-
-            if direction == "X": 
-                ratio = mass_ratios[i]["Ux"]
-                gamma = mass_ratios[i].get("Gamma_x", 0.0)
-            elif direction == "Y": 
-                ratio = mass_ratios[i]["Uy"]
-                gamma = mass_ratios[i].get("Gamma_y", 0.0)
-            else:
-                ratio = mass_ratios[i]["Uz"]
-                gamma = mass_ratios[i].get("Gamma_z", 0.0)
+        rigid = omega <= 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sd = np.where(rigid, 0.0, sar_g * g / omega**2)
 
-            if omega > 0:
-                accel_ms2 = sar_g * g
-                sd = accel_ms2 / (omega**2)
-            else:
-                accel_ms2 = 0.0
-                sd = 0.0
+        responses.update({
+            "SaR_g": sar_g,
+            "Sd": sd,
+            "ratio": ratio,
+            "gamma": gamma,
+            "q": gamma * sd,
+            "V_coeff": sar_g * ratio
+        })
+        if self._cache is not None:
+            self._cache.put(key, responses)
+            self._cache.save()
+        return responses
+
+    def combine(self, responses, modal_comb="SRSS", scale=1.0):
+        """
+        Modal combination of the per-mode responses of one direction, each
+        multiplied by scale.
+
+        Returns:
+            (base_shear_coeff, displacements): displacements is the combined
+            (n_nodes * 6,) peak vector in modal store order, or None when the
+            results have no mode shapes.
+        """
+        _, store = self._load_modal()
+        shear = scale * np.asarray(responses["V_coeff"], dtype=float)
+        q = scale * np.asarray(responses["q"], dtype=float)
+        n_modes = len(shear)
+
+        rho = self._correlation(responses, modal_comb)
+        base_shear = float(self.combine_shear(shear, rho))
+
+        displacements = None
+        if store.n_nodes > 0 and n_modes > 0:
+            displacements = self.combine_modal(store.phi[:, :n_modes], q, rho)
+        return base_shear, displacements
+
+    def _correlation(self, responses, modal_comb):
+        """CQC correlation matrix for the damping of responses (None for SRSS), one per damping."""
+        if modal_comb != "CQC" or len(responses["omega"]) == 0:
+            return None
+        zeta = responses["zeta"]
+        if zeta not in self._rho:
+            self._rho[zeta] = self.cqc_correlation(responses["omega"], zeta)
+        return self._rho[zeta]
 
-            base_shear_coeff = sar_g * ratio
-            
-            per_mode_shear.append(base_shear_coeff)
-            per_mode_omega.append(omega)
+    def _total_weight(self, direction):
+        modal_data, _ = self._load_modal()
+        key = {"X": "x", "Y": "y", "Z": "z"}.get(direction)
+        total_mass = modal_data.get("total_mass", {}).get(key, 0.0) if key else 0.0
+        return total_mass * 9.81
+
+    def _detailed_table(self, responses):
+        """Prints the per-mode table and returns it as rows."""
+        print("\nMode | Period (s) |  SaR (g)  | Mass Ratio | Base Shear Coeff")
+        print("-" * 65)
+
+        g = 9.81
+        detailed_table = []
+        for i in range(len(responses["T"])):
+            T = float(responses["T"][i])
+            sar_g = float(responses["SaR_g"][i])
+            ratio = float(responses["ratio"][i])
+            base_shear_coeff = float(responses["V_coeff"][i])
+            accel_ms2 = sar_g * g if responses["omega"][i] > 0 else 0.0
 
             print(f"{i+1:4} | {T:10.4f} | {sar_g:9.4f} | {ratio:10.4f} | {base_shear_coeff:10.5f}")
 
             detailed_table.append({
                 "mode": i + 1,
                 "T": T,
-                "Damping": zeta,
-                "SaR_g": sar_g,                          
-                "SaR_ms2": accel_ms2,                        
-                "Sd": sd,                                         
+                "Damping": responses["zeta"],
+                "SaR_g": sar_g,
+                "SaR_ms2": accel_ms2,
+                "Sd": float(responses["Sd"][i]),
                 "Ratio": ratio,
                 "V_coeff": base_shear_coeff
             })
+        return detailed_table
 
-            if omega > 0 and mode_shapes:
-                scale_factor = gamma * sd
-                
-                mode_key = f"Mode {i+1}"
-                if mode_key in mode_shapes:
-                    shape_data = mode_shapes[mode_key]
-                    for nid, dofs in shape_data.items():
-                        if nid in per_mode_u:
-                            per_mode_u[nid].append(np.array(dofs) * scale_factor)
-                else:
-                    for nid in per_mode_u:
-                        per_mode_u[nid].append(np.zeros(6))
-            else:
-                for nid in per_mode_u:
-                    per_mode_u[nid].append(np.zeros(6))
+    def run(self, function_name="FUNC1", direction="X", modal_comb="SRSS", damping_ratio=None, scale=1.0):
+        print(f"--- RSA ENGINE STARTED ({direction}-Direction, Modal Comb: {modal_comb}) ---")
 
-        n_modes = len(per_mode_shear)
-        
-        if modal_comb == "CQC" and n_modes > 0:
-            shear_total = 0.0
-            for i in range(n_modes):
-                for j in range(n_modes):
-                    rho = self._cqc_rho(per_mode_omega[i], per_mode_omega[j], zeta)
-                    shear_total += per_mode_shear[i] * rho * per_mode_shear[j]
-            final_base_shear = np.sqrt(abs(shear_total))
-
-            final_displacements = {}
-            for nid, vecs in per_mode_u.items():
-                if len(vecs) != n_modes: continue
-                dof_total = np.zeros(6)
-                for i in range(n_modes):
-                    for j in range(n_modes):
-                        rho = self._cqc_rho(per_mode_omega[i], per_mode_omega[j], zeta)
-                        dof_total += vecs[i] * vecs[j] * rho
-                final_displacements[nid] = np.sqrt(np.abs(dof_total)).tolist()
+        _, store = self._load_modal()
+        responses = self.modal_responses(function_name, direction, damping_ratio)
+        if responses is None:
+            return None
+        detailed_table = self._detailed_table(responses)
 
-        else:
-            final_base_shear = np.sqrt(sum(v**2 for v in per_mode_shear))
-            final_displacements = {}
-            for nid, vecs in per_mode_u.items():
-                sq_sum = np.zeros(6)
-                for v in vecs:
-                    sq_sum += v**2
-                final_displacements[nid] = np.sqrt(sq_sum).tolist()
-
-        total_mass = 0.0
-        if "total_mass" in modal_data:
-            if direction == "X": total_mass = modal_data["total_mass"]["x"]
-            elif direction == "Y": total_mass = modal_data["total_mass"]["y"]
-            elif direction == "Z": total_mass = modal_data["total_mass"]["z"]
-            
-        total_weight = total_mass * g
-        base_shear_force = final_base_shear * total_weight
+        final_base_shear, combined = self.combine(responses, modal_comb, scale)
+        final_displacements = store.node_table(combined) if combined is not None else {}
+
+        base_shear_force = final_base_shear * self._total_weight(direction)
 
         return {
             "status": "SUCCESS",
-            "base_shear_coeff": final_base_shear, 
+            "base_shear_coeff": final_base_shear,
             "base_reaction": {
                 "Fx": base_shear_force if direction == "X" else 0.0,
                 "Fy": base_shear_force if direction == "Y" else 0.0,
@@ -205,6 +313,206 @@ class RSAEngine:
             },
             "displacements": final_displacements,
             "detailed_table": detailed_table,
-            "spectrum_direction": spectrum_direction,
-            "analysis_direction": direction                            
+            "spectrum_direction": responses["spectrum_direction"],
+            "analysis_direction": direction
+        }
+
+    def run_components(self, components, modal_comb="SRSS", dir_comb="SRSS", damping_ratio=None, output_path=None):
+        """
+        All load components of a response spectrum case in one pass: the
+        modal data is read once, the per-mode responses of the components
+        form (n_modes, n_components) matrices combined together, and the
+        component results are combined per direction rule.
+
+        Args:
+            components (list): (direction, function_name) or
+                (direction, function_name, scale) tuples, direction "X", "Y"
+                or "Z"; scale multiplies the component's responses.
+            dir_comb (str): one of DIRECTION_COMBINATIONS.
+            output_path (str): when given, the results are merged into this
+                results JSON (written once).
+
+        Returns:
+            dict: combined results (base_shear_coeff, base_reaction,
+            displacements, rsa_detailed, rsa_summary), or None when no
+            component could be evaluated.
+        """
+        print(f"--- RSA ENGINE STARTED ({len(components)} components, Modal Comb: {modal_comb}, "
+              f"Directional Comb: {dir_comb}) ---")
+        modal_data, store = self._load_modal()
+
+        evaluated = []
+        for component in components:
+            direction, function_name = component[0], component[1]
+            scale = component[2] if len(component) > 2 else 1.0
+            print(f"\n[{direction}] ", end="")
+            responses = self.modal_responses(function_name, direction, damping_ratio)
+            if responses is not None:
+                evaluated.append((direction, scale, responses))
+        if not evaluated:
+            return None
+
+        directions = [d for d, _, _ in evaluated]
+        shear = np.column_stack([s * r["V_coeff"] for _, s, r in evaluated])
+        Q = np.column_stack([s * r["q"] for _, s, r in evaluated])
+        n_modes, n_comp = shear.shape
+
+        # One (modes x components) combination per damping value, usually one.
+        base_shear = np.zeros(n_comp)
+        disp = np.zeros((store.n_nodes * 6, n_comp))
+        groups = {}
+        for c, (_, _, r) in enumerate(evaluated):
+            groups.setdefault(r["zeta"], []).append(c)
+        for cols in groups.values():
+            rho = self._correlation(evaluated[cols[0]][2], modal_comb)
+            base_shear[cols] = self.combine_shear(shear[:, cols], rho)
+            if store.n_nodes > 0 and n_modes > 0:
+                disp[:, cols] = self.combine_modal(store.phi[:, :n_modes], Q[:, cols], rho)
+
+        forces = np.zeros((3, n_comp))
+        for c, direction in enumerate(directions):
+            if direction in ("X", "Y", "Z"):
+                forces["XYZ".index(direction), c] = base_shear[c] * self._total_weight(direction)
+
+        final_Fx, final_Fy, final_Fz = (float(v) for v in self.combine_directions(forces, dir_comb))
+        final_displacements = {}
+        if store.n_nodes > 0 and n_modes > 0:
+            final_displacements = store.node_table(self.combine_directions(disp, dir_comb))
+
+        rsa_detailed = {}
+        summary_items = []
+        for c, (direction, _, responses) in enumerate(evaluated):
+            print(f"\n[{direction}] Base Shear Coeff: {base_shear[c]:.5f}")
+            rsa_detailed[direction] = self._detailed_table(responses)
+            summary_items.append({
+                "label": f"Base Shear Coeff ({direction})",
+                "value": float(base_shear[c]),
+                "desc": f"V / W_total ({direction})"
+            })
+
+        results = {
+            "status": "SUCCESS",
+            "rsa_info": {"type": "Response Spectrum Combined", "method": dir_comb},
+            "base_shear_coeff": float(self.combine_directions(base_shear, dir_comb)),
+            "displacements": final_displacements,
+            "base_reaction": {
+                "Fx": final_Fx,
+                "Fy": final_Fy,
+                "Fz": final_Fz,
+                "Mx": 0.0, "My": 0.0, "Mz": 0.0
+            },
+            "rsa_detailed": rsa_detailed,
+            "rsa_summary": summary_items
+        }
+
+        if output_path is not None:
+            if os.path.abspath(output_path) == os.path.abspath(self.modal_path):
+                full_data = dict(modal_data)
+                if "modal_store" in full_data:
+                    # Lazy view of the binary store, not part of the JSON.
+                    full_data.pop("mode_shapes", None)
+            else:
+                try:
+                    with open(output_path, 'r') as f:
+                        full_data = json.load(f)
+                except (OSError, ValueError):
+                    full_data = {}
+            full_data.update(results)
+            with open(output_path, 'w') as f:
+                json.dump(full_data, f, indent=4)
+            print(f"RSA results saved to {output_path}")
+        return results
+
+    def run_sweep(self, parameter_sets, direction="X", modal_comb="SRSS", output_path=None):
+        """
+        One direction for many spectrum parameter sets (site studies): all
+        spectra are evaluated as one (n_sets, n_modes) array and the sets
+        are combined together, one pass over phi per damping value.
+
+        Args:
+            parameter_sets (list): dicts with the keys of a spectrum function
+                definition plus "Damping" (default 0.05) and an optional
+                "Name", e.g. from spectrum_sweep.read_sweep_table.
+            output_path (str): when given, the result table is written there
+                as CSV.
+
+        Returns:
+            dict: "table" (one row per set: parameters, SDS, SD1, base shear
+            coefficient and force, peak Ux/Uy/Uz and their nodes),
+            "base_shear_coeff" (n_sets,), "displacements" (n_sets,
+            n_nodes * 6) combined peaks in modal store order, "node_ids".
+        """
+        print(f"--- RSA SWEEP STARTED ({len(parameter_sets)} spectra, {direction}-Direction, "
+              f"Modal Comb: {modal_comb}) ---")
+        _, store = self._load_modal()
+
+        g = 9.81
+        axis = {"X": "x", "Y": "y"}.get(direction, "z")
+        T = store.column("periods", "T")
+        omega = store.column("periods", "omega")
+        ratio = store.column("participation", "U" + axis)
+        gamma = store.column("participation", "Gamma_" + axis)
+        n_sets, n_modes = len(parameter_sets), len(T)
+
+        spec_Sa, params = self.generator.evaluate_sets(T, parameter_sets)
+        zeta = np.array([p.get("Damping", 0.05) for p in parameter_sets], dtype=float)
+        eta = np.array([self.damping_correction(z) for z in zeta])
+        sar_g = spec_Sa * eta[:, None]
+
+        rigid = omega <= 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sd = np.where(rigid, 0.0, sar_g * g / omega**2)
+        shear = sar_g * ratio
+        Q = sd * gamma
+
+        base_shear = np.zeros(n_sets)
+        combined = np.zeros((store.n_nodes * 6, n_sets))
+        groups = {}
+        for s, z in enumerate(zeta):
+            groups.setdefault(z, []).append(s)
+        for z, sets in groups.items():
+            rho = self._correlation({"zeta": z, "omega": omega}, modal_comb)
+            base_shear[sets] = self.combine_shear(shear[sets].T, rho)
+            if store.n_nodes > 0 and n_modes > 0:
+                combined[:, sets] = self.combine_modal(store.phi[:, :n_modes], Q[sets].T, rho)
+
+        weight = self._total_weight(direction)
+        U = combined.reshape(store.n_nodes, 6, n_sets)
+
+        print("\n Set | Name                 |    SDS |    SD1 | Base Shear Coeff")
+        print("-" * 65)
+        table = []
+        for s, p in enumerate(parameter_sets):
+            name = str(p.get("Name", f"Set {s+1}"))
+            row = {key: p.get(key, "") for key in SWEEP_PARAMETERS}
+            row.update({
+                "Name": name,
+                "Damping": float(zeta[s]),
+                "Direction": p.get("Direction", "Horizontal"),
+                "SDS": params[s]["SDS"],
+                "SD1": params[s]["SD1"],
+                "V_coeff": float(base_shear[s]),
+                "V": float(base_shear[s] * weight)
+            })
+            for j, dof in enumerate(("Ux", "Uy", "Uz")):
+                if store.n_nodes > 0:
+                    i = int(np.argmax(U[:, j, s]))
+                    row[f"max_{dof}"] = float(U[i, j, s])
+                    row[f"node_{dof}"] = store.node_ids[i]
+                else:
+                    row[f"max_{dof}"], row[f"node_{dof}"] = 0.0, ""
+            table.append(row)
+            print(f"{s+1:4} | {name[:20]:20} | {row['SDS']:6.3f} | {row['SD1']:6.3f} | {row['V_coeff']:10.5f}")
+
+        if output_path is not None:
+            write_sweep_table(output_path, table)
+            print(f"RSA sweep table saved to {output_path}")
+
+        return {
+            "status": "SUCCESS",
+            "analysis_direction": direction,
+            "table": table,
+            "base_shear_coeff": base_shear,
+            "displacements": combined.T,
+            "node_ids": store.node_ids
         }
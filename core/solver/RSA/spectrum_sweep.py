@@ -0,0 +1,39 @@
+import csv
+
+# Columns of a sweep parameter table: the keys of a spectrum function
+# definition plus the damping ratio and an optional label.
+SWEEP_PARAMETERS = ("Name", "Ss", "S1", "SiteClass", "R", "D", "I", "TL", "Damping", "Direction")
+NUMERIC_PARAMETERS = ("Ss", "S1", "R", "D", "I", "TL", "Damping")
+SWEEP_DEFAULTS = {"TL": 6.0, "Damping": 0.05, "Direction": "Horizontal"}
+
+def read_sweep_table(path):
+    """
+    Spectrum parameter sets from a CSV with a header row of SWEEP_PARAMETERS
+    (Name, TL, Damping and Direction are optional).
+
+    Returns:
+        list: one dict per row, numbers converted to float.
+    """
+    parameter_sets = []
+    with open(path, 'r', newline='') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            row = {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+            params = dict(SWEEP_DEFAULTS)
+            params.update(row)
+            for key in NUMERIC_PARAMETERS:
+                if key not in params:
+                    raise ValueError(f"Row {i+1}: missing '{key}'")
+                params[key] = float(params[key])
+            params.setdefault("Name", f"Set {i+1}")
+            params["SiteClass"] = params.get("SiteClass", "ZC").upper()
+            parameter_sets.append(params)
+    return parameter_sets
+
+def write_sweep_table(path, table):
+    """Writes the sweep result rows (dicts with the same keys) as CSV."""
+    if not table:
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(table[0].keys()))
+        writer.writeheader()
+        writer.writerows(table)
@@ -1,5 +1,7 @@
 import numpy as np
 
+SPECTRUM_DIRECTIONS = ("Horizontal", "Vertical")
+
 class TSC2018SpectrumGenerator:
     """
     Turkish Seismic Code 2018 (TBDY) Spectrum Generator.
@@ -48,11 +50,12 @@ class TSC2018SpectrumGenerator:
         return 0.2 * (sd1 / sds), (sd1 / sds), tl
 
     def calculate_horizontal_sa(self, T, sds, sd1, ta, tb, tl):
-        """Horizontal Elastic Design Spectrum"""
-        if T < ta: return sds * (0.4 + 0.6 * (T / ta))
-        elif T <= tb: return sds
-        elif T <= tl: return sd1 / T
-        else: return sd1 * tl / (T**2)
+        """Horizontal Elastic Design Spectrum, for a period or an array of periods"""
+        T = np.asarray(T, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.select([T <= 0, T < ta, T <= tb, T <= tl],
+                             [0.4 * sds, sds * (0.4 + 0.6 * (T / ta)), sds, sd1 / T],
+                             sd1 * tl / (T**2))
 
     def calculate_vertical_sa(self, T, sds, ta, tb, tl):
         """
@@ -62,65 +65,114 @@ class TSC2018SpectrumGenerator:
         tad = ta / 3.0
         tbd = tb / 3.0
         tld = tl / 2.0
-        
-        if T < tad: return sds * (0.32 + 0.48 * (T / tad))
-        elif T <= tbd: return 0.8 * sds
-        elif T <= tld: return 0.8 * sds * tbd / T
-        else: return 0.0                                                                
+
+        T = np.asarray(T, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.select([T <= 0, T < tad, T <= tbd, T <= tld],
+                             [0.32 * sds, sds * (0.32 + 0.48 * (T / tad)), 0.8 * sds, 0.8 * sds * tbd / T],
+                             0.0)
 
     def calculate_reduction_factor(self, T, R, D, I, tb):
-        """Seismic Load Reduction Factor R_a(T)"""
+        """Seismic Load Reduction Factor R_a(T), for a period or an array of periods"""
+        T = np.asarray(T, dtype=float)
         Ra_target = R / I
-        if T > tb: return Ra_target
-        else: return D + ((Ra_target - D) * (T / tb))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(np.asarray(tb) > 0, T / tb, 0.0)
+        return np.where(T > tb, Ra_target, D + (Ra_target - D) * ratio)
 
-    def generate_spectrum_curve(self, ss, s1, site_class, R, D, I, tl=6.0, direction="Horizontal", t_max=6.0):
-                                              
+    @staticmethod
+    def is_vertical(direction):
+        """True for the Vertical spectrum; raises ValueError for unknown directions."""
+        if direction not in SPECTRUM_DIRECTIONS:
+            raise ValueError(f"Spectrum direction '{direction}'. Supported: {', '.join(SPECTRUM_DIRECTIONS)}")
+        return direction == "Vertical"
+
+    def spectrum_params(self, ss, s1, site_class, tl=6.0):
+        """Site coefficients, design accelerations and corner periods."""
         fs, f1 = self.get_coeffs(ss, s1, site_class)
         sds = ss * fs
         sd1 = s1 * f1
         ta, tb, tl = self.calculate_corner_periods(sds, sd1, tl)
-        
-        if direction == "Horizontal":
-            key_points = [0.0, ta, tb, tl]
+        return {"Fs": fs, "F1": f1, "SDS": sds, "SD1": sd1, "TA": ta, "TB": tb, "TL": tl}
+
+    def evaluate(self, T, ss, s1, site_class, R, D, I, tl=6.0, direction="Horizontal"):
+        """
+        Design spectral acceleration (g) at any periods, in closed form:
+        Sae(T) / R_a(T) for Horizontal, SaeD(T) for Vertical.
+
+        Args:
+            T (float or np.ndarray): period(s) in seconds.
+
+        Returns:
+            (sa, params): sa has the shape of T; params as in
+            generate_spectrum_curve plus TL and, for Horizontal, "Ra" (R_a(T)
+            with the shape of T).
+        """
+        params = self.spectrum_params(ss, s1, site_class, tl)
+        sds, sd1 = params["SDS"], params["SD1"]
+        ta, tb, tl = params["TA"], params["TB"], params["TL"]
+
+        if self.is_vertical(direction):
+            return self.calculate_vertical_sa(T, sds, ta, tb, tl), params
+        ra = self.calculate_reduction_factor(T, R, D, I, tb)
+        params["Ra"] = ra
+        return self.calculate_horizontal_sa(T, sds, sd1, ta, tb, tl) / ra, params
+
+    def evaluate_sets(self, T, parameter_sets):
+        """
+        Design spectral accelerations (g) of many spectra at the same
+        periods, as one (n_sets, n_periods) array. The corner periods and
+        factors of every set broadcast against T, so the spectra are
+        evaluated together.
+
+        Args:
+            T (np.ndarray): (n_periods,) periods in seconds.
+            parameter_sets (list): dicts with the keys of a spectrum function
+                definition: Ss, S1, SiteClass, R, D, I, TL (default 6.0) and
+                Direction (default "Horizontal").
+
+        Returns:
+            (sa, params): sa is (n_sets, n_periods); params is one dict per
+            set as returned by spectrum_params.
+        """
+        params = [self.spectrum_params(p['Ss'], p['S1'], p['SiteClass'], p.get('TL', 6.0))
+                  for p in parameter_sets]
+
+        def column(values):
+            return np.array(values, dtype=float)[:, None]
+
+        sds, sd1 = column([p["SDS"] for p in params]), column([p["SD1"] for p in params])
+        ta, tb, tl = (column([p[k] for p in params]) for k in ("TA", "TB", "TL"))
+        R, D, I = (column([p[k] for p in parameter_sets]) for k in ("R", "D", "I"))
+        vertical = column([self.is_vertical(p.get("Direction", "Horizontal")) for p in parameter_sets]) > 0
+
+        T = np.asarray(T, dtype=float)[None, :]
+        horizontal = self.calculate_horizontal_sa(T, sds, sd1, ta, tb, tl) / \
+            self.calculate_reduction_factor(T, R, D, I, tb)
+        sa = np.where(vertical, self.calculate_vertical_sa(T, sds, ta, tb, tl), horizontal)
+        return sa, params
+
+    def generate_spectrum_curve(self, ss, s1, site_class, R, D, I, tl=6.0, direction="Horizontal", t_max=6.0):
+        """
+        Spectrum at the corner periods and a 0.2 s grid up to t_max (grid
+        points closer than 0.1 s to a corner are dropped), for tables and
+        exports. Use evaluate() for values at arbitrary periods.
+        """
+        params = self.spectrum_params(ss, s1, site_class, tl)
+        ta, tb, tl = params["TA"], params["TB"], params["TL"]
+
+        if self.is_vertical(direction):
+            key_points = np.array([0.0, ta/3.0, tb/3.0, tl/2.0])
         else:
-                                            
-            key_points = [0.0, ta/3.0, tb/3.0, tl/2.0]
+            key_points = np.array([0.0, ta, tb, tl])
 
         step = 0.2
-                                                              
-        raw_grid = np.arange(step, t_max + step, step) 
-        
-        final_list = list(key_points)
-        
-        for t_grid in raw_grid:
-                                                 
-            min_dist = min(abs(t_grid - k) for k in key_points)
-            
-            if min_dist >= 0.1:
-                final_list.append(t_grid)
-        
-        periods = np.unique(np.array(final_list))
-        periods.sort()
-        
-        sa_values = []
-        for T in periods:
-            if direction == "Horizontal":
-                if T == 0:
-                    sae = 0.4 * sds
-                    ra = D
-                else:
-                    sae = self.calculate_horizontal_sa(T, sds, sd1, ta, tb, tl)
-                    ra = self.calculate_reduction_factor(T, R, D, I, tb)
-                val = sae / ra
-            else:
-                if T == 0:
-                    val = 0.32 * sds
-                else:
-                    val = self.calculate_vertical_sa(T, sds, ta, tb, tl)
-            
-            sa_values.append(val)
-            
-        return periods, np.array(sa_values), {
-            "Fs": fs, "F1": f1, "SDS": sds, "SD1": sd1, "TA": ta, "TB": tb
+        raw_grid = np.arange(step, t_max + step, step)
+        min_dist = np.min(np.abs(raw_grid[:, None] - key_points[None, :]), axis=1)
+        periods = np.unique(np.concatenate([key_points, raw_grid[min_dist >= 0.1]]))
+
+        sa_values, _ = self.evaluate(periods, ss, s1, site_class, R, D, I, tl, direction)
+        return periods, sa_values, {
+            "Fs": params["Fs"], "F1": params["F1"], "SDS": params["SDS"], "SD1": params["SD1"],
+            "TA": ta, "TB": tb
         }
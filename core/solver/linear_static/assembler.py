@@ -1,25 +1,79 @@
                                                           
 import numpy as np
-from scipy.sparse import lil_matrix
-from element_library import get_local_stiffness_matrix, get_rotation_matrix, get_eccentricity_matrix
+from scipy.sparse import lil_matrix, csc_matrix
+from element_library import (get_local_stiffness_matrix, get_rotation_matrix, get_eccentricity_matrix,
+                            get_local_stiffness_matrices, get_rotation_matrices, get_eccentricity_matrices)
 from matrix_spy import MatrixSpy
+from stiffness_cache import ElementStiffnessCache
+from block_sparse import blocks_to_bsr
+
+ASSEMBLY_MODES = ("coo", "lil", "bsr")
 
 class GlobalAssembler:
-    def __init__(self, data_manager,export_path=None):
-        self.dm = data_manager
-        self.spy = MatrixSpy(export_path)
+    def __init__(self, data_manager, export_path=None, assembly_mode="coo", stiffness_cache=None):
+        """
+        assembly_mode:   "coo" (vectorized triplet assembly, default),
+                         "lil" (legacy per-block LIL insertion) or
+                         "bsr" (vectorized, 6x6 node-block BSR; see block_sparse).
+        stiffness_cache: optional shared ElementStiffnessCache; a private
+                         one is created when omitted.
+        """
+        if assembly_mode not in ASSEMBLY_MODES:
+            raise ValueError(f"Unknown assembly mode '{assembly_mode}'. Expected one of {ASSEMBLY_MODES}.")
 
         self.dm = data_manager
+        self.spy = MatrixSpy(export_path)
+        self.assembly_mode = assembly_mode
+        self.stiffness_cache = stiffness_cache if stiffness_cache is not None else ElementStiffnessCache()
                                   
-        self.K = lil_matrix((self.dm.total_dofs, self.dm.total_dofs))
+        self.K = None
+        self.K_ff = None
+        self.K_rf = None
+        self.is_free = None
                                 
         self.P = np.zeros(self.dm.total_dofs)
 
-    def assemble_system(self):
-        """Master function to build K and P."""
+    def assemble_system(self, partitioned=False):
+        """
+        Master function to build K and P.
+        With partitioned=True the first item is K_ff (see assemble_stiffness).
+        """
+        K = self.assemble_stiffness(partitioned)
+        self.assemble_load_vector()
+        self.spy.save_to_json()
+
+        self._report_cache_stats()
+        return K, self.P
+
+    def assemble_stiffness(self, partitioned=False):
+        """
+        Builds K only. Independent of the active load case.
+
+        partitioned=True scatters straight into the free-DOF block K_ff and
+        the restrained/free coupling block K_rf (used for reactions), so the
+        full K is never formed. Returns K_ff; K_rf and the free-DOF mask are
+        kept on the assembler. In "bsr" mode the free DOFs do not form whole
+        node blocks, so the full block matrix is kept and returned instead
+        (K_ff / K_rf stay None); LinearSolver works on it directly.
+        """
         print("Assembler: Building Stiffness Matrix...")
+        if partitioned:
+            self.is_free = self.dm.free_dof_mask()
+            self._build_stiffness(self.is_free)
+            return self.K if self.assembly_mode == "bsr" else self.K_ff
+
         self._build_stiffness()
-        
+        return self.K
+
+    def assemble_load_vector(self):
+        """
+        Builds a fresh P for the data manager's active load case.
+        Can be called repeatedly after dm.set_load_case() without
+        touching K; the MatrixSpy FEFs are reset for each call.
+        """
+        self.P = np.zeros(self.dm.total_dofs)
+        self.spy.reset_fef()
+
         print("Assembler: Processing Nodal Loads...")
                             
         self.P += self.dm.build_load_vector()
@@ -27,59 +81,75 @@ class GlobalAssembler:
         print("Assembler: Processing Member Loads (FEF)...")
                                                    
         self._add_member_loads()
-        self.spy.save_to_json()
-        return self.K, self.P
+        return self.P
 
-    def _build_stiffness(self):
-        for el in self.dm.elements:
-                                          
-            mat = el['material']
-            sec = el['section']
-            L = el['L_clear'] 
-            L_total = el['L_total']
-            
-            k_local = get_local_stiffness_matrix(
-                E=mat['E'], G=mat['G'], A=sec['A'], J=sec['J'],
-                I22=sec['I22'], I33=sec['I33'],
-                As2=sec['As2'], As3=sec['As3'], L=L, L_tor=L_total
-            )
+    def _report_cache_stats(self):
+        stats = self.stiffness_cache.stats()
+        print(f"Assembler: Stiffness cache {stats['hits']}/{stats['lookups']} hits "
+              f"({stats['hit_rate']*100:.1f}%), {stats['size']} distinct signatures.")
 
-            if any(el['releases'][0]) or any(el['releases'][1]):
-                k_local = self._condense_matrix(k_local, el['releases'])
+    def _build_stiffness(self, is_free=None):
+        """
+        Dispatches to the selected stiffness assembly strategy. With a
+        free-DOF mask the result is K_ff / K_rf instead of K.
+        """
+        if self.assembly_mode == "bsr":
+            self._build_stiffness_bsr()
+        elif self.assembly_mode == "lil":
+            self._build_stiffness_lil()
+            if is_free is not None:
+                K_csc = self.K.tocsc()
+                self.K_ff = K_csc[is_free, :][:, is_free]
+                self.K_rf = K_csc[~is_free, :][:, is_free]
+                self.K = None
+        else:
+            self._build_stiffness_coo(is_free)
+
+    def _element_global_stiffness(self, el):
+        """
+        Returns the 12x12 global stiffness of one element and records the
+        local stiffness and transformation matrices in the MatrixSpy.
+        """
+        k_local = self._local_stiffness(el)
 
-            idx_i, idx_j = el['node_indices']
-            p1 = self.dm.nodes[idx_i]['coords']
-            p2 = self.dm.nodes[idx_j]['coords']
-            
-            global_off_i = np.array(el['offsets'][0]) 
-            global_off_j = np.array(el['offsets'][1])
-            
-            p1_adj = p1 + global_off_i
-            p2_adj = p2 + global_off_j
-            
-            R_3x3 = get_rotation_matrix(p1_adj, p2_adj, el['beta'])
-            
-            T_rot = np.zeros((12, 12))
-            for i in range(4): 
-                T_rot[i*3:(i+1)*3, i*3:(i+1)*3] = R_3x3
-            
-            global_off_i = np.array(el['offsets'][0]) 
-            global_off_j = np.array(el['offsets'][1])
+        idx_i, idx_j = el['node_indices']
+        p1 = self.dm.nodes[idx_i]['coords']
+        p2 = self.dm.nodes[idx_j]['coords']
+        
+        global_off_i = np.array(el['offsets'][0]) 
+        global_off_j = np.array(el['offsets'][1])
+        
+        p1_adj = p1 + global_off_i
+        p2_adj = p2 + global_off_j
+        
+        R_3x3 = get_rotation_matrix(p1_adj, p2_adj, el['beta'])
+        
+        T_rot = np.zeros((12, 12))
+        for i in range(4): 
+            T_rot[i*3:(i+1)*3, i*3:(i+1)*3] = R_3x3
 
-            local_off_i = R_3x3 @ global_off_i
-            local_off_j = R_3x3 @ global_off_j
-            
-            local_off_i[0] += el.get('end_off_i', 0.0) 
-            local_off_j[0] -= el.get('end_off_j', 0.0)
+        local_off_i = R_3x3 @ global_off_i
+        local_off_j = R_3x3 @ global_off_j
+        
+        local_off_i[0] += el.get('end_off_i', 0.0) 
+        local_off_j[0] -= el.get('end_off_j', 0.0)
 
-            T_ecc = get_eccentricity_matrix(local_off_i, local_off_j) 
-                                   
-            T_total = T_ecc @ T_rot
+        T_ecc = get_eccentricity_matrix(local_off_i, local_off_j) 
+                               
+        T_total = T_ecc @ T_rot
 
-            self.spy.record_matrices(el['id'], k_local, T_total)
+        self.spy.record_matrices(el['id'], k_local, T_total)
 
-            k_global = T_total.T @ k_local @ T_total
+        return T_total.T @ k_local @ T_total
+
+    def _build_stiffness_lil(self):
+        """Legacy path: adds four 6x6 blocks per element into a LIL matrix."""
+        self.K = lil_matrix((self.dm.total_dofs, self.dm.total_dofs))
 
+        for el in self.dm.elements:
+            k_global = self._element_global_stiffness(el)
+
+            idx_i, idx_j = el['node_indices']
             start_i = idx_i * 6
             start_j = idx_j * 6
             
@@ -88,6 +158,200 @@ class GlobalAssembler:
             self.K[start_j:start_j+6, start_i:start_i+6] += k_global[6:12, 0:6]
             self.K[start_j:start_j+6, start_j:start_j+6] += k_global[6:12, 6:12]
 
+    def _build_stiffness_coo(self, is_free=None):
+        """
+        Computes the local, rotation and eccentricity matrices of all elements
+        as stacked tensors, transforms them with one batched matmul, and
+        builds K in a single CSC conversion from the resulting triplets.
+        With is_free, restrained DOFs are mapped out of the triplets and
+        K_ff / K_rf are built instead.
+        """
+        elements = self.dm.elements
+        n = self.dm.total_dofs
+
+        if not elements:
+            if is_free is None:
+                self.K = csc_matrix((n, n))
+            else:
+                n_f = int(is_free.sum())
+                self.K_ff = csc_matrix((n_f, n_f))
+                self.K_rf = csc_matrix((n - n_f, n_f))
+            return
+
+        k_global = self._batched_global_stiffness(elements)
+
+        node_idx = np.array([el['node_indices'] for el in elements], dtype=np.int64)
+        dofs = (node_idx[:, :, None] * 6 + np.arange(6)).reshape(len(elements), 12)
+
+        if is_free is None:
+            rows = np.repeat(dofs, 12, axis=1).ravel()
+            cols = np.tile(dofs, (1, 12)).ravel()
+            self.K = self._triplets_to_csc(rows, cols, k_global.ravel(), n)
+            return
+
+        # Map every element DOF to its position in the free or restrained
+        # set and keep only the ff / rf entries of each element matrix.
+        n_f = int(is_free.sum())
+        dof_free = is_free[dofs]
+        pos = np.where(dof_free, (np.cumsum(is_free) - 1)[dofs], (np.cumsum(~is_free) - 1)[dofs])
+
+        rows = np.broadcast_to(pos[:, :, None], k_global.shape)
+        cols = np.broadcast_to(pos[:, None, :], k_global.shape)
+        ff = dof_free[:, :, None] & dof_free[:, None, :]
+        rf = ~dof_free[:, :, None] & dof_free[:, None, :]
+
+        self.K_ff = self._triplets_to_csc(rows[ff], cols[ff], k_global[ff], n_f)
+        self.K_rf = self._triplets_to_csc(rows[rf], cols[rf], k_global[rf], n - n_f, n_f)
+
+    def _build_stiffness_bsr(self):
+        """
+        Same batched kernels as the COO path, but every element matrix is
+        scattered as four 6x6 node blocks into a block-sparse-row K.
+        """
+        elements = self.dm.elements
+        n_nodes = self.dm.total_dofs // 6
+
+        if not elements:
+            self.K = blocks_to_bsr(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                                   np.zeros((0, 6, 6)), n_nodes)
+            return
+
+        k_global = self._batched_global_stiffness(elements)
+        node_idx = np.array([el['node_indices'] for el in elements], dtype=np.int64)
+
+        # (n_elem, 12, 12) -> (n_elem, 2, 2, 6, 6): blocks ii, ij, ji, jj per element.
+        blocks = k_global.reshape(len(elements), 2, 6, 2, 6).transpose(0, 1, 3, 2, 4)
+        block_rows = np.repeat(node_idx, 2, axis=1).ravel()
+        block_cols = np.tile(node_idx, (1, 2)).ravel()
+
+        self.K = blocks_to_bsr(block_rows, block_cols, blocks.reshape(-1, 6, 6), n_nodes)
+
+    def _batched_global_stiffness(self, elements):
+        """Returns the (n_elem, 12, 12) global element stiffness T^T k T and records the spy matrices."""
+        k_local = self._batched_local_stiffness(elements)
+        T_total = self._batched_transformations(elements)
+
+        for e, el in enumerate(elements):
+            self.spy.record_matrices(el['id'], k_local[e], T_total[e])
+
+        return np.transpose(T_total, (0, 2, 1)) @ k_local @ T_total
+
+    def _local_stiffness(self, el):
+        """Returns the (release-condensed) local stiffness of one element via the cache."""
+        def compute():
+            k = self._raw_local_stiffness(el)
+            if any(el['releases'][0]) or any(el['releases'][1]):
+                k = self._condense_matrix(k, el['releases'])
+            return k
+
+        return self.stiffness_cache.get(ElementStiffnessCache.signature(el), compute)
+
+    def _raw_local_stiffness(self, el):
+        """Returns the uncondensed local stiffness of one element via the cache."""
+        def compute():
+            mat = el['material']
+            sec = el['section']
+            return get_local_stiffness_matrix(
+                E=mat['E'], G=mat['G'], A=sec['A'], J=sec['J'],
+                I22=sec['I22'], I33=sec['I33'],
+                As2=sec['As2'], As3=sec['As3'],
+                L=el['L_clear'], L_tor=el['L_total']
+            )
+
+        key = ElementStiffnessCache.signature(el, kind="raw", use_releases=False)
+        return self.stiffness_cache.get(key, compute)
+
+    def _batched_local_stiffness(self, elements):
+        """
+        Returns the (n_elem, 12, 12) local stiffness tensor, condensed for
+        releases. Only one representative per distinct signature is computed.
+        """
+        keys = [ElementStiffnessCache.signature(el) for el in elements]
+        return self.stiffness_cache.get_many(
+            keys, lambda idx: self._compute_local_stiffness([elements[i] for i in idx])
+        )
+
+    def _compute_local_stiffness(self, elements):
+        """Evaluates the batched local stiffness kernel and condenses released elements."""
+        mat = np.array([[el['material']['E'], el['material']['G']] for el in elements], dtype=float)
+        sec = np.array([[el['section'][key] for key in ('A', 'J', 'I22', 'I33', 'As2', 'As3')]
+                        for el in elements], dtype=float)
+        L_clear = np.array([el['L_clear'] for el in elements], dtype=float)
+        L_total = np.array([el['L_total'] for el in elements], dtype=float)
+
+        k_local = get_local_stiffness_matrices(
+            E=mat[:, 0], G=mat[:, 1], A=sec[:, 0], J=sec[:, 1],
+            I22=sec[:, 2], I33=sec[:, 3], As2=sec[:, 4], As3=sec[:, 5],
+            L=L_clear, L_tor=L_total
+        )
+
+        for e, el in enumerate(elements):
+            if any(el['releases'][0]) or any(el['releases'][1]):
+                k_local[e] = self._condense_matrix(k_local[e], el['releases'])
+
+        return k_local
+
+    def _batched_transformations(self, elements):
+        """Returns the (n_elem, 12, 12) tensor of T_ecc @ T_rot for every element."""
+        coords = np.array([node['coords'] for node in self.dm.nodes], dtype=float)
+        node_idx = np.array([el['node_indices'] for el in elements], dtype=np.int64)
+
+        global_off_i = np.array([el['offsets'][0] for el in elements], dtype=float)
+        global_off_j = np.array([el['offsets'][1] for el in elements], dtype=float)
+        beta = np.array([el['beta'] for el in elements], dtype=float)
+
+        p1_adj = coords[node_idx[:, 0]] + global_off_i
+        p2_adj = coords[node_idx[:, 1]] + global_off_j
+
+        R = get_rotation_matrices(p1_adj, p2_adj, beta)
+
+        T_rot = np.zeros((len(elements), 12, 12))
+        for i in range(4):
+            T_rot[:, i*3:(i+1)*3, i*3:(i+1)*3] = R
+
+        local_off_i = np.einsum('nij,nj->ni', R, global_off_i)
+        local_off_j = np.einsum('nij,nj->ni', R, global_off_j)
+
+        local_off_i[:, 0] += np.array([el.get('end_off_i', 0.0) for el in elements], dtype=float)
+        local_off_j[:, 0] -= np.array([el.get('end_off_j', 0.0) for el in elements], dtype=float)
+
+        T_ecc = get_eccentricity_matrices(local_off_i, local_off_j)
+
+        return T_ecc @ T_rot
+
+    @staticmethod
+    def _triplets_to_csc(rows, cols, vals, n, n_cols=None):
+        """
+        Builds an n x n (or n x n_cols) CSC matrix from (row, col, value) triplets, summing
+        duplicates in their input order. A stable sort keeps the summation
+        order of every entry the same as element-by-element accumulation,
+        so the matrix matches the LIL path bit for bit.
+        """
+        keys = cols * n + rows
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        vals = vals[order]
+
+        is_start = np.r_[True, keys[1:] != keys[:-1]] if len(keys) else np.zeros(0, dtype=bool)
+        starts = np.flatnonzero(is_start)
+        group = np.cumsum(is_start) - 1
+        rank = np.arange(len(keys)) - starts[group]
+
+        data = np.zeros(len(starts))
+        for r in range(rank.max() + 1 if len(rank) else 0):
+            sel = rank == r
+            data[group[sel]] += vals[sel]
+        keys = keys[starts]
+
+        if n_cols is None:
+            n_cols = n
+        indices = keys % n if n else keys
+        indptr = np.searchsorted(keys // n if n else keys, np.arange(n_cols + 1))
+
+        K = csc_matrix((data, indices, indptr), shape=(n, n_cols))
+        K.eliminate_zeros()
+        return K
+
     def _condense_matrix(self, k, releases):
         rel_vec = releases[0] + releases[1]
         idx_k = [i for i, r in enumerate(rel_vec) if not r]
@@ -167,10 +431,12 @@ class GlobalAssembler:
         
         return fef_combined
     
-    def _condense_fef(self, k_local, fef_local, releases):
+    def _condense_fef(self, k_local, fef_local, releases, cache_key=None):
         """
         Adjusts the Fixed End Forces (FEF) to account for member releases.
         Mathematically moves the moment from the pinned end to the fixed end.
+        When cache_key is given, the condensation operator K_kc @ inv(K_cc)
+        is memoized so repeated loads on identical members skip the inverse.
         """
                                                         
         rel_vec = releases[0] + releases[1]                      
@@ -180,29 +446,32 @@ class GlobalAssembler:
         
         if not idx_c: 
             return fef_local
-            
-        K_cc = k_local[np.ix_(idx_c, idx_c)]
-        K_kc = k_local[np.ix_(idx_k, idx_c)]
+
+        def compute():
+            K_cc = k_local[np.ix_(idx_c, idx_c)]
+            K_kc = k_local[np.ix_(idx_k, idx_c)]
+            try:
+                return K_kc @ np.linalg.inv(K_cc)
+            except np.linalg.LinAlgError:
+                return None
+
+        if cache_key is not None:
+            operator = self.stiffness_cache.get(cache_key, compute)
+        else:
+            operator = compute()
+
+        if operator is None:
+            print("Warning: Unstable release configuration in load condensation.")
+            return fef_local
         
         F_k = fef_local[idx_k]                      
         F_c = fef_local[idx_c]                                          
         
-        try:
-                                                    
-            K_cc_inv = np.linalg.inv(K_cc)
-            correction = K_kc @ (K_cc_inv @ F_c)
-            
-            F_k_new = F_k - correction
-            
-            fef_new = np.zeros(12)
-            fef_new[idx_k] = F_k_new
-            fef_new[idx_c] = 0.0                                        
-            
-            return fef_new
-            
-        except np.linalg.LinAlgError:
-            print("Warning: Unstable release configuration in load condensation.")
-            return fef_local
+        fef_new = np.zeros(12)
+        fef_new[idx_k] = F_k - operator @ F_c
+        fef_new[idx_c] = 0.0                                        
+        
+        return fef_new
 
     def _add_member_loads(self):
         """
@@ -211,6 +480,7 @@ class GlobalAssembler:
         """
         print("Assembler: Processing Member Loads (FEF)...")
         active_patterns = {pat: scale for pat, scale in self.dm.load_case['patterns']}
+        elements_by_id = {e['id']: e for e in self.dm.elements}
         
         for load in self.dm.raw['loads']:
                              
@@ -219,7 +489,7 @@ class GlobalAssembler:
             
             scale = active_patterns[load['pattern']]
             
-            el = next((e for e in self.dm.elements if e['id'] == load['element_id']), None)
+            el = elements_by_id.get(load['element_id'])
             if not el: continue
             
             L_clear = el['L_clear']
@@ -233,12 +503,7 @@ class GlobalAssembler:
             
             mat = el['material']
             sec = el['section']
-            k_raw = get_local_stiffness_matrix(
-                E=mat['E'], G=mat['G'], A=sec['A'], J=sec['J'],
-                I22=sec['I22'], I33=sec['I33'],
-                As2=sec['As2'], As3=sec['As3'], 
-                L=L_clear, L_tor=L_total
-            )
+            k_raw = self._raw_local_stiffness(el)
 
             fef_local = np.zeros(12)
             R_3x3 = get_rotation_matrix(p1, p2, el['beta'])
@@ -300,7 +565,8 @@ class GlobalAssembler:
                     fef_local = self._get_exact_fef_via_stiffness(L_clear, a_dist, P_local, mat, sec)
                     
             if any(el['releases'][0]) or any(el['releases'][1]):
-                fef_local = self._condense_fef(k_raw, fef_local, el['releases'])
+                fef_local = self._condense_fef(k_raw, fef_local, el['releases'],
+                                               cache_key=ElementStiffnessCache.signature(el, kind="fef"))
 
             self.spy.record_fef(el['id'], fef_local)
             
@@ -0,0 +1,75 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from data_manager import DataManager
+from assembler import GlobalAssembler, ASSEMBLY_MODES
+from block_sparse import index_bytes
+from dof_renumbering import renumbering_report, print_renumbering_report
+
+def compare_assembly_modes(json_path, case_name="DEAD", repeats=3):
+    """
+    Times the stiffness assembly of every mode in ASSEMBLY_MODES on the
+    same model and checks that all of them produce the same K.
+
+    Returns:
+        dict: {mode: best wall time in seconds}
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        dm = DataManager(json_path)
+        dm.process_all(case_name=case_name)
+
+    timings = {}
+    matrices = {}
+    stored = {}
+
+    for mode in ASSEMBLY_MODES:
+        best = float("inf")
+        for _ in range(repeats):
+            assembler = GlobalAssembler(dm, assembly_mode=mode)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                assembler._build_stiffness()
+                best = min(best, time.perf_counter() - t0)
+        timings[mode] = best
+        stored[mode] = assembler.K if assembler.K.format == "bsr" else assembler.K.tocsc()
+        matrices[mode] = assembler.K.tocsc()
+
+    ref = matrices["lil"]
+    scale = abs(ref).max() if ref.nnz else 1.0
+
+    print(f"Assembly benchmark: {os.path.basename(json_path)} "
+          f"({len(dm.elements)} elements, {dm.total_dofs} DOFs, best of {repeats})")
+    for mode in ASSEMBLY_MODES:
+        diff = abs(matrices[mode] - ref).max() if ref.nnz else 0.0
+        print(f"   {mode:>4}: {timings[mode]*1000:9.2f} ms | nnz={matrices[mode].nnz} | "
+              f"index={index_bytes(stored[mode])/1024:8.1f} KiB | max|dK|/max|K|={diff/scale:.2e}")
+
+    return timings
+
+def compare_renumbering(json_path, method="rcm", case_name="DEAD"):
+    """
+    Assembles K_ff with the given DOF renumbering and reports bandwidth,
+    profile, nnz(K_ff) and nnz(L+U) against the original numbering.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        dm = DataManager(json_path, renumbering=method)
+        dm.process_all(case_name=case_name)
+        K_ff = GlobalAssembler(dm).assemble_stiffness(partitioned=True)
+
+    report = renumbering_report(K_ff, dm)
+    print(f"Renumbering benchmark: {os.path.basename(json_path)} ({dm.total_dofs} DOFs)")
+    print_renumbering_report(report)
+    return report
+
+if __name__ == "__main__":
+    default_file = os.path.join(current_dir, "..", "..", "..", "Example_Project", "Example_File.mf")
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.normpath(default_file)
+    compare_assembly_modes(target)
+    compare_renumbering(target)
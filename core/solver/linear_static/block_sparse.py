@@ -0,0 +1,86 @@
+import numpy as np
+from scipy.sparse import bsr_matrix, issparse
+from scipy.sparse.linalg import LinearOperator
+
+NODE_BLOCK = 6
+
+def is_block6(A):
+    """True for a BSR matrix with 6x6 node blocks."""
+    return issparse(A) and A.format == "bsr" and A.blocksize == (NODE_BLOCK, NODE_BLOCK)
+
+def blocks_to_bsr(block_rows, block_cols, blocks, n_nodes):
+    """
+    Builds an n_nodes x n_nodes block (6x6) BSR matrix from block triplets,
+    summing duplicate blocks in their input order like
+    GlobalAssembler._triplets_to_csc does for scalars, so every entry
+    matches the scalar assembly bit for bit.
+    """
+    n = n_nodes * NODE_BLOCK
+    if len(blocks) == 0:
+        return bsr_matrix((n, n), blocksize=(NODE_BLOCK, NODE_BLOCK))
+
+    keys = block_rows * n_nodes + block_cols
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    blocks = blocks[order]
+
+    is_start = np.r_[True, keys[1:] != keys[:-1]]
+    starts = np.flatnonzero(is_start)
+    group = np.cumsum(is_start) - 1
+    rank = np.arange(len(keys)) - starts[group]
+
+    data = np.zeros((len(starts), NODE_BLOCK, NODE_BLOCK))
+    for r in range(rank.max() + 1):
+        sel = rank == r
+        data[group[sel]] += blocks[sel]
+    keys = keys[starts]
+
+    indices = keys % n_nodes
+    indptr = np.searchsorted(keys // n_nodes, np.arange(n_nodes + 1))
+
+    return bsr_matrix((data, indices, indptr), shape=(n, n), blocksize=(NODE_BLOCK, NODE_BLOCK))
+
+def to_block6(A):
+    """Converts any square sparse matrix with 6 DOFs per node to 6x6 BSR."""
+    return A.tobsr(blocksize=(NODE_BLOCK, NODE_BLOCK))
+
+def diagonal_blocks(A):
+    """Returns the (n_nodes, 6, 6) diagonal node blocks of a 6x6 BSR matrix."""
+    n_nodes = A.shape[0] // NODE_BLOCK
+    diag = np.zeros((n_nodes, NODE_BLOCK, NODE_BLOCK))
+
+    rows = np.repeat(np.arange(n_nodes), np.diff(A.indptr))
+    on_diag = A.indices == rows
+    diag[rows[on_diag]] = A.data[on_diag]
+    return diag
+
+def block_jacobi_inverse(diag, is_free=None):
+    """
+    Inverts every 6x6 diagonal block. Restrained DOFs (is_free False) get
+    an identity row/column so each node block stays invertible.
+    """
+    diag = diag.copy()
+    if is_free is not None:
+        free = is_free.reshape(-1, NODE_BLOCK)
+        diag[~(free[:, :, None] & free[:, None, :])] = 0.0
+        diag[:, np.arange(NODE_BLOCK), np.arange(NODE_BLOCK)] += ~free
+    return np.linalg.inv(diag)
+
+def free_dof_operator(A, is_free):
+    """
+    K_ff as a LinearOperator on the free DOFs that runs the block SpMV of
+    the full 6x6 BSR matrix, so K_ff never has to be extracted.
+    """
+    n = A.shape[0]
+    n_f = int(is_free.sum())
+
+    def matvec(x_f):
+        x = np.zeros(n)
+        x[is_free] = np.ravel(x_f)
+        return (A @ x)[is_free]
+
+    return LinearOperator((n_f, n_f), matvec=matvec, dtype=float)
+
+def index_bytes(A):
+    """Bytes used by the index arrays (indices + indptr) of a compressed sparse matrix."""
+    return int(A.indices.nbytes + A.indptr.nbytes)
@@ -2,9 +2,10 @@
 import json
 import numpy as np
 from error_definitions import SolverException
+from dof_renumbering import RENUMBERING_METHODS, compute_node_order
 
 class DataManager:
-    def __init__(self, json_path):
+    def __init__(self, json_path, renumbering="none"):
         try:
             with open(json_path, 'r') as f:
                 self.raw = json.load(f)
@@ -20,17 +21,26 @@ class DataManager:
         self.nodes = []                                      
         self.elements = []                                      
         self.load_case = None                                       
+        self.load_cases = {}
         self.total_dofs = 0                                      
 
-    def _generate_self_weight(self):
+        if renumbering not in RENUMBERING_METHODS:
+            raise SolverException("E107", f"Renumbering '{renumbering}'. Supported: {', '.join(RENUMBERING_METHODS)}")
+        self.renumbering = renumbering
+        self.node_order = None
+        self.diaphragms = {}
+
+    def _generate_self_weight(self, active_pattern_names=None):
         """
         Calculates A * gamma (Unit Weight) for every element and injects it as a 
         Member Distributed Load into the raw load list.
+        Defaults to the patterns of the current load case.
         """
                                                                          
         if 'load_patterns' not in self.raw: return
         
-        active_pattern_names = {p[0] for p in self.load_case['patterns']} 
+        if active_pattern_names is None:
+            active_pattern_names = {p[0] for p in self.load_case['patterns']} 
         
         target_patterns = []
         for pat in self.raw['load_patterns']:
@@ -81,9 +91,43 @@ class DataManager:
         self._parse_properties()
         self._map_nodes()
         self._parse_elements()
+        self._renumber_nodes()
+        self._parse_diaphragms()
         self._prepare_load_case(case_name)
         self._generate_self_weight()
 
+    def process_cases(self, case_names=None, extra_patterns=()):
+        """
+        Prepares the model once for several load cases.
+        case_names=None selects every 'Linear Static' case in the input.
+        Self-weight is injected once for the union of their patterns and
+        extra_patterns; use set_load_case() to switch the active case afterwards.
+        """
+        self._parse_properties()
+        self._map_nodes()
+        self._parse_elements()
+        self._renumber_nodes()
+        self._parse_diaphragms()
+
+        if case_names is None:
+            case_names = [c['name'] for c in self.raw['load_cases'] if c.get('type', 'Linear Static') == 'Linear Static']
+        if not case_names:
+            raise SolverException("E104", "No 'Linear Static' load cases are defined in the input.")
+
+        for name in case_names:
+            self._prepare_load_case(name)
+            self.load_cases[name] = self.load_case
+
+        pattern_names = {p[0] for lc in self.load_cases.values() for p in lc['patterns']}
+        self._generate_self_weight(pattern_names | set(extra_patterns))
+        self.set_load_case(case_names[0])
+
+    def set_load_case(self, case_name):
+        """Selects one of the cases prepared by process_cases() as the active case."""
+        if case_name not in self.load_cases:
+            raise SolverException("E104", f"Load Case '{case_name}' was not prepared.")
+        self.load_case = self.load_cases[case_name]
+
     def _map_nodes(self):
                                          
         user_ids = sorted([n['id'] for n in self.raw['nodes']])
@@ -100,6 +144,50 @@ class DataManager:
             
         self.total_dofs = len(user_ids) * 6
 
+    def free_dof_mask(self):
+        """Boolean mask over all DOFs; False where the node restraint fixes the DOF."""
+        is_free = np.ones(self.total_dofs, dtype=bool)
+        for node in self.nodes:
+            start_idx = node['idx'] * 6
+            is_free[start_idx : start_idx + 6] = ~np.asarray(node['restraints'], dtype=bool)
+        return is_free
+
+    def _renumber_nodes(self):
+        """
+        Reorders node indices (and hence DOFs) with a fill-reducing ordering.
+        node_order[new_idx] = original idx; results stay keyed by user node ID.
+        """
+        self.node_order = compute_node_order(len(self.nodes), self.elements, self.renumbering)
+        if self.renumbering == "none":
+            return
+
+        new_of_old = np.empty_like(self.node_order)
+        new_of_old[self.node_order] = np.arange(len(self.node_order))
+
+        for u_id, idx in self.node_id_to_idx.items():
+            self.node_id_to_idx[u_id] = int(new_of_old[idx])
+        for node in self.nodes:
+            node['idx'] = int(new_of_old[node['idx']])
+        self.nodes.sort(key=lambda node: node['idx'])
+        for el in self.elements:
+            el['node_indices'] = [int(new_of_old[i]) for i in el['node_indices']]
+
+    def _parse_diaphragms(self):
+        """
+        Groups nodes by their 'diaphragm' assignment. The constraint axis
+        comes from the 'constraints' list (default Z).
+        """
+        axes = {c['name']: c.get('axis', 'Z') for c in self.raw.get('constraints', [])}
+
+        self.diaphragms = {}
+        for n_data in self.raw['nodes']:
+            name = n_data.get('diaphragm')
+            if not name:
+                continue
+            if name not in self.diaphragms:
+                self.diaphragms[name] = {'axis': axes.get(name, 'Z'), 'nodes': []}
+            self.diaphragms[name]['nodes'].append(self.node_id_to_idx[n_data['id']])
+
     def _parse_properties(self):
                             
         for mat in self.raw['materials']:
@@ -177,6 +265,7 @@ class DataManager:
         self.load_case = {
             'name': case_name,
             'patterns': case_data['loads'],                               
+            'solver': case_data.get('solver')
         }
         
     def build_load_vector(self):
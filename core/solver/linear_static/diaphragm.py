@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.sparse import csc_matrix
+
+# In-plane DOFs per constraint axis: (translation b, translation c, rotation a)
+# with (b, c, a) a cyclic permutation of (x, y, z).
+PLANE_DOFS = {
+    "Z": (0, 1, 5),
+    "X": (1, 2, 3),
+    "Y": (2, 0, 4),
+}
+
+def diaphragm_transformation(data_manager, is_free, node_mass=None):
+    """
+    Builds the master-slave transformation U_f = T U_red for rigid diaphragms.
+
+    Each diaphragm's in-plane DOFs (two translations and the rotation about
+    the constraint axis) collapse onto 3 master DOFs located at the centre of
+    mass of its nodes (node_mass: (n_nodes,) translational masses by node
+    index), or at their centroid when no mass is given. For the Z axis:
+        u_x = U_x - (y - y_c) R_z,   u_y = U_y + (x - x_c) R_z,   r_z = R_z
+    All other free DOFs map to themselves. Nodes with a restrained in-plane
+    DOF are left out of their diaphragm.
+
+    Args:
+        data_manager: DataManager after process_all()/process_cases().
+        is_free (np.ndarray): free-DOF mask over all DOFs.
+        node_mass (np.ndarray): optional mass per node index.
+
+    Returns:
+        (T, masters): T is a sparse (n_free x n_reduced) matrix; masters is
+        {name: {"axis", "center", "nodes", "dofs"}} where "dofs" are the
+        3 master positions in the reduced system.
+    """
+    dm = data_manager
+    n_free = int(is_free.sum())
+    free_pos = np.cumsum(is_free) - 1
+
+    coords = np.zeros((len(dm.nodes), 3))
+    restraints = np.zeros((len(dm.nodes), 6), dtype=bool)
+    node_ids = [None] * len(dm.nodes)
+    for node in dm.nodes:
+        coords[node['idx']] = node['coords']
+        restraints[node['idx']] = node['restraints']
+        node_ids[node['idx']] = node['id']
+
+    slave_dof = np.zeros(dm.total_dofs, dtype=bool)
+    groups = []
+    for name, d in dm.diaphragms.items():
+        plane = PLANE_DOFS[d['axis']]
+        members = [i for i in d['nodes'] if not restraints[i, list(plane)].any()]
+        if len(members) < len(d['nodes']):
+            print(f"Warning: Diaphragm '{name}': {len(d['nodes']) - len(members)} node(s) with "
+                  f"restrained in-plane DOFs left unconstrained.")
+        if not members:
+            continue
+
+        members = np.array(members, dtype=np.int64)
+        for k in plane:
+            slave_dof[members * 6 + k] = True
+        groups.append((name, d['axis'], members))
+
+    kept = is_free & ~slave_dof
+    n_kept = int(kept.sum())
+    kept_dofs = np.flatnonzero(kept)
+
+    rows = [free_pos[kept_dofs]]
+    cols = [np.arange(n_kept)]
+    vals = [np.ones(n_kept)]
+
+    masters = {}
+    for g, (name, axis, members) in enumerate(groups):
+        b, c, a = PLANE_DOFS[axis]
+
+        weights = None
+        if node_mass is not None:
+            weights = np.asarray(node_mass, dtype=float)[members]
+            if weights.sum() <= 0.0:
+                weights = None
+        center = np.average(coords[members], axis=0, weights=weights)
+
+        m_b, m_c, m_a = n_kept + 3 * g + np.arange(3)
+        d_b = coords[members, b] - center[b]
+        d_c = coords[members, c] - center[c]
+        ones = np.ones(len(members))
+
+        row_b = free_pos[members * 6 + b]
+        row_c = free_pos[members * 6 + c]
+        row_a = free_pos[members * 6 + a]
+
+        rows += [row_b, row_b, row_c, row_c, row_a]
+        cols += [np.full(len(members), m_b), np.full(len(members), m_a),
+                 np.full(len(members), m_c), np.full(len(members), m_a),
+                 np.full(len(members), m_a)]
+        vals += [ones, -d_c, ones, d_b, ones]
+
+        masters[name] = {
+            "axis": axis,
+            "center": center.tolist(),
+            "nodes": [node_ids[i] for i in members],
+            "dofs": [int(m_b), int(m_c), int(m_a)]
+        }
+
+    n_red = n_kept + 3 * len(groups)
+    T = csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n_free, n_red))
+    return T, masters
+
+def reduce_matrix(T, A):
+    """Returns T^T A T as CSC."""
+    return csc_matrix(T.T @ A @ T)
@@ -0,0 +1,134 @@
+import time
+import numpy as np
+from scipy.sparse import csr_matrix, csc_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import splu
+
+RENUMBERING_METHODS = ("none", "rcm")
+
+def node_graph(n_nodes, elements):
+    """Symmetric node adjacency graph (n_nodes x n_nodes) built from element connectivity."""
+    if elements:
+        pairs = np.array([el['node_indices'] for el in elements], dtype=np.int64)
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1], np.arange(n_nodes)])
+        cols = np.concatenate([pairs[:, 1], pairs[:, 0], np.arange(n_nodes)])
+    else:
+        rows = cols = np.arange(n_nodes)
+    data = np.ones(len(rows), dtype=np.int8)
+    return csr_matrix((data, (rows, cols)), shape=(n_nodes, n_nodes))
+
+def compute_node_order(n_nodes, elements, method="rcm"):
+    """
+    Computes a fill-reducing node order on the element connectivity graph.
+
+    Returns:
+        np.ndarray: order[new_idx] = old_idx
+    """
+    if method not in RENUMBERING_METHODS:
+        raise ValueError(f"Unknown renumbering method '{method}'. Supported: {', '.join(RENUMBERING_METHODS)}")
+
+    if method == "none" or n_nodes == 0:
+        return np.arange(n_nodes)
+
+    graph = node_graph(n_nodes, elements)
+    return np.asarray(reverse_cuthill_mckee(graph, symmetric_mode=True), dtype=np.int64)
+
+def dof_permutation(node_order):
+    """
+    Expands a node order into the DOF map from the original numbering.
+
+    Returns:
+        np.ndarray: new_dof[old_dof]
+    """
+    node_order = np.asarray(node_order, dtype=np.int64)
+    new_of_old = np.empty_like(node_order)
+    new_of_old[node_order] = np.arange(len(node_order))
+    return (new_of_old[:, None] * 6 + np.arange(6)).ravel()
+
+def profile_stats(K):
+    """
+    Bandwidth and profile (envelope size) of the lower triangle of a square sparse matrix.
+
+    Returns:
+        dict: {"n", "nnz", "bandwidth", "profile"}
+    """
+    K = csr_matrix(K)
+    n = K.shape[0]
+    if n == 0 or K.nnz == 0:
+        return {"n": n, "nnz": int(K.nnz), "bandwidth": 0, "profile": 0}
+
+    rows = np.repeat(np.arange(n), np.diff(K.indptr))
+    cols = K.indices
+    lower = cols <= rows
+
+    first_col = np.arange(n)
+    np.minimum.at(first_col, rows[lower], cols[lower])
+
+    return {
+        "n": n,
+        "nnz": int(K.nnz),
+        "bandwidth": int(np.max(np.abs(rows - cols))),
+        "profile": int(np.sum(np.arange(n) - first_col))
+    }
+
+def factor_fill(K_ff, permc_spec="COLAMD"):
+    """
+    Returns (nnz(L+U), factorization time) of a SuperLU factorization of K_ff,
+    or (None, 0.0) if the matrix cannot be factorized.
+    """
+    if K_ff.shape[0] == 0:
+        return 0, 0.0
+    t0 = time.perf_counter()
+    try:
+        lu = splu(csc_matrix(K_ff), permc_spec=permc_spec)
+    except (RuntimeError, ValueError):
+        return None, 0.0
+    return int(lu.L.nnz + lu.U.nnz), time.perf_counter() - t0
+
+def renumbering_report(K_ff, data_manager, with_factor=True):
+    """
+    Compares the original (sorted user ID) DOF numbering with the current
+    numbering of the data manager on the assembled free-DOF block K_ff.
+
+    The original-order matrix is recovered by a symmetric permutation of
+    K_ff, so only one assembly is needed. nnz(L+U) is reported both for
+    SuperLU's natural order (sensitive to the numbering) and its default
+    COLAMD column order.
+
+    Returns:
+        dict: {"method", "before": {...}, "after": {...}}
+    """
+    dm = data_manager
+    new_dof = dof_permutation(dm.node_order)
+
+    is_free = dm.free_dof_mask()
+    free_pos = np.cumsum(is_free) - 1
+
+    # Free DOFs listed in the original numbering, as positions in K_ff.
+    old_free = is_free[new_dof]
+    perm = free_pos[new_dof[old_free]]
+
+    K_after = csr_matrix(K_ff)
+    K_before = K_after[perm, :][:, perm]
+
+    report = {"method": dm.renumbering}
+    for label, K_x in (("before", K_before), ("after", K_after)):
+        stats = profile_stats(K_x)
+        if with_factor:
+            stats["nnz_LU_natural"], stats["t_LU_natural"] = factor_fill(K_x, "NATURAL")
+            stats["nnz_LU_colamd"], stats["t_LU_colamd"] = factor_fill(K_x, "COLAMD")
+        report[label] = stats
+
+    return report
+
+def print_renumbering_report(report):
+    before, after = report["before"], report["after"]
+    print(f"      DOF Renumbering ({report['method']}):")
+    for key in ("bandwidth", "profile", "nnz", "nnz_LU_natural", "nnz_LU_colamd"):
+        if key not in before:
+            continue
+        b, a = before[key], after[key]
+        ratio = f"{a / b:6.2f}x" if b and a is not None else "   n/a"
+        print(f"         {key:>15}: {str(b):>12} -> {str(a):>12} ({ratio})")
+    if "t_LU_natural" in before:
+        print(f"         {'t_LU_natural':>15}: {before['t_LU_natural']:10.4f}s -> {after['t_LU_natural']:10.4f}s")
@@ -111,11 +111,6 @@ def get_rotation_matrix(p1, p2, beta_deg):
     
     R = np.array([vx, vy_final, vz_final])
     
-    print(f"Rotation Matrix for element from {p1} to {p2}:")
-    print(f"  vx (local X): {vx}")
-    print(f"  vy (local Y): {vy_final}")
-    print(f"  vz (local Z): {vz_final}")
-    
     return R
 
 def get_eccentricity_matrix(off_i, off_j):
@@ -131,3 +126,160 @@ def get_eccentricity_matrix(off_i, off_j):
     Te[0:6, 0:6] = apply_offset(0, off_i)
     Te[6:12, 6:12] = apply_offset(1, off_j)
     return Te
+
+def get_local_stiffness_matrices(E, G, A, J, I22, I33, As2, As3, L, L_tor=None):
+    """
+    Batched version of get_local_stiffness_matrix.
+    Every argument is an array of shape (n_elem,); returns an (n_elem, 12, 12)
+    tensor with one local Timoshenko stiffness matrix per element.
+    """
+    E, G, A, J = (np.asarray(v, dtype=float) for v in (E, G, A, J))
+    I22, I33, As2, As3 = (np.asarray(v, dtype=float) for v in (I22, I33, As2, As3))
+    L = np.asarray(L, dtype=float)
+    L_tor = L.copy() if L_tor is None else np.asarray(L_tor, dtype=float)
+
+    n = len(L)
+    k = np.zeros((n, 12, 12))
+
+    zero_len = (L == 0)
+    L = np.where(zero_len, 1.0, L)
+    L_tor = np.where(L_tor != 0, L_tor, L)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        phi_y = np.where(As2 > 0, (12 * E * I33) / (G * As2 * L**2), 0.0)
+        phi_z = np.where(As3 > 0, (12 * E * I22) / (G * As3 * L**2), 0.0)
+
+    EA_L = E * A / L_tor
+    k[:, 0, 0] =  EA_L;  k[:, 0, 6] = -EA_L
+    k[:, 6, 0] = -EA_L;  k[:, 6, 6] =  EA_L
+
+    GJ_L = G * J / L_tor
+    k[:, 3, 3] =  GJ_L;  k[:, 3, 9] = -GJ_L
+    k[:, 9, 3] = -GJ_L;  k[:, 9, 9] =  GJ_L
+
+    EI33 = E * I33
+    L2 = L * L
+    L3 = L * L * L
+    Py = 1 + phi_y
+
+    k1_z = (12 * EI33) / (L3 * Py)
+    k2_z = (6 * EI33) / (L2 * Py)
+    k3_z = ((4 + phi_y) * EI33) / (L * Py)
+    k4_z = ((2 - phi_y) * EI33) / (L * Py)
+
+    k[:, 1, 1] =  k1_z; k[:, 1, 5] =  k2_z; k[:, 1, 7] = -k1_z; k[:, 1, 11] =  k2_z
+    k[:, 5, 1] =  k2_z; k[:, 5, 5] =  k3_z; k[:, 5, 7] = -k2_z; k[:, 5, 11] =  k4_z
+    k[:, 7, 1] = -k1_z; k[:, 7, 5] = -k2_z; k[:, 7, 7] =  k1_z; k[:, 7, 11] = -k2_z
+    k[:, 11, 1] = k2_z; k[:, 11, 5] = k4_z; k[:, 11, 7] = -k2_z; k[:, 11, 11] = k3_z
+
+    EI22 = E * I22
+    Pz = 1 + phi_z
+
+    k1_y = (12 * EI22) / (L3 * Pz)
+    k2_y = (6 * EI22) / (L2 * Pz)
+    k3_y = ((4 + phi_z) * EI22) / (L * Pz)
+    k4_y = ((2 - phi_z) * EI22) / (L * Pz)
+
+    k[:, 2, 2] =  k1_y; k[:, 2, 4] = -k2_y; k[:, 2, 8] = -k1_y; k[:, 2, 10] = -k2_y
+    k[:, 4, 2] = -k2_y; k[:, 4, 4] =  k3_y; k[:, 4, 8] =  k2_y; k[:, 4, 10] =  k4_y
+    k[:, 8, 2] = -k1_y; k[:, 8, 4] =  k2_y; k[:, 8, 8] =  k1_y; k[:, 8, 10] =  k2_y
+    k[:, 10, 2] = -k2_y; k[:, 10, 4] = k4_y; k[:, 10, 8] = k2_y; k[:, 10, 10] = k3_y
+
+    if zero_len.any():
+        k[zero_len] = np.eye(12) * 1e12
+
+    return k
+
+def get_rotation_matrices(p1, p2, beta_deg):
+    """
+    Batched version of get_rotation_matrix.
+    p1, p2: (n_elem, 3) end coordinates, beta_deg: (n_elem,) local axis angles.
+    Returns an (n_elem, 3, 3) tensor of direction-cosine matrices.
+    """
+    V_x = np.asarray(p2, dtype=float) - np.asarray(p1, dtype=float)
+    L = np.linalg.norm(V_x, axis=1)
+    zero_len = (L == 0)
+
+    vx = V_x / np.where(zero_len, 1.0, L)[:, None]
+
+    temp_v = np.zeros_like(vx)
+    vertical = np.abs(vx[:, 2]) > 0.999
+    temp_v[vertical, 0] = 1.0
+    temp_v[~vertical, 2] = 1.0
+
+    vy = np.cross(temp_v, vx)
+    vy_norm = np.linalg.norm(vy, axis=1)
+    vy /= np.where(vy_norm == 0, 1.0, vy_norm)[:, None]
+    vz = np.cross(vx, vy)
+
+    beta_rad = np.radians(np.asarray(beta_deg, dtype=float))
+    c, s = np.cos(beta_rad)[:, None], np.sin(beta_rad)[:, None]
+
+    vy_final = vy * c + vz * s
+    vz_final = -vy * s + vz * c
+
+    R = np.stack([vx, vy_final, vz_final], axis=1)
+    if zero_len.any():
+        R[zero_len] = np.eye(3)
+
+    return R
+
+def get_eccentricity_matrices(off_i, off_j):
+    """
+    Batched version of get_eccentricity_matrix.
+    off_i, off_j: (n_elem, 3) local rigid offsets; returns (n_elem, 12, 12).
+    """
+    off_i = np.asarray(off_i, dtype=float)
+    off_j = np.asarray(off_j, dtype=float)
+
+    Te = np.tile(np.eye(12), (len(off_i), 1, 1))
+    for base, offset in ((0, off_i), (6, off_j)):
+        ex, ey, ez = offset[:, 0], offset[:, 1], offset[:, 2]
+        Te[:, base + 0, base + 4] = ez;  Te[:, base + 0, base + 5] = -ey
+        Te[:, base + 1, base + 3] = -ez; Te[:, base + 1, base + 5] = ex
+        Te[:, base + 2, base + 3] = ey;  Te[:, base + 2, base + 4] = -ex
+
+    return Te
+
+def get_local_consistent_mass_matrices(m_bar, r2, L):
+    """
+    Batched 12x12 consistent mass matrices of 3D Euler-Bernoulli frame
+    elements (cubic bending, linear axial/torsion shape functions).
+    m_bar: (n_elem,) mass per unit length, r2: (n_elem,) polar radius of
+    gyration squared (Ip / A), L: (n_elem,) lengths.
+    Returns an (n_elem, 12, 12) tensor in local axes.
+    """
+    m_bar, r2, L = (np.asarray(v, dtype=float) for v in (m_bar, r2, L))
+    n = len(L)
+    m = np.zeros((n, 12, 12))
+
+    c = m_bar * L / 420.0
+    L2 = L * L
+
+    m[:, 0, 0] = m[:, 6, 6] = 140 * c
+    m[:, 0, 6] = m[:, 6, 0] = 70 * c
+
+    m[:, 3, 3] = m[:, 9, 9] = 140 * c * r2
+    m[:, 3, 9] = m[:, 9, 3] = 70 * c * r2
+
+    # v / theta_z (DOFs 1, 5, 7, 11)
+    m[:, 1, 1] = m[:, 7, 7] = 156 * c
+    m[:, 1, 7] = m[:, 7, 1] = 54 * c
+    m[:, 5, 5] = m[:, 11, 11] = 4 * L2 * c
+    m[:, 5, 11] = m[:, 11, 5] = -3 * L2 * c
+    m[:, 1, 5] = m[:, 5, 1] = 22 * L * c
+    m[:, 7, 11] = m[:, 11, 7] = -22 * L * c
+    m[:, 1, 11] = m[:, 11, 1] = -13 * L * c
+    m[:, 5, 7] = m[:, 7, 5] = 13 * L * c
+
+    # w / theta_y (DOFs 2, 4, 8, 10): opposite rotation sign convention
+    m[:, 2, 2] = m[:, 8, 8] = 156 * c
+    m[:, 2, 8] = m[:, 8, 2] = 54 * c
+    m[:, 4, 4] = m[:, 10, 10] = 4 * L2 * c
+    m[:, 4, 10] = m[:, 10, 4] = -3 * L2 * c
+    m[:, 2, 4] = m[:, 4, 2] = -22 * L * c
+    m[:, 8, 10] = m[:, 10, 8] = 22 * L * c
+    m[:, 2, 10] = m[:, 10, 2] = 13 * L * c
+    m[:, 4, 8] = m[:, 8, 4] = -13 * L * c
+
+    return m
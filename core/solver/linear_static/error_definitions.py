@@ -50,6 +50,21 @@ SOLVER_ERRORS = {
         "desc": "The requested Load Case name does not exist in the 'load_cases' definition.",
         "fix": "Check the spelling of the Load Case name or ensure at least one load case is defined in the input."
     },
+    "E105": {
+        "title": "Zero Mass",
+        "desc": "The selected Mass Source produced no mass, so there is no dynamic problem to solve.",
+        "fix": "Enable element self mass or add load patterns with gravity loads to the Mass Source."
+    },
+    "E106": {
+        "title": "Invalid Load Combination",
+        "desc": "A load combination has an unsupported type, no items, or references a pattern, case or combination that does not exist.",
+        "fix": "Check the combination items. Combinations may only reference load patterns, linear static cases or combinations defined above them."
+    },
+    "E107": {
+        "title": "Invalid Analysis Option",
+        "desc": "An analysis option (e.g. the DOF renumbering or solver method) has a value the solver does not support.",
+        "fix": "Check the option spelling. The log lists the supported values."
+    },
 
     "E201": {
         "title": "Zero Length Element",
@@ -77,6 +92,21 @@ SOLVER_ERRORS = {
         "desc": "The solver calculated displacements exceeding reasonable limits (e.g., > 1e6 meters).",
         "fix": "Check your units (E modulus vs Load units). Ensure your model is restrained against rotation."
     },
+    "E303": {
+        "title": "Eigen Solver Error",
+        "desc": "The eigenvalue solver failed while extracting the modes.",
+        "fix": "1. Check for unstable or disconnected parts of the model.\n2. Try another eigen solver method.\n3. Reduce the number of modes."
+    },
+    "E304": {
+        "title": "Eigen Solver Did Not Converge",
+        "desc": "The requested modes could not be extracted, or the model has fewer dynamic DOFs than requested modes.",
+        "fix": "1. Reduce the Number of Modes.\n2. Check for disconnected nodes.\n3. Try the 'shift_invert' or 'dense' eigen solver."
+    },
+    "E305": {
+        "title": "Iterative Solver Did Not Converge",
+        "desc": "The preconditioned conjugate gradient solver did not reach the requested tolerance within the iteration limit.",
+        "fix": "1. Check the model for near-mechanisms or very soft members.\n2. Try another preconditioner (e.g. 'ic') or a direct solver method.\n3. Relax the tolerance or raise the iteration limit."
+    },
 
     "E401": {
         "title": "Result Write Failure",
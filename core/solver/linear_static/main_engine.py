@@ -11,11 +11,18 @@ from data_manager import DataManager
 from assembler import GlobalAssembler
 from solver_kernel import LinearSolver
 from result_writer import ResultWriter
+from pattern_basis import PatternBasis
+from dof_renumbering import renumbering_report, print_renumbering_report
 
-def run_linear_static_analysis(input_json_path, output_json_path, target_case_name="DEAD"):
+def run_linear_static_analysis(input_json_path, output_json_path, target_case_name="DEAD", renumbering="none",
+                               solver_options=None, assembly_mode="coo"):
     """
     Main execution pipeline for the Absolute Linear Static Solver.
     Now accepts a specific case name to run.
+    renumbering ("none" or "rcm") reorders the DOFs before assembly;
+    results are still keyed by user node ID. solver_options (see
+    solver_kernel.SOLVER_DEFAULTS) overrides the case's 'solver' settings.
+    assembly_mode is passed to GlobalAssembler ("bsr" keeps K in 6x6 blocks).
     """
     print("="*60)
     print(f"METUFIRE SOLVER ENGINE | V0.35")
@@ -26,7 +33,7 @@ def run_linear_static_analysis(input_json_path, output_json_path, target_case_na
 
     try:
         print("[1/5] Initializing Data Manager...")
-        dm = DataManager(input_json_path)
+        dm = DataManager(input_json_path, renumbering=renumbering)
         
         print(f"      Target Case: {target_case_name}")
         
@@ -61,15 +68,17 @@ def run_linear_static_analysis(input_json_path, output_json_path, target_case_na
         print("[2/5] Assembling Global System...")
         matrix_path = output_json_path.replace("_results.json", "_matrices.json")
         
-        assembler = GlobalAssembler(dm, export_path=matrix_path) 
+        assembler = GlobalAssembler(dm, export_path=matrix_path, assembly_mode=assembly_mode) 
         
-        K, P = assembler.assemble_system()
+        K_sys, P = assembler.assemble_system(partitioned=True)
         
-        non_zeros = K.nnz
-        total_cells = dm.total_dofs ** 2
+        non_zeros = K_sys.nnz
+        total_cells = K_sys.shape[0] ** 2
         sparsity = 1.0 - (non_zeros / total_cells) if total_cells > 0 else 0
         print(f"      Matrix Assembled. Non-zeros: {non_zeros}")
         print(f"      Sparsity: {sparsity*100:.2f}% (Optimized)")
+        if dm.renumbering != "none" and assembler.K_ff is not None:
+            print_renumbering_report(renumbering_report(assembler.K_ff, dm, with_factor=False))
         
     except Exception as e:
         print(f"\nFATAL ERROR in Assembler: {e}")
@@ -77,7 +86,7 @@ def run_linear_static_analysis(input_json_path, output_json_path, target_case_na
 
     try:
         print("[3/5] Solving Linear System (Ku=P)...")
-        solver = LinearSolver(K, P, dm)
+        solver = LinearSolver(assembler.K, P, dm, solver_options, K_ff=assembler.K_ff, K_rf=assembler.K_rf)
         U, R = solver.solve()
         
         max_u = max(abs(U)) if len(U) > 0 else 0
@@ -97,7 +106,9 @@ def run_linear_static_analysis(input_json_path, output_json_path, target_case_na
             "version": "0.32 Absolute",
             "time_elapsed": f"{time.time() - start_time:.4f} sec",
             "dofs": dm.total_dofs,
-            "case_name": target_case_name
+            "case_name": target_case_name,
+            "renumbering": dm.renumbering,
+            "solver": solver.telemetry
         }
         writer.write_results(results, meta_info)
         
@@ -111,6 +122,216 @@ def run_linear_static_analysis(input_json_path, output_json_path, target_case_na
     print("="*60)
     return True
 
+def case_output_path(output_json_path, case_name, suffix="_results.json"):
+    """
+    Derives a per-case file name from the main results path,
+    e.g. model_results.json -> model_LIVE_results.json.
+    """
+    if output_json_path.endswith("_results.json"):
+        base = output_json_path[:-len("_results.json")]
+    else:
+        base = os.path.splitext(output_json_path)[0]
+    return f"{base}_{case_name}{suffix}"
+
+def run_linear_static_cases(input_json_path, output_json_path, case_names=None, renumbering="none",
+                            solver_options=None, assembly_mode="coo"):
+    """
+    Multi-case pipeline built on a load-pattern basis: assembles K once,
+    factorizes K_ff once and back-substitutes one unit load column per
+    load pattern. Every requested case and every entry of the optional
+    'load_combinations' list is then a scaled sum of basis columns.
+
+    case_names=None runs every 'Linear Static' case in the input. Each case
+    and combination is written to case_output_path(output_json_path, name);
+    the basis itself is saved next to the results so run_load_combinations()
+    can add combinations later without a new analysis.
+
+    renumbering, solver_options and assembly_mode work as in
+    run_linear_static_analysis(); the shared factorization uses the first
+    case's 'solver' settings by default.
+
+    Returns:
+        dict: {case_or_combo_name: output_path} on success, or False on failure.
+    """
+    print("="*60)
+    print("METUFIRE SOLVER ENGINE | V0.35 (Pattern Basis)")
+    print(f"Target: {os.path.basename(input_json_path)}")
+    print("="*60)
+    
+    start_time = time.time()
+
+    try:
+        print("[1/5] Initializing Data Manager...")
+        dm = DataManager(input_json_path, renumbering=renumbering)
+        combinations = dm.raw.get('load_combinations', [])
+
+        combo_patterns = {p['name'] for p in dm.raw.get('load_patterns', [])}
+        dm.process_cases(case_names, extra_patterns=combo_patterns)
+        case_names = list(dm.load_cases.keys())
+        case_patterns = {name: [list(p) for p in lc['patterns']] for name, lc in dm.load_cases.items()}
+
+        pattern_names = []
+        for pat in [p[0] for pats in case_patterns.values() for p in pats] + sorted(combo_patterns):
+            if pat not in pattern_names:
+                pattern_names.append(pat)
+
+        print(f"      Target Cases: {', '.join(case_names)}")
+        print(f"      Basis Patterns: {', '.join(pattern_names)}")
+        print(f"      Combinations: {len(combinations)}")
+        print(f"      Mapped {len(dm.nodes)} Nodes to {dm.total_dofs} DOFs.")
+        print(f"      Processed {len(dm.elements)} Timoshenko Elements.")
+        
+    except SolverException as se:
+        error_details = se.get_details()
+        print(f"ANALYSIS FAILED: [{se.error_code}] {error_details['title']}")
+        with open(output_json_path, 'w') as f:
+            import json
+            json.dump({"status": "FAILED", "error": error_details}, f, indent=4)
+        return False
+
+    except Exception as e:
+        print(f"FATAL SYSTEM ERROR: {e}")
+        return False
+
+    try:
+        print("[2/5] Assembling Global Stiffness...")
+        t0 = time.time()
+        assembler = GlobalAssembler(dm, assembly_mode=assembly_mode)
+        K_sys = assembler.assemble_stiffness(partitioned=True)
+        t_assembly = time.time() - t0
+        print(f"      Matrix Assembled. Non-zeros: {K_sys.nnz}")
+        if dm.renumbering != "none" and assembler.K_ff is not None:
+            print_renumbering_report(renumbering_report(assembler.K_ff, dm, with_factor=False))
+
+    except Exception as e:
+        print(f"\nFATAL ERROR in Assembler: {e}")
+        return False
+
+    try:
+        print(f"[3/5] Solving Pattern Basis ({len(pattern_names)} patterns, one factorization)...")
+        t0 = time.time()
+        solver = LinearSolver(assembler.K, None, dm, solver_options, K_ff=assembler.K_ff, K_rf=assembler.K_rf)
+        basis = PatternBasis.solve(dm, assembler, solver, pattern_names, case_patterns)
+        t_basis = time.time() - t0
+        assembler._report_cache_stats()
+
+        basis.save(case_output_path(output_json_path, "pattern_basis", ".npz"))
+        print(f"      Basis Solved in {t_basis:.4f}s")
+
+    except SolverException as se:
+        print(f"\nFATAL ERROR in Solver: {se}")
+        return False
+    except Exception as e:
+        print(f"\nFATAL ERROR in Solver: {e}")
+        return False
+
+    try:
+        print("[4/5] Forming Cases and Combinations...")
+        resolved = basis.resolve_combinations(combinations)
+
+        meta_info = {
+            "version": "0.32 Absolute",
+            "dofs": dm.total_dofs,
+            "shared_factorization": True,
+            "renumbering": dm.renumbering,
+            "solver": solver.telemetry,
+            "basis_patterns": pattern_names,
+            "timings": {"assembly": t_assembly, "basis_solve": t_basis}
+        }
+
+        outputs = {}
+        for name in case_names:
+            factors = resolved[name][1][:, 0]
+            for eid, fef in basis.combine_fef(factors).items():
+                if eid in assembler.spy.data:
+                    assembler.spy.data[eid]["fef"] = fef
+            assembler.spy.save_to_json(case_output_path(output_json_path, name, "_matrices.json"))
+
+        outputs.update(write_combination_results(basis, resolved, output_json_path, meta_info, names=case_names))
+        outputs.update(write_combination_results(basis, resolved, output_json_path, meta_info,
+                                                 names=[c['name'] for c in combinations]))
+
+    except SolverException as se:
+        print(f"\nFATAL ERROR in Combinations: {se}")
+        return False
+    except Exception as e:
+        print(f"\nFATAL ERROR in Writer: {e}")
+        return False
+
+    print("="*60)
+    print("MULTI-CASE ANALYSIS COMPLETED SUCCESSFULLY")
+    print(f"Total Time: {time.time() - start_time:.4f}s ({len(case_names)} cases, {len(combinations)} combinations)")
+    print("="*60)
+    return outputs
+
+def write_combination_results(basis, resolved, output_json_path, meta_info, names):
+    """
+    Writes one results file per name in `names` from resolved basis factors.
+    'Envelope' entries store the maximum in the usual keys and the minimum
+    under '<key>_min'.
+    """
+    outputs = {}
+    for name in names:
+        c_type, F = resolved[name]
+        out_path = case_output_path(output_json_path, name)
+        info = dict(meta_info, case_name=name, combination_type=c_type)
+
+        if c_type == "Envelope":
+            U_max, U_min, R_max, R_min = basis.envelope(F)
+            results = basis.results_dict(U_max, R_max)
+            results_min = basis.results_dict(U_min, R_min)
+
+            U_cols, R_cols = basis.combine(F)
+            bases = [basis.results_dict(U_cols[:, j], R_cols[:, j])["base_reaction"] for j in range(F.shape[1])]
+            results["base_reaction"] = {k: max(b[k] for b in bases) for k in bases[0]}
+            base_min = {k: min(b[k] for b in bases) for k in bases[0]}
+        else:
+            U, R = basis.combine(F[:, 0])
+            results = basis.results_dict(U, R)
+            results_min = None
+
+        ResultWriter(out_path).write_results(results, info)
+
+        if results_min is not None:
+            import json
+            with open(out_path, 'r') as f:
+                data = json.load(f)
+            data["displacements_min"] = results_min["displacements"]
+            data["reactions_min"] = results_min["reactions"]
+            data["base_reaction_min"] = base_min
+            with open(out_path, 'w') as f:
+                json.dump(data, f, indent=4)
+
+        outputs[name] = out_path
+    return outputs
+
+def run_load_combinations(basis_path, output_json_path, combinations):
+    """
+    Forms load combinations from a pattern basis saved by
+    run_linear_static_cases(), without assembling or solving anything.
+
+    Args:
+        basis_path (str):        Path to the saved '_pattern_basis.npz'.
+        output_json_path (str):  Main results path used to name the outputs.
+        combinations (list):     [{"name", "type", "items": [[name, scale], ...]}]
+
+    Returns:
+        dict: {combo_name: output_path} on success, or False on failure.
+    """
+    start_time = time.time()
+    try:
+        basis = PatternBasis.load(basis_path)
+        resolved = basis.resolve_combinations(combinations)
+        meta_info = {"version": "0.32 Absolute", "basis_patterns": basis.pattern_names, "from_basis": True}
+        outputs = write_combination_results(basis, resolved, output_json_path, meta_info,
+                                            names=[c['name'] for c in combinations])
+    except SolverException as se:
+        print(f"Combination Error: {se}")
+        return False
+
+    print(f"Combinations: {len(outputs)} formed from basis in {time.time() - start_time:.4f}s")
+    return outputs
+
 if __name__ == "__main__":
                      
     test_file = os.path.join(current_dir, "test.mf") 
@@ -23,9 +23,16 @@ class MatrixSpy:
         
         self.data[elem_id]["fef"] += fef_local
 
-    def save_to_json(self):
+    def reset_fef(self):
+        """Clears accumulated FEFs so the same spy can record another load case."""
+        for mats in self.data.values():
+            mats["fef"] = np.zeros(12)
+
+    def save_to_json(self, output_path=None):
         """Converts numpy arrays to lists and saves to disk."""
-        if not self.output_path: return
+        if output_path is None:
+            output_path = self.output_path
+        if not output_path: return
 
         export_dict = {}
         for eid, mats in self.data.items():
@@ -36,8 +43,8 @@ class MatrixSpy:
             }
         
         try:
-            with open(self.output_path, 'w') as f:
+            with open(output_path, 'w') as f:
                 json.dump(export_dict, f, indent=4)
-            print(f"MatrixSpy: Successfully exported element matrices to {self.output_path}")
+            print(f"MatrixSpy: Successfully exported element matrices to {output_path}")
         except Exception as e:
             print(f"MatrixSpy Error: Could not save file. {e}")
@@ -0,0 +1,192 @@
+import json
+import numpy as np
+from error_definitions import SolverException
+
+COMBINATION_TYPES = ("Linear Add", "Envelope")
+
+class PatternBasis:
+    """
+    Linear static response to every load pattern at unit scale.
+
+    Load cases and load combinations are linear in the patterns, so once the
+    basis is solved any of them is a scaled sum of basis columns:
+        U_case = U_basis @ f_case,   f_case[p] = scale of pattern p
+    No re-assembly or re-solve is needed to add a case or a combination.
+    """
+    def __init__(self, pattern_names, node_ids, node_idx, node_coords, U, R, fef=None, element_ids=None,
+                 load_cases=None):
+        self.load_cases = dict(load_cases) if load_cases else {}
+        self.pattern_names = list(pattern_names)
+        self.pattern_index = {name: i for i, name in enumerate(self.pattern_names)}
+
+        self.node_ids = list(node_ids)
+        self.node_idx = np.asarray(node_idx, dtype=np.int64)
+        self.node_coords = np.asarray(node_coords, dtype=float)
+
+        self.U = np.asarray(U, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+
+        self.fef = None if fef is None else np.asarray(fef, dtype=float)
+        self.element_ids = None if element_ids is None else list(element_ids)
+
+    @classmethod
+    def solve(cls, dm, assembler, solver, pattern_names, load_cases=None):
+        """
+        Builds one unit load vector per pattern with the given assembler
+        (K must already be assembled) and solves them all with the solver's
+        single factorization. load_cases ({name: [(pattern, scale), ...]})
+        is stored with the basis so combinations can reference the cases.
+        """
+        n_pat = len(pattern_names)
+        P_basis = np.zeros((dm.total_dofs, n_pat))
+        fef = np.zeros((len(dm.elements), 12, n_pat))
+        element_ids = [el['id'] for el in dm.elements]
+        el_pos = {eid: i for i, eid in enumerate(element_ids)}
+
+        for col, pat in enumerate(pattern_names):
+            dm.load_case = {'name': pat, 'patterns': [[pat, 1.0]]}
+            P_basis[:, col] = assembler.assemble_load_vector()
+            for eid, mats in assembler.spy.data.items():
+                if eid in el_pos:
+                    fef[el_pos[eid], :, col] = mats["fef"]
+
+        U, R = solver.solve_many(P_basis)
+
+        return cls(
+            pattern_names,
+            [node['id'] for node in dm.nodes],
+            [node['idx'] for node in dm.nodes],
+            [node['coords'] for node in dm.nodes],
+            U, R, fef, element_ids, load_cases
+        )
+
+    def factors(self, pattern_scales):
+        """Converts [(pattern, scale), ...] or {pattern: scale} into a basis factor vector."""
+        items = pattern_scales.items() if isinstance(pattern_scales, dict) else pattern_scales
+        f = np.zeros(len(self.pattern_names))
+        for pat, scale in items:
+            if pat not in self.pattern_index:
+                raise SolverException("E104", f"Load Pattern '{pat}' is not part of the solved basis.")
+            f[self.pattern_index[pat]] += float(scale)
+        return f
+
+    def combine(self, factors):
+        """Returns (U, R) for one factor vector, or n_dofs x m arrays for an n_pat x m matrix."""
+        factors = np.asarray(factors, dtype=float)
+        return self.U @ factors, self.R @ factors
+
+    def combine_fef(self, factors):
+        """Returns {element_id: 12-vector of local FEF} for one factor vector."""
+        if self.fef is None:
+            return {}
+        fef = self.fef @ np.asarray(factors, dtype=float)
+        return {eid: fef[i] for i, eid in enumerate(self.element_ids)}
+
+    def results_dict(self, U_full, Reactions):
+        """Packages one response vector in the same layout as LinearSolver.get_results_dict."""
+        dofs = self.node_idx[:, None] * 6 + np.arange(6)
+        disp = U_full[dofs]
+        reac = Reactions[dofs]
+
+        F = reac[:, 0:3]
+        M = reac[:, 3:6] + np.cross(self.node_coords, F)
+        sum_f = F.sum(axis=0)
+        sum_m = M.sum(axis=0)
+
+        return {
+            "displacements": {n_id: disp[i].tolist() for i, n_id in enumerate(self.node_ids)},
+            "reactions": {n_id: reac[i].tolist() for i, n_id in enumerate(self.node_ids)},
+            "base_reaction": {
+                "Fx": float(sum_f[0]), "Fy": float(sum_f[1]), "Fz": float(sum_f[2]),
+                "Mx": float(sum_m[0]), "My": float(sum_m[1]), "Mz": float(sum_m[2])
+            }
+        }
+
+    def resolve_combinations(self, combinations, load_cases=None):
+        """
+        Expands load cases and combinations into basis factors.
+
+        Args:
+            combinations (list): [{"name", "type", "items": [[name, scale], ...]}]
+                                 items may reference patterns, load cases or
+                                 previously listed combinations.
+            load_cases (dict):   {case_name: [(pattern, scale), ...]};
+                                 defaults to the cases stored with the basis.
+
+        Returns:
+            dict: {name: (type, F)} where F is n_pat x m; m = 1 for
+                  "Linear Add" and one column per item for "Envelope".
+        """
+        if load_cases is None:
+            load_cases = self.load_cases
+
+        resolved = {}
+        for name, patterns in load_cases.items():
+            resolved[name] = ("Linear Add", self.factors(patterns)[:, None])
+
+        for combo in combinations:
+            c_name = combo['name']
+            c_type = combo.get('type', "Linear Add")
+            if c_type not in COMBINATION_TYPES:
+                raise SolverException("E106", f"Combination '{c_name}' has unsupported type '{c_type}'. "
+                                              f"Supported: {', '.join(COMBINATION_TYPES)}.")
+
+            columns = []
+            for item_name, scale in combo.get('items', []):
+                if item_name in resolved:
+                    columns.append(resolved[item_name][1] * float(scale))
+                elif item_name in self.pattern_index:
+                    columns.append(self.factors([(item_name, scale)])[:, None])
+                else:
+                    raise SolverException("E106", f"Combination '{c_name}' references unknown item '{item_name}'.")
+
+            if not columns:
+                raise SolverException("E106", f"Combination '{c_name}' has no items.")
+
+            if c_type == "Linear Add":
+                F = np.zeros((len(self.pattern_names), 1))
+                for col in columns:
+                    if col.shape[1] != 1:
+                        raise SolverException("E106", f"Combination '{c_name}' adds an envelope; "
+                                                      f"use an 'Envelope' combination instead.")
+                    F += col
+            else:
+                F = np.hstack(columns)
+
+            resolved[c_name] = (c_type, F)
+
+        return resolved
+
+    def envelope(self, F):
+        """Returns (U_max, U_min, R_max, R_min) over the columns of F."""
+        U, R = self.combine(F)
+        return U.max(axis=1), U.min(axis=1), R.max(axis=1), R.min(axis=1)
+
+    def save(self, path):
+        """Stores the basis as a compressed .npz so combinations can be formed later without a solve."""
+        np.savez_compressed(
+            path,
+            pattern_names=np.array(self.pattern_names, dtype=str),
+            node_ids=np.array(self.node_ids),
+            node_idx=self.node_idx,
+            node_coords=self.node_coords,
+            U=self.U, R=self.R,
+            fef=self.fef if self.fef is not None else np.zeros((0, 12, 0)),
+            element_ids=np.array(self.element_ids if self.element_ids is not None else []),
+            load_cases=np.array(json.dumps(self.load_cases))
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            fef = data['fef']
+            return cls(
+                data['pattern_names'].tolist(),
+                data['node_ids'].tolist(),
+                data['node_idx'],
+                data['node_coords'],
+                data['U'], data['R'],
+                fef if fef.size else None,
+                data['element_ids'].tolist() if fef.size else None,
+                json.loads(str(data['load_cases']))
+            )
@@ -0,0 +1,284 @@
+import time
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix, diags
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import splu, spilu, cg, LinearOperator
+from error_definitions import SolverException
+from dof_renumbering import profile_stats
+from block_sparse import diagonal_blocks, block_jacobi_inverse, free_dof_operator
+
+SOLVER_METHODS = ("auto", "lu", "symmetric", "pcg")
+PRECONDITIONERS = ("jacobi", "ic", "block6")
+
+# Auto selection: general LU below DIRECT_DOF_LIMIT, then symmetric direct
+# while the estimated factor fits in memory_limit_mb, else PCG.
+DIRECT_DOF_LIMIT = 5000
+BYTES_PER_FACTOR_ENTRY = 12
+
+class DirectLUBackend:
+    """General sparse LU (SuperLU) with a column fill-reducing ordering."""
+    name = "lu"
+
+    def __init__(self, permc_spec="COLAMD"):
+        self.permc_spec = permc_spec
+        self._lu = None
+        self.telemetry = {}
+
+    def _factor(self, K_ff):
+        return splu(K_ff, permc_spec=self.permc_spec)
+
+    def setup(self, K_ff):
+        t0 = time.perf_counter()
+        try:
+            self._lu = self._factor(csc_matrix(K_ff))
+        except (RuntimeError, ValueError) as e:
+            raise SolverException("E301", f"Math Error during factorization: {str(e)}")
+
+        self.telemetry = {
+            "method": self.name,
+            "ordering": self.permc_spec,
+            "n": K_ff.shape[0],
+            "nnz_K": int(K_ff.nnz),
+            "nnz_LU": int(self._lu.L.nnz + self._lu.U.nnz),
+            "t_setup": time.perf_counter() - t0,
+            "t_solve": 0.0
+        }
+
+    def solve(self, P_f):
+        t0 = time.perf_counter()
+        U_f = self._lu.solve(P_f)
+        self.telemetry["t_solve"] += time.perf_counter() - t0
+        return U_f
+
+class SymmetricDirectBackend(DirectLUBackend):
+    """
+    SuperLU in symmetric mode: symmetric ordering on A^T + A and diagonal
+    pivots only, which keeps the factor at Cholesky-like fill for SPD K_ff.
+    """
+    name = "symmetric"
+
+    def __init__(self, permc_spec="MMD_AT_PLUS_A"):
+        super().__init__(permc_spec)
+
+    def _factor(self, K_ff):
+        return splu(K_ff, permc_spec=self.permc_spec, diag_pivot_thresh=0.0,
+                    options={"SymmetricMode": True})
+
+class PCGBackend:
+    """
+    Preconditioned conjugate gradients. Stores K_ff and the preconditioner
+    only, so memory stays O(nnz(K)) instead of O(nnz(L+U)).
+
+    Preconditioners:
+        jacobi: inverse of diag(K_ff).
+        ic:     symmetric-mode incomplete LU (spilu), symmetrized; SciPy has
+                no incomplete Cholesky.
+        block6: inverse of every node's 6x6 diagonal block (block Jacobi).
+
+    Given the full 6x6 BSR K (K_block) and the free-DOF mask, the matvec
+    uses the block SpMV and the block6/jacobi preconditioners read the
+    diagonal blocks directly, so K_ff need not be extracted.
+    """
+    name = "pcg"
+
+    def __init__(self, preconditioner="ic", tol=1e-10, maxiter=None, node_dofs=None):
+        if preconditioner not in PRECONDITIONERS:
+            raise SolverException("E107", f"Preconditioner '{preconditioner}'. Supported: {', '.join(PRECONDITIONERS)}")
+        self.preconditioner = preconditioner
+        self.tol = tol
+        self.maxiter = maxiter
+        self.node_dofs = node_dofs
+        self.K_ff = None
+        self.K_block = None
+        self.A = None
+        self.M = None
+        self.telemetry = {}
+        self.telemetry_extra = {}
+
+    def _build_preconditioner(self, K_ff, n):
+        if self.preconditioner == "jacobi":
+            if K_ff is None:
+                d = np.einsum('nii->ni', diagonal_blocks(self.K_block)).ravel()[self.is_free]
+            else:
+                d = K_ff.diagonal()
+            d[d == 0.0] = 1.0
+            return diags(1.0 / d)
+
+        if self.preconditioner == "ic":
+            return self._ic_operator(K_ff)
+
+        return self._block6_operator(K_ff, n)
+
+    def _ic_operator(self, K_ff, drop_tol=1e-3, fill_factor=10):
+        """
+        Incomplete factorization with a symmetric ordering and diagonal
+        pivots, Pr K Pr^T ~ L U. Dropping makes L U slightly unsymmetric, so
+        the average of the solves with (LU) and (LU)^T is applied to keep
+        the preconditioner symmetric.
+        """
+        n = K_ff.shape[0]
+        try:
+            ilu = spilu(csc_matrix(K_ff), drop_tol=drop_tol, fill_factor=fill_factor,
+                        permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+        except RuntimeError as e:
+            raise SolverException("E301", f"Incomplete factorization failed: {str(e)}")
+
+        self.telemetry_extra = {"nnz_IC": int(ilu.L.nnz + ilu.U.nnz)}
+        return LinearOperator((n, n), matvec=lambda r: 0.5 * (ilu.solve(r) + ilu.solve(r, trans='T')))
+
+    def _block6_operator(self, K_ff, n):
+        """
+        node_dofs is an (n_nodes, 6) array of free-DOF positions, -1 for a
+        restrained DOF. Restrained slots get an identity row/column so every
+        node block can be inverted in one batched call.
+        """
+        node_dofs = self.node_dofs
+        if node_dofs is None:
+            node_dofs = np.arange(n + (-n) % 6).reshape(-1, 6)
+            node_dofs[node_dofs >= n] = -1
+
+        valid = node_dofs >= 0
+        safe = np.where(valid, node_dofs, 0)
+
+        if self.K_block is not None:
+            blocks = diagonal_blocks(self.K_block)
+        else:
+            K_csr = csr_matrix(K_ff)
+            blocks = np.zeros((len(node_dofs), 6, 6))
+            for a in range(6):
+                for b in range(6):
+                    blocks[:, a, b] = np.asarray(K_csr[safe[:, a], safe[:, b]]).ravel()
+
+        try:
+            inv_blocks = block_jacobi_inverse(blocks, valid.ravel())
+        except np.linalg.LinAlgError:
+            raise SolverException("E301", "A node's 6x6 stiffness block is singular (block6 preconditioner).")
+
+        def apply(r):
+            r_nodes = np.where(valid, r[safe], 0.0)
+            z_nodes = np.einsum('nij,nj->ni', inv_blocks, r_nodes)
+            z = np.zeros(n)
+            z[node_dofs[valid]] = z_nodes[valid]
+            return z
+
+        return LinearOperator((n, n), matvec=apply)
+
+    def setup(self, K_ff, K_block=None, is_free=None):
+        t0 = time.perf_counter()
+        self.K_block = K_block
+        self.is_free = is_free
+        self.K_ff = None if K_ff is None else csr_matrix(K_ff)
+
+        if K_block is not None:
+            self.A = free_dof_operator(K_block, is_free)
+        else:
+            self.A = self.K_ff
+        n = self.A.shape[0]
+
+        if self.K_ff is None and self.preconditioner == "ic":
+            raise SolverException("E107", "The 'ic' preconditioner needs the scalar K_ff.")
+        self.M = self._build_preconditioner(self.K_ff, n)
+        self.telemetry = {
+            "method": self.name,
+            "preconditioner": self.preconditioner,
+            "storage": "bsr6" if K_block is not None else "csr",
+            "n": n,
+            "nnz_K": int(K_block.nnz if K_block is not None else K_ff.nnz),
+            "tol": self.tol,
+            "iterations": [],
+            "residuals": [],
+            "t_setup": time.perf_counter() - t0,
+            "t_solve": 0.0
+        }
+        self.telemetry.update(self.telemetry_extra)
+
+    def _solve_column(self, b):
+        b_norm = np.linalg.norm(b)
+        if b_norm == 0.0:
+            self.telemetry["iterations"].append(0)
+            self.telemetry["residuals"].append(0.0)
+            return np.zeros_like(b)
+
+        count = [0]
+        def callback(xk):
+            count[0] += 1
+
+        x, info = cg(self.A, b, rtol=self.tol, atol=0.0, maxiter=self.maxiter, M=self.M, callback=callback)
+        residual = np.linalg.norm(b - self.A @ x) / b_norm
+
+        self.telemetry["iterations"].append(count[0])
+        self.telemetry["residuals"].append(float(residual))
+
+        if info != 0:
+            raise SolverException("E305", f"PCG ({self.preconditioner}) stopped after {count[0]} iterations "
+                                          f"with relative residual {residual:.2e} (tol {self.tol:.1e}).")
+        return x
+
+    def solve(self, P_f):
+        t0 = time.perf_counter()
+        if P_f.ndim == 1:
+            U_f = self._solve_column(P_f)
+        else:
+            U_f = np.column_stack([self._solve_column(P_f[:, j]) for j in range(P_f.shape[1])])
+        self.telemetry["t_solve"] += time.perf_counter() - t0
+        return U_f
+
+def estimate_factor_fill(K_ff):
+    """
+    Cheap estimate of nnz(L+U): twice the envelope (profile) of K_ff after
+    reverse Cuthill-McKee, which bounds the fill of a Cholesky factor.
+    """
+    if K_ff.shape[0] == 0:
+        return 0
+    K_csr = csr_matrix(K_ff)
+    perm = reverse_cuthill_mckee(K_csr, symmetric_mode=True)
+    stats = profile_stats(K_csr[perm, :][:, perm])
+    return 2 * stats["profile"] + stats["n"]
+
+def choose_backend_method(K_ff, memory_limit_mb=2048):
+    """
+    Returns (method, reason) for the 'auto' setting: 'lu' for small systems,
+    'symmetric' while the estimated factor fits in memory_limit_mb, else 'pcg'.
+    """
+    n = K_ff.shape[0]
+    if n <= DIRECT_DOF_LIMIT:
+        return "lu", f"{n} DOFs <= {DIRECT_DOF_LIMIT}"
+
+    fill = estimate_factor_fill(K_ff)
+    factor_mb = fill * BYTES_PER_FACTOR_ENTRY / 1024**2
+    if factor_mb <= memory_limit_mb:
+        return "symmetric", f"estimated factor {factor_mb:.0f} MB <= {memory_limit_mb} MB"
+    return "pcg", f"estimated factor {factor_mb:.0f} MB > {memory_limit_mb} MB"
+
+def create_backend(method, K_ff, permc_spec="COLAMD", preconditioner="ic", tol=1e-10, maxiter=None,
+                   node_dofs=None, memory_limit_mb=2048, K_block=None, is_free=None):
+    """
+    Builds the backend for method and runs its setup on K_ff.
+
+    method: one of SOLVER_METHODS; 'auto' is resolved with
+        choose_backend_method().
+    permc_spec: column ordering for 'lu' only; 'symmetric' always uses a
+        symmetric ordering.
+    K_block / is_free: full 6x6 BSR K and free-DOF mask, so PCG runs on
+        block storage; K_ff may then be None.
+    """
+    if method not in SOLVER_METHODS:
+        raise SolverException("E107", f"Solver method '{method}'. Supported: {', '.join(SOLVER_METHODS)}")
+
+    reason = "requested"
+    if method == "auto":
+        method, reason = choose_backend_method(K_ff, memory_limit_mb)
+
+    if method == "lu":
+        backend = DirectLUBackend(permc_spec)
+    elif method == "symmetric":
+        backend = SymmetricDirectBackend()
+    else:
+        backend = PCGBackend(preconditioner, tol, maxiter, node_dofs)
+
+    if method == "pcg":
+        backend.setup(K_ff, K_block, is_free)
+    else:
+        backend.setup(K_ff)
+    backend.telemetry["selection"] = reason
+    return backend
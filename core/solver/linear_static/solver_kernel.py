@@ -1,58 +1,225 @@
                                                               
 import numpy as np
-from scipy.sparse.linalg import spsolve
-from scipy.sparse import csc_matrix
 from error_definitions import SolverException
+from solver_backends import create_backend
+from block_sparse import is_block6
+from diaphragm import diaphragm_transformation, reduce_matrix
+
+SOLVER_DEFAULTS = {
+    "method": "auto",
+    "preconditioner": "ic",
+    "tol": 1e-10,
+    "maxiter": None,
+    "memory_limit_mb": 2048
+}
 
 class LinearSolver:
-    def __init__(self, K_global, P_global, data_manager):
+    def __init__(self, K_global, P_global, data_manager, options=None, K_ff=None, K_rf=None):
+        """
+        options overrides SOLVER_DEFAULTS; when omitted the 'solver' entry of
+        the active load case is used, so the backend is selectable per case.
+
+        K_ff / K_rf from GlobalAssembler.assemble_stiffness(partitioned=True)
+        may be passed instead of K_global (which can then be None); otherwise
+        both blocks are sliced from K_global once. A 6x6 BSR K_global is used
+        as is for reactions and (with a jacobi/block6 PCG) for the solve.
+        """
         self.K = K_global
+        self.K_ff = K_ff
+        self.K_rf = K_rf
         self.P = P_global
         self.dm = data_manager
         
         self.U_full = np.zeros(self.dm.total_dofs)
         self.Reactions = np.zeros(self.dm.total_dofs)
 
+        if options is None and self.dm.load_case:
+            options = self.dm.load_case.get('solver')
+        self.options = dict(SOLVER_DEFAULTS, **(options or {}))
+
+        self.backend = None
+        self.telemetry = {}
+        self.T = None
+        self.diaphragm_masters = {}
+        self._is_free = None
+
+        # A renumbered model is already in a fill-reducing order; keep it
+        # instead of letting SuperLU apply its own column ordering.
+        self.permc_spec = "NATURAL" if self.dm.renumbering != "none" else "COLAMD"
+
+    def _free_dof_mask(self):
+        return self.dm.free_dof_mask()
+
+    def _partition(self, is_free):
+        """
+        Returns (K_ff, K_rf), slicing them from K only if they were not
+        supplied. A block K keeps K_rf None; reactions then use its SpMV.
+        """
+        if self.K_ff is None:
+            K_csc = self.K.tocsc()
+            self.K_ff = K_csc[is_free, :][:, is_free]
+            if not is_block6(self.K):
+                self.K_rf = K_csc[~is_free, :][:, is_free]
+        return self.K_ff, self.K_rf
+
+    def _reactions(self, U, P):
+        """
+        Reactions at restrained DOFs only: R_r = K_rf U_f - P_r (U_r = 0).
+        Free-DOF entries are zero.
+        """
+        is_free = self._is_free
+        R = np.zeros_like(P)
+        if self.K_rf is None:
+            R[~is_free] = (self.K @ U)[~is_free] - P[~is_free]
+        else:
+            R[~is_free] = self.K_rf @ U[is_free] - P[~is_free]
+        return R
+
+    def _node_free_dofs(self, is_free):
+        """(n_nodes, 6) positions of each node's DOFs inside K_ff; -1 if restrained."""
+        free_pos = np.cumsum(is_free) - 1
+        free_pos[~is_free] = -1
+        return free_pos.reshape(-1, 6)
+
     def solve(self):
         """
         Executes the linear algebra solution: K_ff * U_f = P_f
         """
         print("Solver: Applying Boundary Conditions...")
-        
-        is_free = np.ones(self.dm.total_dofs, dtype=bool)
-        
-        for node in self.dm.nodes:
-            start_idx = node['idx'] * 6
-            restraints = node['restraints']                           
-            
-            for i in range(6):
-                if restraints[i]:                  
-                    is_free[start_idx + i] = False
 
-        K_csc = self.K.tocsc()
-        K_ff = K_csc[is_free, :][:, is_free]
-        P_f = self.P[is_free]
+        self.factorize()
+        is_free = self._is_free
 
-        if K_ff.shape[0] == 0:
+        if self.backend is None:
             print("Warning: Structure is fully constrained (0 free DOFs).")
             return np.zeros(self.dm.total_dofs), self.P
 
-        print(f"Solver: Solving system with {K_ff.shape[0]} equations...")
-        try:
-            U_f = spsolve(K_ff, P_f)
-        except (RuntimeError, ValueError) as e:
-                                               
-            raise SolverException("E301", f"Math Error during spsolve: {str(e)}")
+        P_f = self.P[is_free]
+
+        print(f"Solver: Solving system with {P_f.shape[0]} equations...")
+        U_f = self._solve_free(P_f)
+
+        if not np.all(np.isfinite(U_f)):
+            raise SolverException("E301", "Solver produced non-finite displacements.")
 
         self.U_full[is_free] = U_f
+        self._report_telemetry()
 
         print("Solver: Computing Reactions...")
-        self.Reactions = self.K.dot(self.U_full) - self.P
+        self.Reactions = self._reactions(self.U_full, self.P)
 
         return self.U_full, self.Reactions
 
-    def get_results_dict(self):
-        """Packages results into a dictionary for the Writer."""
+    def factorize(self):
+        """
+        Sets up the selected backend on K_ff once (LU/LDL factorization or
+        PCG preconditioner). Subsequent solve_many() calls reuse it.
+        """
+        is_free = self._free_dof_mask()
+        self._is_free = is_free
+
+        opts = self.options
+        K_block = self.K if is_block6(self.K) else None
+        node_dofs = self._node_free_dofs(is_free)
+
+        # PCG with a jacobi/block6 preconditioner runs on the block matrix
+        # directly; every other backend (and the diaphragm reduction) needs
+        # the scalar K_ff.
+        if (K_block is not None and self.K_ff is None and not self.dm.diaphragms
+                and opts['method'] == "pcg" and opts['preconditioner'] != "ic"):
+            K_ff = None
+        else:
+            K_ff, _ = self._partition(is_free)
+
+        n_free = int(is_free.sum())
+        if n_free == 0:
+            self.backend = None
+            return None
+
+        if self.dm.diaphragms:
+            self.T, self.diaphragm_masters = diaphragm_transformation(self.dm, is_free)
+            K_ff = reduce_matrix(self.T, K_ff)
+            K_block, node_dofs = None, None
+            print(f"Solver: {len(self.diaphragm_masters)} rigid diaphragm(s), "
+                  f"{n_free} -> {K_ff.shape[0]} equations (T^T K T).")
+
+        print(f"Solver: Preparing '{opts['method']}' backend for K_ff ({K_ff.shape[0] if K_ff is not None else n_free} equations)...")
+        self.backend = create_backend(
+            opts['method'], K_ff,
+            permc_spec=self.permc_spec,
+            preconditioner=opts['preconditioner'],
+            tol=opts['tol'],
+            maxiter=opts['maxiter'],
+            node_dofs=node_dofs,
+            memory_limit_mb=opts['memory_limit_mb'],
+            K_block=K_block,
+            is_free=is_free
+        )
+        self.telemetry = self.backend.telemetry
+
+        tel = self.telemetry
+        if "nnz_LU" in tel:
+            print(f"Solver: Backend '{tel['method']}' ({tel['selection']}), "
+                  f"nnz(K_ff)={tel['nnz_K']}, nnz(L+U)={tel['nnz_LU']}, setup {tel['t_setup']:.4f}s")
+        else:
+            print(f"Solver: Backend '{tel['method']}' + {tel['preconditioner']} ({tel['selection']}), "
+                  f"nnz(K_ff)={tel['nnz_K']}, setup {tel['t_setup']:.4f}s")
+        return self.backend
+
+    def _solve_free(self, P_f):
+        """Solves for the free DOFs, through the diaphragm reduction when present."""
+        if self.T is None:
+            return self.backend.solve(P_f)
+        return self.T @ self.backend.solve(self.T.T @ P_f)
+
+    def _report_telemetry(self):
+        tel = self.telemetry
+        if tel.get("iterations"):
+            print(f"Solver: PCG iterations {tel['iterations']}, "
+                  f"max relative residual {max(tel['residuals']):.2e} (tol {tel['tol']:.1e}), solve {tel['t_solve']:.4f}s")
+
+    def solve_many(self, P_matrix):
+        """
+        Solves K U = P for every column of P_matrix (n_dofs x n_cases)
+        with a single backend setup on K_ff.
+
+        Returns:
+            (U, R): displacement and reaction arrays, both n_dofs x n_cases.
+        """
+        P_matrix = np.asarray(P_matrix, dtype=float)
+        if P_matrix.ndim == 1:
+            P_matrix = P_matrix[:, None]
+
+        if self._is_free is None:
+            self.factorize()
+
+        is_free = self._is_free
+        U = np.zeros_like(P_matrix)
+
+        if self.backend is None:
+            print("Warning: Structure is fully constrained (0 free DOFs).")
+            return U, P_matrix.copy()
+
+        print(f"Solver: Back-substituting {P_matrix.shape[1]} load vector(s)...")
+        U[is_free] = self._solve_free(P_matrix[is_free])
+
+        if not np.all(np.isfinite(U)):
+            raise SolverException("E301", "Factorization produced non-finite displacements.")
+        self._report_telemetry()
+
+        print("Solver: Computing Reactions...")
+        R = self._reactions(U, P_matrix)
+        return U, R
+
+    def get_results_dict(self, U_full=None, Reactions=None):
+        """
+        Packages results into a dictionary for the Writer.
+        Defaults to the vectors of the last solve(); pass columns from
+        solve_many() to package another case.
+        """
+        if U_full is None: U_full = self.U_full
+        if Reactions is None: Reactions = self.Reactions
+
         results = {
             "displacements": {},
             "reactions": {},
@@ -70,8 +237,8 @@ class LinearSolver:
             idx = node['idx'] * 6
             coords = node['coords']            
             
-            disp = self.U_full[idx : idx+6].tolist()
-            reac = self.Reactions[idx : idx+6].tolist()
+            disp = U_full[idx : idx+6].tolist()
+            reac = Reactions[idx : idx+6].tolist()
             
             results["displacements"][n_id] = disp
             results["reactions"][n_id] = reac
@@ -0,0 +1,117 @@
+import numpy as np
+from collections import OrderedDict
+
+class ElementStiffnessCache:
+    """
+    Bounded LRU memo of element-level matrices keyed by an element signature.
+
+    Buildings repeat the same member (same section, material, clear length,
+    torsional length and releases) many times, so the local stiffness and
+    the release condensation only need to be computed once per signature.
+    Lengths are rounded to 12 significant digits so that members whose
+    lengths differ only by coordinate round-off share an entry.
+    """
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._store = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _q(value):
+        return float(f"{value:.12g}")
+
+    @classmethod
+    def signature(cls, el, kind="k", L=None, L_tor=None, use_releases=True):
+        """
+        Builds the hashable signature of an element.
+
+        Args:
+            el (dict): DataManager element record.
+            kind (str): Namespace of the cached quantity ("k", "raw", "fef").
+            L, L_tor (float): Override lengths (default: L_clear, L_total).
+            use_releases (bool): Include the release pattern in the key.
+        """
+        mat = el['material']
+        sec = el['section']
+        L = el['L_clear'] if L is None else L
+        L_tor = el['L_total'] if L_tor is None else L_tor
+        releases = tuple(bool(r) for r in el['releases'][0] + el['releases'][1]) if use_releases else None
+
+        return (kind,
+                mat['E'], mat['G'],
+                sec['A'], sec['J'], sec['I22'], sec['I33'], sec['As2'], sec['As3'],
+                cls._q(L), cls._q(L_tor), releases)
+
+    def get(self, key, compute):
+        """Returns the cached value for key, calling compute() on a miss."""
+        if key in self._store:
+            self.hits += 1
+            self._store.move_to_end(key)
+            return self._store[key]
+
+        self.misses += 1
+        value = compute()
+        self._put(key, value)
+        return value
+
+    def get_many(self, keys, compute):
+        """
+        Batched lookup for a list of signatures.
+
+        compute(indices) is called once with the positions (into keys) of one
+        representative per missing signature and must return a stacked array
+        with one entry per index. Repeats inside the batch count as hits.
+
+        Returns:
+            np.ndarray: stacked values, one per key.
+        """
+        first_seen = {}
+        for i, key in enumerate(keys):
+            first_seen.setdefault(key, i)
+
+        missing = [key for key in first_seen if key not in self._store]
+        found = {key: self._store[key] for key in first_seen if key in self._store}
+
+        if missing:
+            values = compute([first_seen[key] for key in missing])
+            for key, value in zip(missing, values):
+                found[key] = value
+                self._put(key, value)
+
+        for key in found:
+            if key in self._store:
+                self._store.move_to_end(key)
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        return np.stack([found[key] for key in keys])
+
+    def _put(self, key, value):
+        self._store[key] = value
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_size:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Returns hit-rate statistics as a plain dict."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "lookups": lookups,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._store),
+            "max_size": self.max_size,
+            "evictions": self.evictions
+        }
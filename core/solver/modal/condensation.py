@@ -0,0 +1,128 @@
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix, diags
+from scipy.sparse.linalg import LinearOperator
+from eigen_backends import factorize_shifted
+
+CONDENSATION_MODES = ("none", "guyan")
+
+def massless_mask(M, tol=1e-10):
+    """True for DOFs whose mass row is zero. M is a sparse matrix or a lumped diagonal."""
+    if isinstance(M, np.ndarray):
+        return M < tol
+    return np.asarray(abs(csr_matrix(M)).sum(axis=1)).ravel() < tol
+
+class MasslessCondensation:
+    """
+    Static (Guyan) condensation of the massless DOFs b onto the mass DOFs a:
+
+        S = K_aa - K_ab K_bb^-1 K_ba,    S phi_a = w2 M_aa phi_a
+
+    Since M_ab = M_bb = 0 this is exact, not an approximation. S is dense in
+    general and is never formed: the shift-invert operator (S - sigma M_aa)^-1
+    is one solve with the sparse factor of K - sigma M on all DOFs, keeping
+    the a-part, and phi_b = -K_bb^-1 K_ba phi_a recovers the full shapes.
+
+    Exposes the same interface as eigen_backends.SparseEigenProblem, so any
+    eigen backend can solve the condensed problem.
+    """
+    def __init__(self, K, M, tol=1e-10, ordering=None):
+        self.is_massless = massless_mask(M, tol)
+        self.ordering = ordering
+        a = ~self.is_massless
+        b = self.is_massless
+        self.n = K.shape[0]
+        self.n_a = int(a.sum())
+        self.n_b = int(b.sum())
+        self.size = self.n_a
+
+        K = csc_matrix(K)
+        self.K = K
+        self.K_aa = K[a, :][:, a]
+        self.K_ab = K[a, :][:, b]
+        self.K_ba = K[b, :][:, a]
+
+        # M with the (below tol) massless rows and columns zeroed exactly.
+        if isinstance(M, np.ndarray):
+            self.M = np.where(a, M, 0.0)
+            self.m_a = M[a]
+            self.M_aa = None
+            self.mass = self.m_a
+        else:
+            keep = diags(a.astype(float))
+            self.M = csc_matrix(keep @ M @ keep)
+            self.m_a = None
+            self.M_aa = self.M[a, :][:, a]
+            self.mass = self.M_aa
+
+        self._bb = factorize_shifted(K[b, :][:, b]) if self.n_b else None
+
+    def __getstate__(self):
+        # SuperLU objects cannot be pickled; refactor K_bb after unpickling.
+        state = self.__dict__.copy()
+        state["_bb"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.n_b:
+            b = self.is_massless
+            self._bb = factorize_shifted(self.K[b, :][:, b])
+
+    def schur_matvec(self, x_a):
+        """S x_a without forming S."""
+        x_a = np.ravel(x_a)
+        if self._bb is None:
+            return self.K_aa @ x_a
+        return self.K_aa @ x_a - self.K_ab @ self._bb.solve(self.K_ba @ x_a)
+
+    def stiffness_operator(self):
+        """S as a LinearOperator."""
+        return LinearOperator((self.n_a, self.n_a), matvec=self.schur_matvec, dtype=float)
+
+    def dense_stiffness(self):
+        """S as a dense array (small models only)."""
+        S = self.K_aa.toarray()
+        if self._bb is not None:
+            S -= self.K_ab @ self._bb.solve(self.K_ba.toarray())
+        return S
+
+    def shifted_factor(self, sigma):
+        """
+        Sparse LU of K - sigma M on all DOFs. Since K_bb is positive
+        definite, its inertia equals that of S - sigma M_aa (Haynsworth),
+        so it also serves Sturm counts of the condensed problem.
+        """
+        M = diags(self.M) if self.m_a is not None else self.M
+        return factorize_shifted(self.K - sigma * M, self.ordering)
+
+    def shift_invert_operator(self, sigma):
+        """(S - sigma M_aa)^-1 through one factorization of K - sigma M (M zero on b)."""
+        a = ~self.is_massless
+        lu = self.shifted_factor(sigma)
+
+        def apply(x_a):
+            rhs = np.zeros(self.n)
+            rhs[a] = np.ravel(x_a)
+            return lu.solve(rhs)[a]
+
+        return LinearOperator((self.n_a, self.n_a), matvec=apply, dtype=float)
+
+    def reduce_load(self, F):
+        """Condensed load F_a - K_ab K_bb^-1 F_b for (n, n_loads) F."""
+        F_a = F[~self.is_massless]
+        F_b = F[self.is_massless]
+        if self._bb is None or not np.any(F_b):
+            return F_a
+        return F_a - self.K_ab @ self._bb.solve(F_b)
+
+    def restrict(self, phi):
+        """Mass-DOF part of (n, k) full shapes, e.g. a warm start."""
+        return phi[~self.is_massless]
+
+    def expand(self, phi_a):
+        """Full (n, k) shapes from the mass-DOF part."""
+        phi = np.zeros((self.n, phi_a.shape[1]))
+        phi[~self.is_massless] = phi_a
+        if self._bb is not None:
+            phi[self.is_massless] = -self._bb.solve(np.asarray(self.K_ba @ phi_a))
+        return phi
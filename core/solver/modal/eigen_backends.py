@@ -0,0 +1,448 @@
+import time
+import warnings
+import numpy as np
+import scipy.linalg
+from scipy.sparse import csc_matrix, diags, issparse
+from scipy.sparse.linalg import splu, eigsh, lobpcg, LinearOperator
+from linear_static.error_definitions import SolverException
+from result_helper import mass_normalize
+
+EIGEN_METHODS = ("auto", "dense", "shift_invert", "lobpcg")
+
+# Auto selection: dense eigh up to DENSE_DOF_LIMIT equations, LOBPCG from
+# LOBPCG_DOF_LIMIT on when at most LOBPCG_MAX_MODES are requested,
+# shift-invert Lanczos otherwise.
+DENSE_DOF_LIMIT = 2000
+LOBPCG_DOF_LIMIT = 100000
+LOBPCG_MAX_MODES = 40
+
+def factorize_shifted(A, ordering=None):
+    """
+    Sparse LU of the shifted matrix K - sigma M. For sigma < 0 it is SPD, so
+    SuperLU's symmetric mode (symmetric ordering, diagonal pivots) gives
+    Cholesky-like fill; the general COLAMD LU is the fallback. With a
+    FactorOrdering the fill-reducing ordering of an earlier factorization
+    is reused.
+    """
+    if ordering is not None:
+        return ordering.factorize(A)
+    A = csc_matrix(A)
+    try:
+        return splu(A, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+    except RuntimeError:
+        return splu(A)
+
+class PermutedFactor:
+    """SuperLU factor of A[p][:, p] that solves with A; Sturm counts read its pivots."""
+    def __init__(self, lu, perm):
+        self.lu = lu
+        self.perm = perm
+        self.shape = lu.shape
+        self.nnz = lu.nnz
+        self.perm_r = lu.perm_r
+        self.perm_c = lu.perm_c
+        self.U = lu.U
+
+    def solve(self, b):
+        x = np.empty_like(b, dtype=float)
+        x[self.perm] = self.lu.solve(np.asarray(b, dtype=float)[self.perm])
+        return x
+
+class FactorOrdering:
+    """
+    Fill-reducing ordering shared by factorizations of matrices with the
+    same sparsity structure: K - sigma M for other shifts, spectrum slices
+    or mass sources. The first factorization computes it; later ones are
+    permuted symmetrically and skip the ordering step.
+    """
+    def __init__(self):
+        self.perm = None
+        self.reused = 0
+
+    def factorize(self, A):
+        A = csc_matrix(A)
+        if self.perm is None or len(self.perm) != A.shape[0]:
+            lu = factorize_shifted(A)
+            if np.array_equal(lu.perm_r, lu.perm_c):
+                self.perm = np.argsort(lu.perm_c)
+            return lu
+
+        p = self.perm
+        try:
+            lu = splu(csc_matrix(A[p, :][:, p]), permc_spec="NATURAL", diag_pivot_thresh=0.0,
+                      options={"SymmetricMode": True})
+        except RuntimeError:
+            return factorize_shifted(A)
+        self.reused += 1
+        return PermutedFactor(lu, p)
+
+class SparseEigenProblem:
+    """
+    K phi = w2 M phi on sparse K and M, where M is a sparse matrix or a
+    1-D lumped diagonal. Backends only use this interface, which
+    MasslessCondensation implements for the condensed problem.
+    """
+    def __init__(self, K, M, ordering=None):
+        self.K = csc_matrix(K)
+        self.mass = M
+        self.size = K.shape[0]
+        self.ordering = ordering
+
+    def stiffness_operator(self):
+        return self.K
+
+    def dense_stiffness(self):
+        return self.K.toarray()
+
+    def shifted_factor(self, sigma):
+        """Sparse LU of K - sigma M."""
+        M = diags(self.mass) if isinstance(self.mass, np.ndarray) else self.mass
+        return factorize_shifted(self.K - sigma * M, self.ordering)
+
+    def shift_invert_operator(self, sigma):
+        """(K - sigma M)^-1 from one sparse LU."""
+        lu = self.shifted_factor(sigma)
+        return LinearOperator((self.size, self.size), matvec=lu.solve, dtype=float)
+
+    def reduce_load(self, F):
+        return F
+
+    def restrict(self, phi):
+        return phi
+
+    def expand(self, phi):
+        return phi
+
+def _mass_operator(mass):
+    return diags(mass) if isinstance(mass, np.ndarray) else mass
+
+def _counted(op, counter):
+    """Wraps a LinearOperator so every application is counted."""
+    def matvec(x):
+        counter[0] += 1
+        return op.matvec(x)
+    return LinearOperator(op.shape, matvec=matvec, dtype=float)
+
+def residual_norms(problem, vals, phi):
+    """Relative residuals ||K phi - w2 M phi|| / ||K phi|| per mode on the eigenproblem DOFs."""
+    A = problem.stiffness_operator()
+    K_phi = np.column_stack([A @ phi[:, j] for j in range(phi.shape[1])])
+    M_phi = _mass_operator(problem.mass) @ phi
+    res = np.linalg.norm(K_phi - M_phi * vals, axis=0)
+    scale = np.linalg.norm(K_phi, axis=0)
+    scale[scale == 0] = 1.0
+    return res / scale
+
+def _start_vector(X0, Y, B_Y):
+    """Lanczos start vector: the sum of the unit-norm columns of X0, deflated by Y."""
+    scale = np.linalg.norm(X0, axis=0)
+    scale[scale == 0] = 1.0
+    v0 = (X0 / scale).sum(axis=1)
+    if Y is not None:
+        v0 = v0 - Y @ (B_Y.T @ v0)
+    if not np.any(v0):
+        return None
+    return v0
+
+def _deflated(apply, Y, B_Y):
+    """Wraps apply so its result is projected out of span(Y): v - Y (B_Y^T v)."""
+    if Y is None:
+        return apply
+
+    def project(x):
+        v = apply(x)
+        return v - Y @ (B_Y.T @ v)
+    return project
+
+class DenseEigenBackend:
+    """
+    LAPACK eigh on dense matrices: the k lowest modes, no convergence issues.
+
+    Solved inverted, M phi = mu (K - s M) phi with mu = 1 / (w2 - s) and
+    s < 0, like shift-invert: the Cholesky factor is of K - s M, not of M,
+    so the tiny regularization masses of massless DOFs only produce tiny mu
+    and cost no accuracy in the lowest modes.
+    """
+    name = "dense"
+
+    def __init__(self):
+        self.telemetry = {}
+        self._dense = None
+
+    def solve(self, problem, k, sigma, deflate=None, X0=None):
+        """
+        deflate: the n_found lowest modes already extracted; returns modes
+        n_found..n_found+k-1. X0 (a starting subspace) is not needed.
+        """
+        lo = 0 if deflate is None else deflate.shape[1]
+        if self._dense is None:
+            mass = problem.mass
+            if isinstance(mass, np.ndarray):
+                M = np.diag(mass)
+            else:
+                M = mass.toarray() if issparse(mass) else np.asarray(mass)
+            # Any s < 0 keeps K - s M positive definite; the lowest modes
+            # are the largest mu whatever sigma was asked for.
+            s = min(sigma, -0.1)
+            self._dense = (problem.dense_stiffness() - s * M, M, s)
+
+        A_s, M, s = self._dense
+        n = A_s.shape[0]
+        mu, phi = scipy.linalg.eigh(M, A_s, subset_by_index=[n - lo - k, n - lo - 1])
+        mu, phi = mu[::-1], phi[:, ::-1]
+        # phi^T (K - s M) phi = 1, so phi^T M phi = mu.
+        vals = s + 1.0 / mu
+        phi = phi / np.sqrt(mu)
+
+        self.telemetry = {"method": self.name, "iterations": 1}
+        return vals, phi
+
+class ShiftInvertBackend:
+    """
+    ARPACK Lanczos (eigsh) in shift-invert mode around sigma. A lumped M is
+    turned into the standard problem on y = sqrt(m) phi. The factorization
+    is kept, so further blocks (deflate) cost only solves.
+    """
+    name = "shift_invert"
+
+    def __init__(self):
+        self.telemetry = {}
+        self._op = None
+        self._sigma = None
+
+    def _operator(self, problem, sigma):
+        if self._op is None or self._sigma != sigma:
+            self._op = problem.shift_invert_operator(sigma)
+            self._sigma = sigma
+        return self._op
+
+    def solve(self, problem, k, sigma, deflate=None, X0=None):
+        """
+        deflate: (n, n_found) M-orthonormal modes to skip. They are projected
+        out of the shift-invert operator, so eigsh returns the next k modes.
+        X0: (n, j) approximate modes; their sum is the Lanczos start vector.
+        """
+        count = [0]
+        op = _counted(self._operator(problem, sigma), count)
+        A = problem.stiffness_operator()
+        n = problem.size
+        mass = problem.mass
+
+        if isinstance(mass, np.ndarray):
+            d = 1.0 / np.sqrt(mass)
+            s = np.sqrt(mass)
+            Y = None if deflate is None else deflate * s[:, None]
+            apply = _deflated(lambda y: s * op.matvec(s * np.ravel(y)), Y, Y)
+            A_s = LinearOperator((n, n), matvec=lambda y: d * (A @ (d * np.ravel(y))), dtype=float)
+            OPinv = LinearOperator((n, n), matvec=apply, dtype=float)
+            v0 = None if X0 is None else _start_vector(X0 * s[:, None], Y, Y)
+            vals, y = eigsh(A_s, k=k, sigma=sigma, OPinv=OPinv, v0=v0)
+            phi = y * d[:, None]
+        else:
+            B_Y = None if deflate is None else mass @ deflate
+            apply = _deflated(op.matvec, deflate, B_Y)
+            OPinv = LinearOperator((n, n), matvec=apply, dtype=float)
+            A_op = A if issparse(A) else LinearOperator((n, n), matvec=A.matvec, dtype=float)
+            v0 = None if X0 is None else _start_vector(X0, deflate, B_Y)
+            vals, phi = eigsh(A_op, k=k, M=mass, sigma=sigma, OPinv=OPinv, v0=v0)
+
+        self.telemetry = {"method": self.name, "iterations": count[0]}
+        return vals, phi
+
+class LOBPCGBackend:
+    """
+    Block LOBPCG preconditioned with the factorized K - sigma M. Only the
+    factor and a few n x block vectors are stored (no Lanczos basis).
+
+    tol is relative: LOBPCG's absolute residual tolerance is scaled by the
+    largest Rayleigh quotient of the starting block.
+    """
+    name = "lobpcg"
+
+    def __init__(self, tol=1e-8, maxiter=500, extra_vectors=None):
+        self.tol = tol
+        self.maxiter = maxiter
+        self.extra_vectors = extra_vectors
+        self.telemetry = {}
+        self._precond = None
+        self._sigma = None
+
+    def solve(self, problem, k, sigma, deflate=None, X0=None):
+        """
+        deflate: modes already found, passed to LOBPCG as B-orthogonal
+        constraints. X0: approximate modes that start the block; the
+        remaining columns are preconditioned random vectors. When X0 covers
+        all k modes no extra vectors are added (random ones only slow
+        down a good start).
+        """
+        n = problem.size
+        n_found = 0 if deflate is None else deflate.shape[1]
+        warm = X0 is not None and X0.shape[1] >= k
+        extra = self.extra_vectors if self.extra_vectors is not None else (0 if warm else min(k, 8))
+        block = min(k + extra, n - n_found)
+
+        if self._precond is None or self._sigma != sigma:
+            self._precond = problem.shift_invert_operator(sigma)
+            self._sigma = sigma
+        precond = self._precond
+        A = problem.stiffness_operator()
+        B = _mass_operator(problem.mass)
+
+        rng = np.random.default_rng(n_found)
+        n_warm = 0 if X0 is None else min(X0.shape[1], block)
+        X = np.empty((n, block))
+        if n_warm:
+            X[:, :n_warm] = X0[:, :n_warm]
+        if n_warm < block:
+            X[:, n_warm:] = precond @ rng.standard_normal((n, block - n_warm))
+        if deflate is not None:
+            X -= deflate @ ((B @ deflate).T @ X)
+
+        A_X = np.column_stack([A @ X[:, j] for j in range(block)])
+        B_X = B @ X
+        rayleigh = np.einsum('ij,ij->j', X, A_X) / np.einsum('ij,ij->j', X, B_X)
+        b_max = problem.mass.max() if isinstance(problem.mass, np.ndarray) else abs(B).max()
+        tol = self.tol * abs(rayleigh).max() * np.sqrt(b_max)
+
+        # Convergence is judged on the relative residuals afterwards.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            vals, phi, history = lobpcg(A, X, B=B, M=precond, Y=deflate, largest=False, tol=tol,
+                                        maxiter=self.maxiter, retResidualNormsHistory=True)
+        order = np.argsort(vals)[:k]
+        vals, phi = vals[order], phi[:, order]
+
+        self.telemetry = {"method": self.name, "iterations": max(len(history) - 1, 0), "block_size": block}
+        return vals, phi
+
+def choose_eigen_method(n, k):
+    """Returns (method, reason) for the 'auto' setting."""
+    if n <= DENSE_DOF_LIMIT:
+        return "dense", f"{n} DOFs <= {DENSE_DOF_LIMIT}"
+    if n >= LOBPCG_DOF_LIMIT and k <= LOBPCG_MAX_MODES:
+        return "lobpcg", f"{n} DOFs >= {LOBPCG_DOF_LIMIT}, {k} modes <= {LOBPCG_MAX_MODES}"
+    return "shift_invert", f"{n} DOFs, {k} modes"
+
+def create_eigen_backend(method):
+    if method == "dense":
+        return DenseEigenBackend()
+    if method == "lobpcg":
+        return LOBPCGBackend()
+    return ShiftInvertBackend()
+
+def _resolve_method(problem, k, method):
+    if method not in EIGEN_METHODS:
+        raise SolverException("E107", f"Eigen solver '{method}'. Supported: {', '.join(EIGEN_METHODS)}")
+    if method == "auto":
+        return choose_eigen_method(problem.size, k)
+    return method, "requested"
+
+def solve_eigenproblem(problem, k, sigma=-0.1, method="auto", tol=1e-6, X0=None):
+    """
+    Extracts the k lowest modes of problem with the selected backend.
+    'auto' uses choose_eigen_method(); an auto-selected LOBPCG run whose
+    residuals stay above tol falls back to shift-invert. X0 (problem
+    space, e.g. the modes of a previous run) warm-starts the iterative
+    backends.
+
+    Returns:
+        (vals, vecs, telemetry): vecs expanded by problem.expand().
+    """
+    auto = method == "auto"
+    method, reason = _resolve_method(problem, k, method)
+
+    t0 = time.perf_counter()
+    backend = create_eigen_backend(method)
+    vals, phi = backend.solve(problem, k, sigma, X0=X0)
+    residuals = residual_norms(problem, vals, phi)
+
+    telemetry = dict(backend.telemetry)
+    if auto and method == "lobpcg" and residuals.max() > tol:
+        print(f"      LOBPCG residual {residuals.max():.2e} > {tol:.1e}, falling back to shift-invert")
+        backend = ShiftInvertBackend()
+        vals, phi = backend.solve(problem, k, sigma, X0=X0)
+        residuals = residual_norms(problem, vals, phi)
+        telemetry = dict(backend.telemetry, fallback_from="lobpcg", lobpcg_iterations=telemetry["iterations"])
+
+    telemetry.update({
+        "selection": reason,
+        "n": int(problem.size),
+        "k": int(k),
+        "max_residual": float(residuals.max()) if len(residuals) else 0.0,
+        "converged": bool(residuals.max() <= tol) if len(residuals) else True,
+        "warm_start": 0 if X0 is None else int(X0.shape[1]),
+        "t_solve": time.perf_counter() - t0
+    })
+
+    if not telemetry["converged"]:
+        print(f"      Warning: max eigen residual {telemetry['max_residual']:.2e} exceeds {tol:.1e}")
+
+    return vals, problem.expand(phi), telemetry
+
+def solve_eigenproblem_blocks(problem, block_size, max_modes, stop, sigma=-0.1, method="auto", tol=1e-6, X0=None):
+    """
+    Extracts modes in blocks of block_size with a single backend, so the
+    shift-invert factor (or LOBPCG preconditioner) is built once. Each block
+    deflates the modes found so far. After every block stop(vals, vecs) is
+    called with the new, expanded block; extraction ends when it returns
+    True or max_modes modes were found. 'auto' selects for max_modes.
+    X0 warm-starts every block with its matching columns.
+
+    Returns:
+        (vals, vecs, telemetry): telemetry["blocks"] lists the modes,
+        iterations and time of every block; telemetry["stopped"] is
+        "target" or "cap".
+    """
+    method, reason = _resolve_method(problem, max_modes, method)
+    backend = create_eigen_backend(method)
+
+    t_start = time.perf_counter()
+    vals_all, phi_all, vecs_all = [], None, []
+    blocks, residuals = [], []
+    stopped = "cap"
+
+    n_found = 0
+    while n_found < max_modes:
+        k = min(block_size, max_modes - n_found)
+        t0 = time.perf_counter()
+        X0_block = None if X0 is None or X0.shape[1] <= n_found else X0[:, n_found:n_found + k]
+        vals, phi = backend.solve(problem, k, sigma, deflate=phi_all, X0=X0_block)
+
+        order = np.argsort(vals)
+        vals, phi = vals[order], phi[:, order]
+        phi, _ = mass_normalize(phi, problem.mass)
+        residuals.append(residual_norms(problem, vals, phi))
+
+        vals_all.append(vals)
+        phi_all = phi if phi_all is None else np.column_stack([phi_all, phi])
+        vecs = problem.expand(phi)
+        vecs_all.append(vecs)
+        n_found += k
+
+        blocks.append({
+            "modes": int(k),
+            "iterations": backend.telemetry["iterations"],
+            "t": time.perf_counter() - t0
+        })
+        print(f"      Block {len(blocks)}: modes {n_found - k + 1}-{n_found}, "
+              f"{blocks[-1]['iterations']} iterations, {blocks[-1]['t']:.4f}s")
+
+        if stop(vals, vecs):
+            stopped = "target"
+            break
+
+    residuals = np.concatenate(residuals)
+    telemetry = {
+        "method": method,
+        "selection": reason,
+        "iterations": int(sum(b["iterations"] for b in blocks)),
+        "n": int(problem.size),
+        "k": int(n_found),
+        "max_residual": float(residuals.max()) if len(residuals) else 0.0,
+        "converged": bool(residuals.max() <= tol) if len(residuals) else True,
+        "warm_start": 0 if X0 is None else int(X0.shape[1]),
+        "t_solve": time.perf_counter() - t_start,
+        "blocks": blocks,
+        "stopped": stopped
+    }
+    return np.concatenate(vals_all), np.column_stack(vecs_all), telemetry
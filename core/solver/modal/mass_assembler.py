@@ -1,30 +1,76 @@
 import numpy as np
-from scipy.sparse import lil_matrix
+from scipy.sparse import diags, csr_matrix
+from linear_static.block_sparse import to_block6
+
+MASS_TYPES = ("lumped", "consistent")
 
 class GlobalMassAssembler:
     def __init__(self, data_manager):
         self.dm = data_manager
         self.total_dofs = self.dm.total_dofs
-        self.M = lil_matrix((self.total_dofs, self.total_dofs))
-        print(" [DEBUG] Initialized Mass Assembler (V4 - Net Force Method)")
-
-    def build_mass_matrix(self, mass_source_name):
+        self.m = np.zeros(self.total_dofs)
+        self.M_consistent = None
+        self.mass_type = "lumped"
+
+    @property
+    def is_lumped(self):
+        return self.M_consistent is None
+
+    def build_mass(self, mass_source_name):
+        """
+        Assembles the mass of a mass source.
+
+        Returns:
+            np.ndarray (n_dofs,) diagonal of the lumped mass, or a sparse
+            CSR matrix when the mass source sets "mass_type": "consistent"
+            (consistent element mass plus the lumped mass from loads).
+        """
         print(f"Mass Assembler: Building M for source '{mass_source_name}'...")
-        
+        self.m = np.zeros(self.total_dofs)
+        self.M_consistent = None
+
         ms_def = self._find_mass_source(mass_source_name)
         if not ms_def:
             print(f"Error: Mass Source '{mass_source_name}' not found. Using zero mass.")
-            return self.M
+            return self.m
+
+        self.mass_type = ms_def.get("mass_type", "lumped")
+        if self.mass_type not in MASS_TYPES:
+            print(f"Warning: Unknown mass type '{self.mass_type}'. Using lumped mass.")
+            self.mass_type = "lumped"
 
         if ms_def.get("include_self_mass", True):
-            self._add_element_self_mass()
+            if self.mass_type == "consistent":
+                self._add_element_consistent_mass()
+            else:
+                self._add_element_self_mass()
 
         if ms_def.get("include_patterns", False):
             patterns = ms_def.get("load_patterns", []) 
             self._add_mass_from_net_loads(patterns)
 
-        print(f"Mass Assembler: Mass Matrix Assembled. Non-zeros: {self.M.nnz}")
-        return self.M
+        if self.is_lumped:
+            print(f"Mass Assembler: Lumped Mass Assembled. Non-zeros: {np.count_nonzero(self.m)}")
+            return self.m
+
+        M = csr_matrix(self.M_consistent + diags(self.m))
+        print(f"Mass Assembler: Consistent Mass Matrix Assembled. Non-zeros: {M.nnz}")
+        return M
+
+    def build_mass_matrix(self, mass_source_name):
+        """Same as build_mass() but always returns a sparse matrix."""
+        M = self.build_mass(mass_source_name)
+        return diags(M).tocsr() if isinstance(M, np.ndarray) else M
+
+    def mass_matrix(self):
+        """Sparse M of the last build."""
+        if self.is_lumped:
+            return diags(self.m).tocsr()
+        return csr_matrix(self.M_consistent + diags(self.m))
+
+    def block_matrix(self):
+        """Returns the assembled M as a 6x6 node-block BSR matrix."""
+        return to_block6(self.mass_matrix())
 
     def _find_mass_source(self, name):
         sources = self.dm.raw.get("mass_sources", [])
@@ -40,23 +86,58 @@ class GlobalMassAssembler:
                 elif isinstance(sources, dict): return list(sources.values())[0]
         return None
 
+    def _element_arrays(self):
+        """Per-element (node_indices (n, 2), mass per length (n,), L (n,))."""
+        elements = self.dm.elements
+        g = 9.80665
+        node_idx = np.array([el['node_indices'] for el in elements], dtype=np.int64).reshape(-1, 2)
+        A = np.array([el['section']['A'] for el in elements], dtype=float)
+        rho = np.array([el['material']['rho'] for el in elements], dtype=float)
+        L = np.array([el['L_total'] for el in elements], dtype=float)
+        return node_idx, A * (rho / g), L
+
     def _add_element_self_mass(self):
         print("   -> Adding Element Self-Mass (Lumped)...")
-        for el in self.dm.elements:
-            A = el['section']['A']
-            rho = el['material']['rho'] 
-            L = el['L_total']
-            g = 9.80665
-            mass_density = rho / g
-            total_mass = A * mass_density * L
-            
-            for n_idx in el['node_indices']:
-                start_dof = n_idx * 6
-                half_mass = total_mass / 2.0
-                
-                self.M[start_dof + 0, start_dof + 0] += half_mass
-                self.M[start_dof + 1, start_dof + 1] += half_mass
-                self.M[start_dof + 2, start_dof + 2] += half_mass
+        if not self.dm.elements:
+            return
+        node_idx, m_bar, L = self._element_arrays()
+        half_mass = (m_bar * L) / 2.0
+
+        # Element-major order, like the original per-element accumulation.
+        dofs = node_idx[:, :, None] * 6 + np.arange(3)
+        vals = np.broadcast_to(half_mass[:, None, None], dofs.shape)
+        np.add.at(self.m, dofs.ravel(), vals.ravel())
+
+    def _add_element_consistent_mass(self):
+        print("   -> Adding Element Self-Mass (Consistent)...")
+        from element_library import get_local_consistent_mass_matrices, get_rotation_matrices
+
+        elements = self.dm.elements
+        n = self.total_dofs
+        if not elements:
+            self.M_consistent = csr_matrix((n, n))
+            return
+
+        node_idx, m_bar, L = self._element_arrays()
+        A = np.array([el['section']['A'] for el in elements], dtype=float)
+        Ip = np.array([el['section']['I22'] + el['section']['I33'] for el in elements], dtype=float)
+        r2 = np.divide(Ip, A, out=np.zeros_like(Ip), where=A > 0)
+
+        coords = np.array([node['coords'] for node in self.dm.nodes], dtype=float)
+        beta = np.array([el['beta'] for el in elements], dtype=float)
+        R = get_rotation_matrices(coords[node_idx[:, 0]], coords[node_idx[:, 1]], beta)
+
+        T = np.zeros((len(elements), 12, 12))
+        for i in range(4):
+            T[:, i*3:(i+1)*3, i*3:(i+1)*3] = R
+
+        m_local = get_local_consistent_mass_matrices(m_bar, r2, L)
+        m_global = np.transpose(T, (0, 2, 1)) @ m_local @ T
+
+        dofs = (node_idx[:, :, None] * 6 + np.arange(6)).reshape(len(elements), 12)
+        rows = np.repeat(dofs, 12, axis=1).ravel()
+        cols = np.tile(dofs, (1, 12)).ravel()
+        self.M_consistent = csr_matrix((m_global.ravel(), (rows, cols)), shape=(n, n))
 
     def _add_mass_from_net_loads(self, pattern_list):
         print("   -> Calculating Net Nodal Forces (Algebraic Sum)...")
@@ -150,17 +231,11 @@ class GlobalMassAssembler:
                     F_accum[dof + 2] += F_vec_global[2] * ratios[k]
 
         print("   -> Converting NET Gravity Forces to Mass...")
-        mass_added_count = 0
+        Fz_net = F_accum[2::6]
+        loaded = np.flatnonzero(Fz_net < -1e-5)
+        mass_val = np.abs(Fz_net[loaded]) / g
 
-        for i in range(2, self.total_dofs, 6):
-            Fz_net = F_accum[i]
-            
-            if Fz_net < -1e-5:
-                mass_val = abs(Fz_net) / g
-                
-                self.M[i-2, i-2] += mass_val
-                self.M[i-1, i-1] += mass_val
-                self.M[i,   i]   += mass_val
-                mass_added_count += 1
-            
-        print(f"   -> Added Net Mass to {mass_added_count} nodes.")
+        for k in range(3):
+            self.m[loaded * 6 + k] += mass_val
+
+        print(f"   -> Added Net Mass to {len(loaded)} nodes.")
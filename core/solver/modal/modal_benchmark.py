@@ -0,0 +1,79 @@
+import os
+import tempfile
+import numpy as np
+
+from modal_engine import run_modal_analysis
+from modal_store import load_modal_results
+
+def _load_modes(path):
+    res, store = load_modal_results(path)
+    return res["info"].get("eigen", {}), store.column("periods", "T"), np.array(store.phi)
+
+def _compare_runs(json_path, runs):
+    """
+    Runs the modal analysis once per {label: run_modal_analysis kwargs} and
+    compares eigen solve time, periods and mode shapes (MAC) against the
+    first run.
+    """
+    loaded = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, kwargs in runs.items():
+            out = os.path.join(tmp, f"modal_{label}.json")
+            run_modal_analysis(json_path, out, **kwargs)
+            loaded[label] = _load_modes(out)
+
+    ref_info, ref_T, ref_phi = next(iter(loaded.values()))
+    report = {}
+    for label, (info, T, phi) in loaded.items():
+        n = min(len(T), len(ref_T))
+        rel_dT = np.abs(T[:n] - ref_T[:n]) / np.abs(ref_T[:n])
+        num = np.einsum('ij,ij->j', phi[:, :n], ref_phi[:, :n])**2
+        den = np.einsum('ij,ij->j', phi[:, :n], phi[:, :n]) * np.einsum('ij,ij->j', ref_phi[:, :n], ref_phi[:, :n])
+        report[label] = {
+            "method": info.get("method"),
+            "n_eigen": info.get("n_eigen"),
+            "iterations": info.get("iterations"),
+            "t_eigen": info.get("t_eigen"),
+            "max_rel_dT": float(rel_dT.max()) if n else 0.0,
+            "min_MAC": float((num / den).min()) if n else 1.0
+        }
+
+    print(f"\n{'run':>14} {'method':>13} {'n_eigen':>8} {'iter':>6} {'t_eigen [s]':>12} {'max rel dT':>12} {'min MAC':>10}")
+    for label, r in report.items():
+        print(f"{label:>14} {r['method']:>13} {r['n_eigen']:>8} {r['iterations']:>6} {r['t_eigen']:>12.4f} "
+              f"{r['max_rel_dT']:>12.2e} {r['min_MAC']:>10.6f}")
+    return report
+
+def compare_condensation(json_path, modes=("none", "guyan"), eigen_solver="shift_invert"):
+    """
+    Regularized vs condensed massless DOFs with the same eigen solver.
+
+    Returns:
+        dict: {mode: {"method", "n_eigen", "iterations", "t_eigen", "max_rel_dT", "min_MAC"}}
+    """
+    return _compare_runs(json_path, {m: {"condensation": m, "eigen_solver": eigen_solver} for m in modes})
+
+def compare_eigen_solvers(json_path, methods=("shift_invert", "dense", "lobpcg"), condensation="none"):
+    """Every eigen backend on the same model; the first one is the reference."""
+    return _compare_runs(json_path, {m: {"condensation": condensation, "eigen_solver": m} for m in methods})
+
+def check_eigen_agreement(json_path, methods=("shift_invert", "dense"), rtol=1e-10):
+    """
+    Checks that the eigen backends give the same periods as the first one
+    (shift-invert by default) within rtol.
+
+    Returns:
+        (ok, report): report as in compare_eigen_solvers.
+    """
+    report = compare_eigen_solvers(json_path, methods)
+    bad = {label: r["max_rel_dT"] for label, r in report.items() if r["max_rel_dT"] > rtol}
+    for label, dT in bad.items():
+        print(f"Periods of '{label}' differ from '{methods[0]}' by {dT:.2e} (> {rtol:.0e})")
+    return not bad, report
+
+if __name__ == "__main__":
+    import sys
+    example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                           "Example_Project", "Example_File.mf")
+    ok, _ = check_eigen_agreement(sys.argv[1] if len(sys.argv) > 1 else os.path.normpath(example))
+    sys.exit(0 if ok else 1)
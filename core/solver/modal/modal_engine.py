@@ -3,7 +3,8 @@ import os
 import time
 import numpy as np
 import json
-from scipy.sparse.linalg import eigsh
+from scipy.sparse import diags, csc_matrix
+from scipy.sparse.linalg import spsolve
 
 current_dir = os.path.dirname(os.path.abspath(__file__))                        
 solver_dir = os.path.dirname(current_dir)                                 
@@ -20,7 +21,15 @@ if linear_static_dir not in sys.path:
 from linear_static.data_manager import DataManager
 from linear_static.assembler import GlobalAssembler
 from linear_static.error_definitions import SolverException
+from linear_static.diaphragm import diaphragm_transformation, reduce_matrix
 from mass_assembler import GlobalMassAssembler
+from condensation import MasslessCondensation, CONDENSATION_MODES
+from spectrum_slicing import solve_frequency_band
+from ritz_vectors import generate_ritz_vectors, VECTOR_TYPES
+from warm_start import load_previous_shapes
+from modal_store import write_modal_store
+from eigen_backends import SparseEigenProblem, FactorOrdering, solve_eigenproblem, solve_eigenproblem_blocks, EIGEN_METHODS
+from result_helper import influence_matrix, mass_product, modal_masses, mass_normalize, modal_frequencies, participation, node_tables
 
 def _write_error(out_path, error_code, extra=""):
     """Writes the error to JSON and returns True so the UI loads the error dialog."""
@@ -32,285 +41,446 @@ def _write_error(out_path, error_code, extra=""):
         pass
     return True
 
-def run_modal_analysis(input_json_path, output_json_path):
-    print("="*60)
-    print(f"METUFIRE MODAL ENGINE | V0.3 (Shift-Invert)")
-    print(f"Target: {os.path.basename(input_json_path)}")
-    print("="*60)
+def _participation_targets(spec):
+    """
+    Cumulative mass ratio targets as a (3,) array for X, Y, Z (0 = no
+    target). spec is a number (applied to X and Y) or {"x":, "y":, "z":}.
+    """
+    targets = np.zeros(3)
+    if isinstance(spec, dict):
+        for k, axis in enumerate("xyz"):
+            targets[k] = float(spec.get(axis, spec.get(axis.upper(), 0.0)) or 0.0)
+    else:
+        targets[:2] = float(spec)
+    return targets
+
+class ModalSession:
+    """
+    One model, many modal runs. The model is read and K_free assembled once;
+    run() then solves the modal analysis for any mass source and shift and
+    writes its own result set. Eigenproblems with the same structure share
+    the fill-reducing ordering of their factorizations (FactorOrdering).
+    """
+    def __init__(self, input_json_path):
+        print("="*60)
+        print(f"METUFIRE MODAL ENGINE | V0.3 (Shift-Invert)")
+        print(f"Target: {os.path.basename(input_json_path)}")
+        print("="*60)
+
+        self.input_json_path = input_json_path
+        t0 = time.time()
+
+        try:
+            print("[1/7] Initializing Data Manager...")
+            self.dm = DataManager(input_json_path)
+            self.dm.process_all(case_name="MODAL")
+        except Exception as e:
+            print(f"FATAL: Data Load Error: {e}")
+            raise SolverException("E102", str(e))
+
+        try:
+            print("[2/7] Assembling Stiffness Matrix (K)...")
+            assembler = GlobalAssembler(self.dm)
+            self.K_free = assembler.assemble_stiffness(partitioned=True)
+            self.is_free = assembler.is_free
+            self.mass_assembler = GlobalMassAssembler(self.dm)
+        except Exception as e:
+            print(f"FATAL: Matrix Assembly Error: {e}")
+            raise SolverException("E000", f"Matrix Assembly Error: {e}")
+
+        self.modal_case_def = next((c for c in self.dm.raw['load_cases'] if c['name'] == "MODAL"), None)
+        # FactorOrdering per eigenproblem structure, shared by all runs.
+        self.orderings = {}
+        self.t_setup = time.time() - t0
+
+    def _ordering(self, condensation, K):
+        return self.orderings.setdefault((condensation, K.shape[0], K.nnz), FactorOrdering())
+
+    def run(self, output_json_path, mass_source=None, sigma=None, condensation=None, eigen_solver=None,
+            target_participation=None, frequency_band=None, vector_type=None, warm_start=None):
+        """
+        Modal analysis for one mass source (default: the MODAL case's
+        "mass_source") and shift sigma (default: the case's "shift", else
+        -0.1), written to output_json_path.
+
+        condensation: "none" (regularize massless DOFs) or "guyan" (condense
+        them out of the eigenproblem). eigen_solver: one of EIGEN_METHODS
+        ("auto" picks by problem size and mode count). Both default to the
+        MODAL case's "condensation" / "eigen_solver" entries, else
+        "none" / "auto".
+
+        target_participation (or the MODAL case entry of that name): a
+        cumulative mass ratio such as 0.9, or {"x": 0.9, "y": 0.9}. Modes are
+        then extracted in blocks of num_modes until every target is met or
+        the case's "max_modes" (default 300) is reached.
+
+        frequency_band (or the MODAL case entry): [f_min, f_max] in Hz. All
+        modes in the band are extracted by spectrum slicing in a process pool
+        ("slices" / "workers" case entries) and checked with Sturm counts;
+        num_modes and target_participation are then ignored.
+
+        vector_type (or the MODAL case entry): "eigen" or "ritz". Ritz vectors
+        are generated from the ground-motion loads M R with one factorization
+        and reported in the same tables; with target_participation they are
+        generated until the targets are met (Ritz vectors reach them with far
+        fewer vectors than eigenvectors).
+
+        warm_start (or the MODAL case entry): path of a previous modal results
+        file, or True for output_json_path. Its mode shapes, matched by node
+        id, start the iterative eigen solvers (Lanczos start vector, LOBPCG
+        block), so a rerun after small edits needs fewer iterations.
+
+        The results JSON holds the tables; mode shapes, periods and
+        participation are also written as memory-mappable arrays to the
+        modal_store.store_path() directory next to it.
+        """
+        dm = self.dm
+        K_free = self.K_free
+        is_free = self.is_free
+        modal_case_def = self.modal_case_def
+
+        try:
+            print("[3/7] Assembling Mass Matrix (M)...")
+            ms_name = mass_source
+            if ms_name is None:
+                ms_name = modal_case_def.get("mass_source", "Default") if modal_case_def else "Default"
+
+            M_full = self.mass_assembler.build_mass(ms_name)
+            lumped = isinstance(M_full, np.ndarray)
+            M_diag = M_full if lumped else M_full.diagonal()
+
+            if M_diag.sum() < 1e-9:
+                return _write_error(output_json_path, "E105", f"Mass Source '{ms_name}' resulted in zero mass.")
+
+        except Exception as e:
+            print(f"FATAL: Matrix Assembly Error: {e}")
+            return _write_error(output_json_path, "E000", f"Matrix Assembly Error: {e}")
+
+        print("[4/7] Applying Boundary Conditions...")
     
-    start_time = time.time()
+        free_dof_indices = np.where(is_free)[0]
+        num_free_dofs = len(free_dof_indices)
     
-    try:
-        print("[1/6] Initializing Data Manager...")
-        dm = DataManager(input_json_path)
-        target_case = "MODAL"
-        dm.process_all(case_name=target_case)
-    except Exception as e:
-        print(f"FATAL: Data Load Error: {e}")
-        return _write_error(output_json_path, "E102", str(e))
-
-    try:
-        print("[2/6] Assembling System Matrices (K & M)...")
-        
-        assembler = GlobalAssembler(dm)
-                                                                                                 
-        res = assembler.assemble_system()
-        K_full = res[0]                    
-        
-        modal_case_def = next((c for c in dm.raw['load_cases'] if c['name'] == "MODAL"), None)
-        ms_name = modal_case_def.get("mass_source", "Default") if modal_case_def else "Default"
-        
-        mass_assembler = GlobalMassAssembler(dm)
-        M_full = mass_assembler.build_mass_matrix(ms_name)
-
-        if M_full.nnz == 0 or M_full.diagonal().sum() < 1e-9:
-            return _write_error(output_json_path, "E105", f"Mass Source '{ms_name}' resulted in zero mass.")
-
-        results = {
-            "status": "SUCCESS",
-            "info": {"type": "Modal Analysis"},
-            "mode_shapes": {},
-            "tables": { ... }
-        }
-        
-    except Exception as e:
-        print(f"FATAL: Matrix Assembly Error: {e}")
-        return _write_error(output_json_path, "E000", f"Matrix Assembly Error: {e}")
-
-    print("[3/6] Applying Boundary Conditions...")
-    
-    is_free = np.ones(dm.total_dofs, dtype=bool)
-    for node in dm.nodes:
-        start_idx = node['idx'] * 6
-        restraints = node['restraints']                           
-        for i in range(6):
-            if restraints[i]:           
-                is_free[start_idx + i] = False
+        print(f"      Total DOFs: {dm.total_dofs}")
+        print(f"      Free  DOFs: {num_free_dofs}")
     
-    free_dof_indices = np.where(is_free)[0]
-    num_free_dofs = len(free_dof_indices)
-    
-    print(f"      Total DOFs: {dm.total_dofs}")
-    print(f"      Free  DOFs: {num_free_dofs}")
-    
-    if num_free_dofs == 0:
-        print("Error: Structure is fully constrained.")
-        return _write_error(output_json_path, "E301", "Structure is fully constrained. No free DOFs.")
-
-    K_free = K_full.tocsc()[is_free, :][:, is_free]
-    M_free = M_full.tocsc()[is_free, :][:, is_free]
-
-    m_diag = M_free.diagonal()
-    min_nonzero_mass = m_diag[m_diag > 1e-10].min() * 1e-6
-    from scipy.sparse import diags
-    zero_mask = m_diag < 1e-10
-    reg = diags(zero_mask.astype(float) * min_nonzero_mass)
-    M_free = M_free + reg
-
-    print(f"DEBUG: M_free sum = {M_free.sum():.6f}")
-    print(f"DEBUG: M_free diagonal sum = {M_free.diagonal().sum():.6f}")
-
-    try:
-        req_modes = modal_case_def.get("num_modes", 12) if modal_case_def else 12
-  
-        n_free_dofs = K_free.shape[0]
-        max_safe_modes = max(1, n_free_dofs - 2)
-        safe_num_modes = min(req_modes, max_safe_modes)
+        if num_free_dofs == 0:
+            print("Error: Structure is fully constrained.")
+            return _write_error(output_json_path, "E301", "Structure is fully constrained. No free DOFs.")
+
+        # Lumped mass stays a vector (diagonal of M) all the way through; a
+        # consistent mass keeps the general sparse path.
+        m_diag = M_diag[is_free]
+        min_nonzero_mass = m_diag[m_diag > 1e-10].min() * 1e-6
+        zero_mask = m_diag < 1e-10
+        reg = zero_mask.astype(float) * min_nonzero_mass
+        if lumped:
+            M_free = m_diag + reg
+            m_free_diag = M_free
+            M_rigid = m_diag
+        else:
+            M_rigid = M_full.tocsc()[is_free, :][:, is_free]
+            M_free = M_rigid + diags(reg)
+            m_free_diag = M_free.diagonal()
+
+        print(f"      Mass: {'lumped (diagonal)' if lumped else 'consistent (sparse)'}, "
+              f"free diagonal sum = {m_free_diag.sum():.6f}")
+
+        # Rigid diaphragms: solve the eigenproblem on T^T K T / T^T M T with the
+        # masters at each floor's centre of mass, then expand the mode shapes.
+        T = None
+        diaphragm_masters = {}
+        K_eig, M_eig = K_free, M_free
+        if dm.diaphragms:
+            T, diaphragm_masters = diaphragm_transformation(dm, is_free, M_diag[0::6])
+            K_eig = reduce_matrix(T, K_free)
+            M_eig = reduce_matrix(T, diags(M_free) if lumped else M_free)
+            print(f"      Rigid Diaphragms: {len(diaphragm_masters)} -> {K_eig.shape[0]} of {num_free_dofs} DOFs in the eigenproblem")
+
+        if condensation is None:
+            condensation = modal_case_def.get("condensation", "none") if modal_case_def else "none"
+        if condensation not in CONDENSATION_MODES:
+            return _write_error(output_json_path, "E107",
+                f"Condensation '{condensation}'. Supported: {', '.join(CONDENSATION_MODES)}")
+
+        if eigen_solver is None:
+            eigen_solver = modal_case_def.get("eigen_solver", "auto") if modal_case_def else "auto"
+        if eigen_solver not in EIGEN_METHODS:
+            return _write_error(output_json_path, "E107",
+                f"Eigen solver '{eigen_solver}'. Supported: {', '.join(EIGEN_METHODS)}")
+
+        if target_participation is None and modal_case_def:
+            target_participation = modal_case_def.get("target_participation")
+        targets = None if target_participation is None else _participation_targets(target_participation)
+
+        if frequency_band is None and modal_case_def:
+            frequency_band = modal_case_def.get("frequency_band")
+
+        if vector_type is None:
+            vector_type = modal_case_def.get("vector_type", "eigen") if modal_case_def else "eigen"
+        if vector_type not in VECTOR_TYPES:
+            return _write_error(output_json_path, "E107",
+                f"Vector type '{vector_type}'. Supported: {', '.join(VECTOR_TYPES)}")
+        if vector_type == "ritz" and frequency_band is not None:
+            return _write_error(output_json_path, "E107",
+                "A frequency band cannot be combined with Ritz vectors. Use eigenvectors.")
+        if frequency_band is not None:
+            targets = None
+
+        # Rigid-body mass R^T M R (the translational diagonal sum for lumped mass).
+        R = influence_matrix(is_free)
+        total_mass = modal_masses(R, M_rigid)
+
+        try:
+            req_modes = modal_case_def.get("num_modes", 12) if modal_case_def else 12
+            max_modes = modal_case_def.get("max_modes", 300) if modal_case_def else 300
+
+            # Guyan: condense the massless DOFs of the unregularized M instead of
+            # giving them an artificial mass.
+            condenser = None
+            if condensation == "guyan":
+                M_raw = M_rigid
+                if T is not None:
+                    M_raw = reduce_matrix(T, diags(M_rigid) if lumped else M_rigid)
+                condenser = MasslessCondensation(K_eig, M_raw, ordering=self._ordering("guyan", K_eig))
+                if condenser.n_b == 0:
+                    print("      Guyan Condensation: no massless DOFs, solving the full problem")
+                    condenser = None
+                else:
+                    M_free = M_rigid
+                    print(f"      Guyan Condensation: {condenser.n_b} massless DOFs condensed, "
+                          f"{condenser.n_a} of {K_eig.shape[0]} DOFs in the eigenproblem")
+
+            n_free_dofs = condenser.n_a if condenser else K_eig.shape[0]
+            max_safe_modes = max(1, n_free_dofs - 2)
+            safe_num_modes = min(req_modes, max_safe_modes)
         
-        if safe_num_modes <= 0:
-            return _write_error(output_json_path, "E304",
-                f"Structure only has {n_free_dofs} free DOFs. Need at least 2 free DOFs for modal analysis.")
+            if safe_num_modes <= 0:
+                return _write_error(output_json_path, "E304",
+                    f"Structure only has {n_free_dofs} free DOFs. Need at least 2 free DOFs for modal analysis.")
             
-        if safe_num_modes < req_modes:
-            print(f"Warning: Requested {req_modes} modes but model only has {n_free_dofs} free DOFs. Clamped to {safe_num_modes} modes.")
-            req_modes = safe_num_modes
-
-        print(f"[4/6] Solving Eigenvalues (Shift-Invert @ -0.1)...")
-        sigma_shift = -0.1
-
-        print(f"K_free shape: {K_free.shape}")
-        print(f"M_free shape: {M_free.shape}")
-        print(f"K_free diagonal min: {K_free.diagonal().min():.6f}")
-        print(f"M_free diagonal min: {M_free.diagonal().min():.6f}")
-        print(f"M_free diagonal sum: {M_free.diagonal().sum():.6f}")
-
-        k_row_sums = np.abs(K_free).sum(axis=1).A1
-        zero_k_rows = np.where(k_row_sums < 1e-10)[0]
-        print(f"Zero rows in K_free: {len(zero_k_rows)} -> indices: {zero_k_rows[:10]}")
-
-        m_diag = M_free.diagonal()
-        zero_m_rows = np.where(m_diag < 1e-10)[0]
-        print(f"Zero diagonal in M_free: {len(zero_m_rows)} / {len(m_diag)}")
-                             
-        vals, vecs = eigsh(K_free, M=M_free, k=req_modes, sigma=sigma_shift)
-        
-        print(f"      Converged. Found {len(vals)} modes.")
-
-    except Exception as e:
-        err_str = str(e)
-        print(f"FATAL: Eigen Solver Error: {err_str}")
-        if "-9999" in err_str or "Arnoldi" in err_str:
-            return _write_error(output_json_path, "E304",
-                f"Requested {req_modes} modes but the solver could not converge. "
-                f"Your model has {n_free_dofs} free DOFs. "
-                f"Try reducing Number of Modes to {max(1, req_modes // 2)} or check for disconnected nodes.")
-        else:
-            return _write_error(output_json_path, "E303", f"ARPACK Error: {err_str}")
-
-    print("[5/6] Calculating Modal Participation...")
+            if safe_num_modes < req_modes:
+                print(f"Warning: Requested {req_modes} modes but model only has {n_free_dofs} free DOFs. Clamped to {safe_num_modes} modes.")
+                req_modes = safe_num_modes
+            max_modes = max(req_modes, min(max_modes, max_safe_modes))
+
+            sigma_shift = sigma
+            if sigma_shift is None:
+                sigma_shift = modal_case_def.get("shift", -0.1) if modal_case_def else -0.1
+            print(f"[5/7] Solving Eigenvalues ('{eigen_solver}', shift @ {sigma_shift})...")
+
+            problem = condenser
+            if problem is None:
+                problem = SparseEigenProblem(K_eig, M_eig, ordering=self._ordering("none", K_eig))
+
+            if warm_start is None and modal_case_def:
+                warm_start = modal_case_def.get("warm_start")
+            X0, warm_info = None, None
+            if warm_start and vector_type == "eigen" and frequency_band is None:
+                warm_path = output_json_path if warm_start is True else warm_start
+                n_warm = max_modes if targets is not None else req_modes
+                X0, warm_info = load_previous_shapes(warm_path, dm, is_free, n_warm)
+                if X0 is None:
+                    print(f"      Warm start: {warm_info['reason']}, cold start.")
+                else:
+                    # Previous shapes onto the eigenproblem DOFs: M-projection onto
+                    # the diaphragm space, then the mass DOFs when condensed.
+                    if T is not None:
+                        X0 = spsolve(csc_matrix(M_eig), T.T @ mass_product(M_free, X0)).reshape(-1, X0.shape[1])
+                    X0 = problem.restrict(X0)
+                    print(f"      Warm start: {warm_info['modes']} modes from {warm_info['source']}, "
+                          f"{warm_info['matched_nodes']} of {warm_info['nodes']} nodes matched")
+            if targets is not None:
+                print(f"      Target participation X/Y/Z = {targets[0]:.2f} / {targets[1]:.2f} / {targets[2]:.2f}, "
+                      f"blocks of {req_modes}, at most {max_modes} modes")
+            reached = np.zeros(3)
+
+            def targets_met(vals_block, vecs_block):
+                if T is not None:
+                    vecs_block = T @ vecs_block
+                phi_block, Mn_block = mass_normalize(vecs_block, M_free)
+                ratio_block, _, _ = participation(phi_block, M_free, R, Mn_block, total_mass)
+                reached[:] += ratio_block.sum(axis=0)
+                print(f"      Cumulative participation X/Y/Z = {reached[0]:.4f} / {reached[1]:.4f} / {reached[2]:.4f}")
+                return bool(np.all(reached >= targets))
+
+            if vector_type == "ritz":
+                # Starting loads M R for the directions that carry mass, in problem space.
+                loads = mass_product(M_free, R[:, total_mass > 0])
+                if T is not None:
+                    loads = T.T @ loads
+                loads = problem.reduce_load(loads)
+                n_vectors = max_modes if targets is not None else req_modes
+                print(f"      Ritz vectors: {loads.shape[1]} load patterns, at most {n_vectors} vectors")
+                vals, vecs, eigen_info = generate_ritz_vectors(problem, loads, n_vectors, sigma_shift,
+                                                               stop=targets_met if targets is not None else None)
+            elif frequency_band is not None:
+                f_min, f_max = (float(f) for f in frequency_band)
+                print(f"      Frequency band {f_min:.3f}-{f_max:.3f} Hz (spectrum slicing)")
+                vals, vecs, eigen_info = solve_frequency_band(
+                    problem, f_min, f_max,
+                    n_slices=modal_case_def.get("slices") if modal_case_def else None,
+                    workers=modal_case_def.get("workers") if modal_case_def else None,
+                    lam_floor=sigma_shift)
+                if len(vals) == 0:
+                    return _write_error(output_json_path, "E304", f"No modes between {f_min} and {f_max} Hz.")
+            elif targets is None:
+                vals, vecs, eigen_info = solve_eigenproblem(problem, req_modes, sigma_shift, eigen_solver, X0=X0)
+            else:
+                vals, vecs, eigen_info = solve_eigenproblem_blocks(problem, req_modes, max_modes, targets_met,
+                                                                   sigma_shift, eigen_solver, X0=X0)
+            if targets is not None:
+                eigen_info["target"] = {"x": targets[0], "y": targets[1], "z": targets[2]}
+                eigen_info["reached"] = eigen_info["stopped"] == "target"
+                if not eigen_info["reached"]:
+                    print(f"Warning: Participation target not reached within {max_modes} modes.")
+            if warm_info is not None:
+                eigen_info["warm_start"] = dict(warm_info, vectors=eigen_info.get("warm_start", 0))
+            if T is not None:
+                vecs = T @ vecs
+
+            print(f"      Backend '{eigen_info['method']}' ({eigen_info['selection']}): {eigen_info['iterations']} iterations, "
+                  f"max residual {eigen_info['max_residual']:.2e}, {eigen_info['t_solve']:.4f}s")
+            print(f"      Converged. Found {len(vals)} modes.")
+
+        except Exception as e:
+            err_str = str(e)
+            print(f"FATAL: Eigen Solver Error: {err_str}")
+            if "-9999" in err_str or "Arnoldi" in err_str:
+                return _write_error(output_json_path, "E304",
+                    f"Requested {req_modes} modes but the solver could not converge. "
+                    f"Your model has {n_free_dofs} free DOFs. "
+                    f"Try reducing Number of Modes to {max(1, req_modes // 2)} or check for disconnected nodes.")
+            else:
+                return _write_error(output_json_path, "E303", f"ARPACK Error: {err_str}")
+
+        print("[6/7] Calculating Modal Participation...")
     
-    results = {
-        "status": "SUCCESS",
-        "info": {"type": "Modal Analysis"},
-        "mode_shapes": {},
-        "tables": {
-            "periods": [],
-            "participation_mass": []
+        results = {
+            "status": "SUCCESS",
+            "info": {
+                "type": "Modal Analysis",
+                "mass_source": ms_name,
+                "shift": float(sigma_shift),
+                "vector_type": vector_type,
+                "eigen": dict(eigen_info,
+                    condensation=condensation if condenser else "none",
+                    n_free=int(num_free_dofs),
+                    n_eigen=int(n_free_dofs),
+                    t_eigen=eigen_info["t_solve"])
+            },
+            "tables": {
+                "periods": [],
+                "participation_mass": []
+            }
         }
-    }
+        if diaphragm_masters:
+            results["diaphragms"] = {name: {"axis": d["axis"], "center_of_mass": d["center"], "nodes": d["nodes"]}
+                                     for name, d in diaphragm_masters.items()}
 
-    print("      Extracting Assembled Joint Masses...")
-    assembled_mass = {}
-    M_diag = M_full.diagonal()                                        
-    
-    for node in dm.nodes:
-        nid = str(node['id'])
-        idx = node['idx'] * 6
-        m_vals = M_diag[idx : idx+6].tolist()
-        assembled_mass[nid] = m_vals
-        
-    results["assembled_mass"] = assembled_mass
-
-    diag_M = M_full.diagonal()
-    
-    mask_x = np.zeros(dm.total_dofs, dtype=bool); mask_x[0::6] = True
-    mask_y = np.zeros(dm.total_dofs, dtype=bool); mask_y[1::6] = True
-    mask_z = np.zeros(dm.total_dofs, dtype=bool); mask_z[2::6] = True
-    
-    total_mass_x = np.sum(diag_M[mask_x & is_free])
-    total_mass_y = np.sum(diag_M[mask_y & is_free])
-    total_mass_z = np.sum(diag_M[mask_z & is_free])                                      
-
-    print(f"DEBUG: total_mass_x = {total_mass_x:.6f} kg")
-    print(f"DEBUG: total_mass_x in kN-s²/m = {total_mass_x / 1000:.6f}")
-    print(f"DEBUG: Sum of all assembled masses X = {sum(assembled_mass[nid][0] for nid in assembled_mass):.6f}")
-
-    results["total_mass"] = {
-        "x": float(total_mass_x),
-        "y": float(total_mass_y),
-        "z": float(total_mass_z)
-    }
-    
-    sum_ratio_x = 0.0
-    sum_ratio_y = 0.0
-    sum_ratio_z = 0.0                                 
-
-    r_x = np.zeros(dm.total_dofs); r_x[0::6] = 1.0
-    r_y = np.zeros(dm.total_dofs); r_y[1::6] = 1.0
-    r_z = np.zeros(dm.total_dofs); r_z[2::6] = 1.0                               
-    
-    r_x_free = r_x[is_free]
-    r_y_free = r_y[is_free]
-    r_z_free = r_z[is_free]                                
+        print("      Extracting Assembled Joint Masses...")
+        results["assembled_mass"] = node_tables(dm, M_diag[:, None])[0]
 
-    for i in range(len(vals)):
-        w2 = vals[i]
-        phi_free = vecs[:, i]              
+        print(f"      Total mass X/Y/Z = {total_mass[0]:.6f} / {total_mass[1]:.6f} / {total_mass[2]:.6f}")
 
-        phi_raw = vecs[:, i] 
-
-        Mn_raw = (phi_raw.T @ M_free @ phi_raw)
-        
-        if Mn_raw > 0:
-            scale_factor = 1.0 / np.sqrt(Mn_raw)
-        else:
-            scale_factor = 1.0
-            
-        phi_free = phi_raw * scale_factor
-        
-        Mn = (phi_free.T @ M_free @ phi_free)
-        
-        if w2 < 1e-6:
-             omega = 0.0
-             freq = 0.0
-             period = 999.99           
-                                                              
-        else:
-             omega = np.sqrt(w2)
-             freq = omega / (2 * np.pi)
-             period = 1.0 / freq
-        
-        results["tables"]["periods"].append({
-            "mode": i + 1,
-            "T": float(period),
-            "f": float(freq),
-            "omega": float(omega),
-            "eigen": float(w2)
-        })
-
-        Mn = (phi_free.T @ M_free @ phi_free)
-        
-        if Mn == 0: Mn = 1.0                                
-
-        L_x = phi_free.T @ M_free @ r_x_free
-        L_y = phi_free.T @ M_free @ r_y_free
-        L_z = phi_free.T @ M_free @ r_z_free                                         
-
-        if i == 3 or i == 6:                             
-            print(f"  DEBUG Mode {i+1}: L_x={L_x:.6f}, Mn={Mn:.6f}, Gamma={L_x/np.sqrt(total_mass_x * Mn):.6f}")
-
-        if i == 3:          
-            print(f"    phi_free shape: {phi_free.shape}")
-            print(f"    M_free shape: {M_free.shape}")
-            print(f"    r_x_free shape: {r_x_free.shape}")
-            print(f"    Sum of r_x_free: {np.sum(r_x_free)}")
-            print(f"    M @ r_x sum: {np.sum(M_free @ r_x_free)}")
+        results["total_mass"] = {
+            "x": float(total_mass[0]),
+            "y": float(total_mass[1]),
+            "z": float(total_mass[2])
+        }
 
-        em_x = (L_x**2) / Mn 
-        em_y = (L_y**2) / Mn 
-        em_z = (L_z**2) / Mn                                          
-        
-        ratio_x = em_x / total_mass_x if total_mass_x > 0 else 0
-        ratio_y = em_y / total_mass_y if total_mass_y > 0 else 0
-        ratio_z = em_z / total_mass_z if total_mass_z > 0 else 0                                 
-        
-        sum_ratio_x += ratio_x
-        sum_ratio_y += ratio_y
-        sum_ratio_z += ratio_z                            
-        
-        gamma_x = float(L_x / np.sqrt(total_mass_x * Mn))
-        gamma_y = float(L_y / np.sqrt(total_mass_y * Mn))
-        gamma_z = float(L_z / np.sqrt(total_mass_z * Mn))                                 
-
-        results["tables"]["participation_mass"].append({
-            "mode": i + 1,
-            "Ux": float(ratio_x), "SumUx": float(sum_ratio_x),
-            "Uy": float(ratio_y), "SumUy": float(sum_ratio_y),
-            "Uz": float(ratio_z), "SumUz": float(sum_ratio_z),                           
-            "Gamma_x": gamma_x, "Gamma_y": gamma_y, "Gamma_z": gamma_z                            
-        })
-        
-        phi_full = np.zeros(dm.total_dofs)
+        phi_free, Mn = mass_normalize(vecs, M_free)
+        omega, freq, period = modal_frequencies(vals)
+        ratio, cumulative, gamma = participation(phi_free, M_free, R, Mn, total_mass)
+
+        for i in range(len(vals)):
+            results["tables"]["periods"].append({
+                "mode": i + 1,
+                "T": float(period[i]),
+                "f": float(freq[i]),
+                "omega": float(omega[i]),
+                "eigen": float(vals[i])
+            })
+
+            results["tables"]["participation_mass"].append({
+                "mode": i + 1,
+                "Ux": float(ratio[i, 0]), "SumUx": float(cumulative[i, 0]),
+                "Uy": float(ratio[i, 1]), "SumUy": float(cumulative[i, 1]),
+                "Uz": float(ratio[i, 2]), "SumUz": float(cumulative[i, 2]),
+                "Gamma_x": float(gamma[i, 0]), "Gamma_y": float(gamma[i, 1]), "Gamma_z": float(gamma[i, 2])
+            })
+
+        # Mode shapes go to the binary store in node order; the JSON keeps the tables.
+        phi_full = np.zeros((dm.total_dofs, len(vals)))
         phi_full[is_free] = phi_free
-        
-        shape_data = {}
-        for node in dm.nodes:
-            nid = str(node['id'])
-            idx = node['idx'] * 6
-            node_dofs = phi_full[idx : idx+6].tolist()
-            shape_data[nid] = node_dofs
-            
-        results["mode_shapes"][f"Mode {i+1}"] = shape_data
-
+        node_ids = [node['id'] for node in dm.nodes]
+        node_idx = np.array([node['idx'] for node in dm.nodes], dtype=np.int64)
+        phi_nodes = phi_full.reshape(-1, 6, len(vals))[node_idx].reshape(-1, len(vals))
+
+        try:
+            print("[7/7] Writing Results...")
+            results["modal_store"] = write_modal_store(
+                output_json_path, node_ids, phi_nodes,
+                np.column_stack([period, freq, omega, vals]),
+                np.column_stack([ratio, cumulative, gamma]))
+            with open(output_json_path, 'w') as f:
+                json.dump(results, f, indent=4)
+            print("Done.")
+            return True
+        except Exception as e:
+            print(f"FATAL: Write Error: {e}")
+            return _write_error(output_json_path, "E401", str(e))
+
+    def run_all(self, output_json_path, mass_sources=None, shifts=None, **options):
+        """
+        One modal run per mass source (default: all of the model's) and
+        shift, each written to mass_source_output_path(). options are
+        passed on to run().
+
+        Returns:
+            dict: {(mass_source, shift): output path, or None if it failed}.
+        """
+        if mass_sources is None:
+            sources = self.dm.raw.get("mass_sources", [])
+            mass_sources = [ms["name"] for ms in sources] if isinstance(sources, list) else list(sources)
+            if not mass_sources:
+                mass_sources = ["Default"]
+        shifts = [None] if shifts is None else list(shifts)
+
+        outputs = {}
+        for name in mass_sources:
+            for k, sigma in enumerate(shifts):
+                out = mass_source_output_path(output_json_path, name, k if len(shifts) > 1 else None)
+                print(f"\n--- Mass source '{name}'" + (f", shift {sigma}" if sigma is not None else "") + " ---")
+                self.run(out, mass_source=name, sigma=sigma, **options)
+                with open(out, 'r') as f:
+                    ok = json.load(f).get("status") == "SUCCESS"
+                outputs[(name, sigma)] = out if ok else None
+
+        reused = sum(o.reused for o in self.orderings.values())
+        print(f"Modal Session: {len(outputs)} runs, setup {self.t_setup:.3f}s, {reused} factorizations reused an ordering")
+        return outputs
+
+def mass_source_output_path(output_json_path, mass_source, shift_index=None):
+    """'X_results.json' -> 'X_results_<mass source>[_s<k>].json'."""
+    root, ext = os.path.splitext(output_json_path)
+    name = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(mass_source))
+    suffix = f"_{name}" + (f"_s{shift_index}" if shift_index is not None else "")
+    return root + suffix + (ext or ".json")
+
+def run_modal_analysis(input_json_path, output_json_path, condensation=None, eigen_solver=None,
+                       target_participation=None, frequency_band=None, vector_type=None, warm_start=None):
+    """
+    Modal analysis of the MODAL case: a single ModalSession.run(); see there
+    for the options. Returns True once the results (or the error) are written.
+    """
     try:
-        print("[6/6] Writing Results...")
-        with open(output_json_path, 'w') as f:
-            json.dump(results, f, indent=4)
-        print("Done.")
-        return True
-    except Exception as e:
-        print(f"FATAL: Write Error: {e}")
-        return _write_error(output_json_path, "E401", str(e))
+        session = ModalSession(input_json_path)
+    except SolverException as e:
+        return _write_error(output_json_path, e.error_code, e.extra_info)
+    return session.run(output_json_path, condensation=condensation, eigen_solver=eigen_solver,
+                       target_participation=target_participation, frequency_band=frequency_band,
+                       vector_type=vector_type, warm_start=warm_start)
 
 if __name__ == "__main__":
     test_in = os.path.join(current_dir, "test3.mf")
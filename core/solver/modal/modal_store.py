@@ -0,0 +1,168 @@
+import os
+import json
+import numpy as np
+from collections.abc import Mapping
+
+# Binary modal results next to the (small) results JSON: one .npy file per
+# array so every array can be memory-mapped.
+#   phi.npy            (n_nodes * 6, n_modes) float64, node-major, 6 DOFs per node
+#   node_ids.npy       (n_nodes,) node ids (str), row block i of phi is node_ids[i]
+#   periods.npy        (n_modes, 4) columns PERIOD_COLUMNS
+#   participation.npy  (n_modes, 9) columns PARTICIPATION_COLUMNS
+STORE_SUFFIX = "_modes"
+PERIOD_COLUMNS = ("T", "f", "omega", "eigen")
+PARTICIPATION_COLUMNS = ("Ux", "Uy", "Uz", "SumUx", "SumUy", "SumUz", "Gamma_x", "Gamma_y", "Gamma_z")
+
+def store_path(results_path):
+    """Store directory of a results JSON: 'X_results.json' -> 'X_results_modes'."""
+    return os.path.splitext(results_path)[0] + STORE_SUFFIX
+
+def write_modal_store(results_path, node_ids, phi, periods, participation):
+    """
+    Writes the modal arrays for results_path and returns the "modal_store"
+    entry for its JSON (directory relative to the JSON, array shapes).
+
+    Args:
+        node_ids (list): node ids in the row order of phi.
+        phi (np.ndarray): (n_nodes * 6, n_modes) mode shapes.
+        periods (np.ndarray): (n_modes, 4), see PERIOD_COLUMNS.
+        participation (np.ndarray): (n_modes, 9), see PARTICIPATION_COLUMNS.
+    """
+    path = store_path(results_path)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "phi.npy"), np.ascontiguousarray(phi, dtype=np.float64))
+    np.save(os.path.join(path, "node_ids.npy"), np.array([str(nid) for nid in node_ids]))
+    np.save(os.path.join(path, "periods.npy"), np.asarray(periods, dtype=np.float64))
+    np.save(os.path.join(path, "participation.npy"), np.asarray(participation, dtype=np.float64))
+    return {
+        "dir": os.path.basename(path),
+        "n_nodes": len(node_ids),
+        "n_modes": int(phi.shape[1]),
+        "periods": list(PERIOD_COLUMNS),
+        "participation": list(PARTICIPATION_COLUMNS)
+    }
+
+class ModeShapes(Mapping):
+    """
+    Read-only {"Mode i": {node_id: [6 values]}} view of a store, the layout
+    of the old JSON "mode_shapes" block. A mode's dict is built only when
+    it is accessed.
+    """
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, key):
+        try:
+            i = int(str(key).split()[-1]) - 1
+        except ValueError:
+            raise KeyError(key)
+        if not str(key).startswith("Mode ") or not 0 <= i < self.store.n_modes:
+            raise KeyError(key)
+        return dict(zip(self.store.node_ids, self.store.shape(i).tolist()))
+
+    def __iter__(self):
+        return (f"Mode {i+1}" for i in range(self.store.n_modes))
+
+    def __len__(self):
+        return self.store.n_modes
+
+class ModalStore:
+    """
+    Modal results as arrays. Opened from a store directory the arrays are
+    memory-mapped (mmap_mode='r'), so loading costs no parsing and pages
+    are read only when used.
+    """
+    def __init__(self, phi, node_ids, periods, participation, total_mass=None):
+        self.phi = phi
+        self.node_ids = [str(nid) for nid in node_ids]
+        self.periods = periods
+        self.participation = participation
+        self.total_mass = total_mass or {}
+        self.n_nodes = len(self.node_ids)
+        self.n_modes = phi.shape[1]
+        self._node_index = None
+
+    @classmethod
+    def open(cls, path, total_mass=None):
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode='r')
+        return cls(load("phi.npy"), np.load(os.path.join(path, "node_ids.npy")).tolist(),
+                   load("periods.npy"), load("participation.npy"), total_mass)
+
+    @classmethod
+    def from_results(cls, results):
+        """Arrays from a results dict with an inline JSON "mode_shapes" block (older files)."""
+        shapes = results.get("mode_shapes", {})
+        period_rows = results["tables"]["periods"]
+        part_rows = results["tables"]["participation_mass"]
+        node_ids = list(shapes["Mode 1"].keys()) if shapes else []
+
+        phi = np.zeros((len(node_ids) * 6, len(period_rows)))
+        for i in range(len(period_rows)):
+            shape = shapes.get(f"Mode {i+1}")
+            if shape:
+                phi[:, i] = np.array([shape.get(nid, [0.0] * 6) for nid in node_ids], dtype=float).ravel()
+        periods = np.array([[row.get(c, 0.0) for c in PERIOD_COLUMNS] for row in period_rows], dtype=float)
+        participation = np.array([[row.get(c, 0.0) for c in PARTICIPATION_COLUMNS] for row in part_rows],
+                                 dtype=float)
+        return cls(phi, node_ids, periods.reshape(-1, 4), participation.reshape(-1, 9),
+                   results.get("total_mass"))
+
+    @property
+    def node_index(self):
+        """{node_id: row block} for lookups by node."""
+        if self._node_index is None:
+            self._node_index = {nid: i for i, nid in enumerate(self.node_ids)}
+        return self._node_index
+
+    def column(self, table, name):
+        """One column of the periods or participation table, e.g. column("periods", "T")."""
+        if table == "periods":
+            return np.asarray(self.periods[:, PERIOD_COLUMNS.index(name)])
+        return np.asarray(self.participation[:, PARTICIPATION_COLUMNS.index(name)])
+
+    def shape(self, mode):
+        """(n_nodes, 6) shape of mode (0-based)."""
+        return np.asarray(self.phi[:, mode]).reshape(-1, 6)
+
+    def mode_shapes(self):
+        return ModeShapes(self)
+
+    def node_table(self, values):
+        """{node_id: [6 values]} from a per-DOF (n_nodes * 6,) vector in store order."""
+        return dict(zip(self.node_ids, np.asarray(values).reshape(-1, 6).tolist()))
+
+def load_modal_results(results_path):
+    """
+    Reads a modal results JSON and its arrays.
+
+    Returns:
+        (results, store): results["mode_shapes"] is a lazy ModeShapes view
+        when the arrays live in a binary store; store is a ModalStore
+        (memory-mapped, or built from the inline JSON shapes of older files).
+    """
+    with open(results_path, 'r') as f:
+        results = json.load(f)
+    if results.get("status") != "SUCCESS" or "tables" not in results:
+        return results, None
+
+    entry = results.get("modal_store")
+    if entry:
+        path = os.path.join(os.path.dirname(os.path.abspath(results_path)), entry["dir"])
+        store = ModalStore.open(path, results.get("total_mass"))
+        results["mode_shapes"] = store.mode_shapes()
+    else:
+        store = ModalStore.from_results(results)
+    return results, store
+
+def attach_mode_shapes(results, results_path):
+    """
+    Adds the lazy "mode_shapes" view to an already loaded results dict whose
+    arrays are in a binary store. Other results are left unchanged.
+    """
+    entry = results.get("modal_store")
+    if entry and "mode_shapes" not in results:
+        path = os.path.join(os.path.dirname(os.path.abspath(results_path)), entry["dir"])
+        if os.path.isdir(path):
+            results["mode_shapes"] = ModalStore.open(path, results.get("total_mass")).mode_shapes()
+    return results
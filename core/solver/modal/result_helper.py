@@ -1 +1,89 @@
+import numpy as np
 
+def influence_matrix(is_free):
+    """(n_free, 3) rigid-body influence matrix R: unit ground motion in X, Y, Z."""
+    n_dofs = len(is_free)
+    R = np.zeros((n_dofs, 3))
+    for k in range(3):
+        R[k::6, k] = 1.0
+    return R[is_free]
+
+def mass_product(M, X):
+    """M @ X where M is either a sparse/dense matrix or a 1-D lumped mass diagonal."""
+    if isinstance(M, np.ndarray) and M.ndim == 1:
+        return M[:, None] * X if X.ndim == 2 else M * X
+    return M @ X
+
+def modal_masses(vecs, M):
+    """Diagonal of Phi^T M Phi for an (n, n_modes) eigenvector block."""
+    return np.einsum('ij,ij->j', vecs, mass_product(M, vecs))
+
+def mass_normalize(vecs, M):
+    """
+    Scales every column of vecs to unit modal mass in one pass.
+    Columns with a non-positive modal mass are left unscaled.
+
+    Returns:
+        (phi, Mn): normalized block and its modal masses (~1.0 each).
+    """
+    Mn_raw = modal_masses(vecs, M)
+    scale = np.ones_like(Mn_raw)
+    pos = Mn_raw > 0
+    scale[pos] = 1.0 / np.sqrt(Mn_raw[pos])
+
+    phi = vecs * scale
+    Mn = Mn_raw * scale**2
+    Mn[Mn == 0] = 1.0
+    return phi, Mn
+
+def modal_frequencies(vals):
+    """Returns (omega, freq, period) arrays; near-zero eigenvalues map to period 999.99."""
+    vals = np.asarray(vals, dtype=float)
+    rigid = vals < 1e-6
+    omega = np.where(rigid, 0.0, np.sqrt(np.abs(vals)))
+    freq = omega / (2 * np.pi)
+    with np.errstate(divide='ignore'):
+        period = np.where(rigid, 999.99, 1.0 / freq)
+    return omega, freq, period
+
+def participation(phi, M, R, Mn, total_mass):
+    """
+    Participation of all modes in all three directions from one Phi^T (M R)
+    product.
+
+    Args:
+        phi (np.ndarray): (n, n_modes) mass-normalized mode shapes.
+        M: (n, n) mass matrix on the same DOFs, or its (n,) diagonal.
+        R (np.ndarray): (n, 3) influence matrix.
+        Mn (np.ndarray): (n_modes,) modal masses.
+        total_mass (np.ndarray): (3,) total mass per direction.
+
+    Returns:
+        (ratio, cumulative, gamma): each (n_modes, 3). gamma is
+        L / sqrt(M_total * Mn) as reported by the modal tables.
+    """
+    L = phi.T @ mass_product(M, R)
+    Mn = Mn[:, None]
+    total_mass = np.asarray(total_mass, dtype=float)
+
+    em = L**2 / Mn
+    ratio = np.zeros_like(em)
+    has_mass = total_mass > 0
+    ratio[:, has_mass] = em[:, has_mass] / total_mass[has_mass]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = L / np.sqrt(total_mass * Mn)
+    return ratio, np.cumsum(ratio, axis=0), gamma
+
+def node_tables(data_manager, values):
+    """
+    Splits a per-DOF block (n_dofs, n_cols) into one {node_id: [6 values]}
+    dict per column with a single tolist() call.
+    """
+    dm = data_manager
+    nids = [str(node['id']) for node in dm.nodes]
+    idx = np.array([node['idx'] for node in dm.nodes], dtype=np.int64)
+
+    values = np.asarray(values).reshape(-1, 6, values.shape[1])[idx]
+    per_col = values.transpose(2, 0, 1).tolist()
+    return [dict(zip(nids, col)) for col in per_col]
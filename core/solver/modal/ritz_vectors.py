@@ -0,0 +1,114 @@
+import time
+import numpy as np
+import scipy.linalg
+
+from linear_static.error_definitions import SolverException
+from result_helper import mass_product
+from eigen_backends import residual_norms
+
+VECTOR_TYPES = ("eigen", "ritz")
+
+def _m_orthonormalize(X, basis, mass, drop_tol=1e-8):
+    """
+    Modified Gram-Schmidt in the M inner product, twice against the basis
+    and then within the block. Columns whose M-norm falls below drop_tol
+    of their original norm are dependent and dropped.
+    """
+    kept = []
+    for j in range(X.shape[1]):
+        x = X[:, j].copy()
+        norm0 = np.sqrt(max(x @ mass_product(mass, x), 0.0))
+        if norm0 == 0.0:
+            continue
+        for _ in range(2):
+            if basis is not None:
+                x -= basis @ (basis.T @ mass_product(mass, x))
+            for q in kept:
+                x -= q * (q @ mass_product(mass, x))
+        norm = np.sqrt(max(x @ mass_product(mass, x), 0.0))
+        if norm > drop_tol * norm0:
+            kept.append(x / norm)
+    if not kept:
+        return np.zeros((X.shape[0], 0))
+    return np.column_stack(kept)
+
+def generate_ritz_vectors(problem, loads, n_vectors, sigma=-0.1, stop=None, drop_tol=1e-8):
+    """
+    Load-dependent Ritz vectors (Wilson): X_1 = K^-1 F, X_i+1 = K^-1 M X_i,
+    M-orthonormalized block by block, then a Rayleigh-Ritz step on
+    Phi^T K Phi. One factorization (of K - sigma M, sigma <= 0 for a
+    nonsingular factor) serves every block.
+
+    Args:
+        problem: SparseEigenProblem or MasslessCondensation.
+        loads (np.ndarray): (n, n_loads) spatial load patterns in problem
+            space, typically M R for the ground motion directions.
+        n_vectors (int): maximum number of vectors.
+        stop: optional stop(vals, vecs) called with every new expanded
+            block (M-orthonormal, so block participations add up);
+            generation ends when it returns True.
+
+    Returns:
+        (vals, vecs, telemetry): Ritz values (w^2) in ascending order and
+        the expanded Ritz vectors.
+    """
+    t_start = time.perf_counter()
+    op = problem.shift_invert_operator(sigma)
+    mass = problem.mass
+
+    def solve(B):
+        return np.column_stack([op.matvec(B[:, j]) for j in range(B.shape[1])])
+
+    basis = None
+    blocks = []
+    stopped = "cap"
+
+    t0 = time.perf_counter()
+    X = solve(loads)
+    n_solves = loads.shape[1]
+    while True:
+        X = _m_orthonormalize(X, basis, mass, drop_tol)
+        n_room = n_vectors - (0 if basis is None else basis.shape[1])
+        X = X[:, :n_room]
+        if X.shape[1] == 0:
+            stopped = "exhausted"
+            break
+
+        basis = X if basis is None else np.column_stack([basis, X])
+        n_new = X.shape[1]
+        done = basis.shape[1] >= n_vectors
+        if stop is not None and stop(None, problem.expand(X)):
+            stopped = "target"
+            done = True
+        if not done:
+            X = solve(mass_product(mass, X))
+            n_solves += X.shape[1]
+
+        blocks.append({"vectors": int(n_new), "t": time.perf_counter() - t0})
+        t0 = time.perf_counter()
+        if done:
+            break
+
+    if basis is None:
+        raise SolverException("E304", "No Ritz vectors: the starting loads are zero.")
+
+    # Rayleigh-Ritz on the M-orthonormal basis: (Phi^T K Phi) z = w2 z.
+    A = problem.stiffness_operator()
+    K_phi = np.column_stack([A @ basis[:, j] for j in range(basis.shape[1])])
+    K_red = basis.T @ K_phi
+    vals, Z = scipy.linalg.eigh(0.5 * (K_red + K_red.T))
+    phi = basis @ Z
+
+    residuals = residual_norms(problem, vals, phi)
+    telemetry = {
+        "method": "ritz",
+        "selection": "requested",
+        "iterations": int(n_solves),
+        "n": int(problem.size),
+        "k": int(len(vals)),
+        "max_residual": float(residuals.max()) if len(residuals) else 0.0,
+        "t_solve": time.perf_counter() - t_start,
+        "blocks": blocks,
+        "stopped": stopped
+    }
+    return vals, problem.expand(phi), telemetry
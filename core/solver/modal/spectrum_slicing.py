@@ -0,0 +1,164 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from linear_static.error_definitions import SolverException
+from eigen_backends import ShiftInvertBackend, residual_norms
+from result_helper import mass_normalize
+
+MAX_WORKERS = 8
+
+_worker_problem = None
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+def sturm_count(problem, sigma):
+    """
+    Number of eigenvalues below sigma: the count of negative pivots of the
+    symmetric-mode LDL^T of K - sigma M (Sylvester's law of inertia).
+    """
+    lu = problem.shifted_factor(sigma)
+    if not np.array_equal(lu.perm_r, lu.perm_c):
+        raise SolverException("E303", f"Sturm count at {sigma:.4g} unavailable: the factorization "
+                                      f"of K - sigma M needed off-diagonal pivots.")
+    return int(np.sum(lu.U.diagonal() < 0))
+
+def solve_slice(problem, lam_lo, lam_hi, n_expected, extra=4, max_tries=4):
+    """
+    The n_expected eigenpairs in [lam_lo, lam_hi) by shift-invert at the
+    slice midpoint. k grows until all of them are among the modes closest
+    to the shift.
+
+    Returns:
+        (vals, phi, iterations): phi in problem space, M-normalized.
+    """
+    if n_expected == 0:
+        return np.zeros(0), np.zeros((problem.size, 0)), 0
+
+    sigma = 0.5 * (lam_lo + lam_hi)
+    backend = ShiftInvertBackend()
+    iterations = 0
+    k = n_expected + extra
+    for _ in range(max_tries):
+        k = min(k, problem.size - 1)
+        vals, phi = backend.solve(problem, k, sigma)
+        iterations += backend.telemetry["iterations"]
+
+        inside = (vals >= lam_lo) & (vals < lam_hi)
+        if inside.sum() >= n_expected or k == problem.size - 1:
+            break
+        k *= 2
+
+    order = np.argsort(vals[inside])
+    vals, phi = vals[inside][order], phi[:, inside][:, order]
+    phi, _ = mass_normalize(phi, problem.mass)
+    return vals, phi, iterations
+
+def _count_task(sigma):
+    return sturm_count(_worker_problem, sigma)
+
+def _slice_task(lam_lo, lam_hi, n_expected):
+    t0 = time.perf_counter()
+    vals, phi, iterations = solve_slice(_worker_problem, lam_lo, lam_hi, n_expected)
+    return vals, phi, iterations, time.perf_counter() - t0
+
+def slice_bounds(f_min, f_max, n_slices, lam_floor=-0.1):
+    """
+    Eigenvalue (w^2) boundaries of n_slices equal frequency intervals of
+    [f_min, f_max]. A zero lower frequency maps to lam_floor so rigid-body
+    and near-zero modes are included.
+    """
+    f = np.linspace(f_min, f_max, n_slices + 1)
+    lam = (2 * np.pi * f)**2
+    if f_min <= 0:
+        lam[0] = lam_floor
+    return lam
+
+def solve_frequency_band(problem, f_min, f_max, n_slices=None, workers=None, lam_floor=-0.1, tol=1e-6):
+    """
+    All modes with f_min <= f < f_max by spectrum slicing. The band is cut
+    into n_slices frequency intervals; Sturm counts at every boundary give
+    the exact number of modes per slice, and every slice is then solved by
+    shift-invert at its own midpoint. Both stages run in a process pool
+    (workers <= 1 runs them in this process).
+
+    Returns:
+        (vals, vecs, telemetry): vecs expanded by problem.expand(); the
+        telemetry lists every slice and the Sturm check.
+    """
+    if workers is None:
+        workers = min(os.cpu_count() or 1, MAX_WORKERS)
+    if n_slices is None:
+        n_slices = max(workers, 1)
+
+    lam = slice_bounds(f_min, f_max, n_slices, lam_floor)
+    t_start = time.perf_counter()
+
+    def run(pool):
+        if pool is None:
+            _init_worker(problem)
+            counts = [_count_task(s) for s in lam]
+        else:
+            counts = list(pool.map(_count_task, lam))
+
+        expected = np.diff(counts)
+        args = [(lam[i], lam[i + 1], int(expected[i])) for i in range(n_slices)]
+        if pool is None:
+            solved = [_slice_task(*a) for a in args]
+        else:
+            solved = list(pool.map(_slice_task, *zip(*args)))
+        return counts, expected, solved
+
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem,)) as pool:
+                counts, expected, solved = run(pool)
+        except (OSError, RuntimeError) as e:
+            print(f"      Warning: process pool unavailable ({e}); slicing in this process.")
+            workers = 1
+            counts, expected, solved = run(None)
+    else:
+        counts, expected, solved = run(None)
+
+    slices = []
+    vals_all, phi_all = [], []
+    for i, (vals, phi, iterations, t) in enumerate(solved):
+        vals_all.append(vals)
+        phi_all.append(phi)
+        slices.append({
+            "f_range": [float(np.sqrt(max(lam[i], 0.0)) / (2 * np.pi)), float(np.sqrt(lam[i + 1]) / (2 * np.pi))],
+            "expected": int(expected[i]),
+            "found": int(len(vals)),
+            "iterations": int(iterations),
+            "t": t
+        })
+        print(f"      Slice {i+1}: {slices[-1]['f_range'][0]:.3f}-{slices[-1]['f_range'][1]:.3f} Hz, "
+              f"{len(vals)}/{expected[i]} modes, {iterations} iterations, {t:.4f}s")
+
+    vals = np.concatenate(vals_all)
+    phi = np.column_stack(phi_all) if phi_all else np.zeros((problem.size, 0))
+    residuals = residual_norms(problem, vals, phi) if len(vals) else np.zeros(0)
+
+    sturm_total = int(counts[-1] - counts[0])
+    telemetry = {
+        "method": "spectrum_slicing",
+        "selection": "requested",
+        "band": [float(f_min), float(f_max)],
+        "workers": int(workers),
+        "iterations": int(sum(s["iterations"] for s in slices)),
+        "n": int(problem.size),
+        "k": int(len(vals)),
+        "sturm_count": sturm_total,
+        "missing": sturm_total - int(len(vals)),
+        "max_residual": float(residuals.max()) if len(residuals) else 0.0,
+        "converged": bool(len(vals) == sturm_total and (not len(residuals) or residuals.max() <= tol)),
+        "t_solve": time.perf_counter() - t_start,
+        "slices": slices
+    }
+    if telemetry["missing"]:
+        print(f"Warning: Sturm count finds {sturm_total} modes in the band, {len(vals)} extracted.")
+
+    return vals, problem.expand(phi), telemetry
@@ -0,0 +1,49 @@
+import os
+import numpy as np
+from modal_store import load_modal_results
+
+def load_previous_shapes(results_path, data_manager, is_free, max_modes=None):
+    """
+    Mode shapes of a previous modal run on the current free DOFs, matched by
+    node id, to warm-start the eigen solver after small model edits. Nodes
+    that are new in this model start at zero.
+
+    Args:
+        results_path (str): modal results JSON of the previous run.
+        data_manager: DataManager of the current model.
+        is_free (np.ndarray): free-DOF mask of the current model.
+        max_modes (int): use at most this many of the previous modes.
+
+    Returns:
+        (X, info): X is (n_free, n_modes), or None when nothing usable was
+        found; info records the source, modes and matched nodes (or the
+        reason for a cold start).
+    """
+    info = {"source": os.path.basename(results_path)}
+    if not os.path.exists(results_path):
+        info["reason"] = "no previous results"
+        return None, info
+    try:
+        _, store = load_modal_results(results_path)
+    except (OSError, ValueError, KeyError) as e:
+        info["reason"] = f"unreadable previous results ({e})"
+        return None, info
+
+    if store is None or store.n_modes == 0 or store.n_nodes == 0:
+        info["reason"] = "previous run has no mode shapes"
+        return None, info
+    n_modes = store.n_modes if max_modes is None else min(store.n_modes, max_modes)
+
+    dm = data_manager
+    node_idx = {str(node['id']): node['idx'] for node in dm.nodes}
+    common = [(i, node_idx[nid]) for i, nid in enumerate(store.node_ids) if nid in node_idx]
+    if not common:
+        info["reason"] = "no common nodes"
+        return None, info
+
+    prev_rows, rows = (np.array(c)[:, None] * 6 + np.arange(6) for c in zip(*common))
+    X_full = np.zeros((dm.total_dofs, n_modes))
+    X_full[rows.ravel()] = store.phi[prev_rows.ravel(), :n_modes]
+
+    info.update({"modes": n_modes, "matched_nodes": len(common), "nodes": len(dm.nodes)})
+    return X_full[is_free], info